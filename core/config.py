@@ -18,6 +18,18 @@ if os.getenv("ENVIRONMENT") == "production" and os.getenv("USE_SECRET_MANAGER",
     except ImportError:
         pass  # secrets.py not yet loaded during initial import
 
+# Output dimensions of known Vertex AI embedding models, so the vector mapping
+# can be sized without a probe embedding call
+EMBED_DIMS: dict[str, int] = {
+    "textembedding-gecko@001": 768,
+    "textembedding-gecko@003": 768,
+    "textembedding-gecko-multilingual@001": 768,
+    "text-embedding-004": 768,
+    "text-embedding-005": 768,
+    "text-multilingual-embedding-002": 768,
+    "gemini-embedding-001": 3072,
+}
+
 class AppConfig(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -35,10 +47,13 @@ class AppConfig(BaseSettings):
     max_total_mb: int = Field(default=100, ge=1)
     max_files: int = Field(default=25, ge=1)
     allowed_ext: tuple[str, ...] = ("pdf", "csv")
+    # Upload content hash for duplicate detection ("sha256" for FIPS environments)
+    content_hash_algorithm: Literal["blake3", "sha256"] = Field(default=os.getenv("CONTENT_HASH_ALGORITHM", "blake3"))
 
     # Paths
     data_dir: Path = Field(default=Path(os.getenv("DATA_DIR", "data")))
     uploads_dir: Path | None = None
+    cache_dir: Path | None = None
     logs_dir: Path = Field(default=Path(os.getenv("LOGS_DIR", "data/output")))
     log_file: Path | None = None
 
@@ -48,6 +63,8 @@ class AppConfig(BaseSettings):
     vertex_model: str = Field(default=os.getenv("VERTEX_MODEL", "gemini-2.5-pro"))
     vertex_model_genai: str = Field(default=os.getenv("VERTEX_MODEL_GENAI", os.getenv("VERTEX_MODEL", "gemini-2.5-pro")))
     vertex_model_embed: str = Field(default=os.getenv("VERTEX_MODEL_EMBED", "textembedding-gecko@003"))
+    # Texts per embedding predict request (Vertex accepts at most 250)
+    vertex_embed_batch_size: int = Field(default=os.getenv("VERTEX_EMBED_BATCH_SIZE", 250))
 
     # Storage / Elastic
     gcs_bucket: str | None = Field(default=os.getenv("GCS_BUCKET"))
@@ -61,6 +78,12 @@ class AppConfig(BaseSettings):
     # Vector field in statements index
     elastic_vector_field: str = Field(default=os.getenv("ELASTIC_VECTOR_FIELD", "desc_vector"))
     elastic_vector_dim: int = Field(default=os.getenv("ELASTIC_VECTOR_DIM", 768))
+    # "byte" stores int8-quantized vectors (~4x smaller payload and HNSW graph), "float" keeps float32
+    elastic_vector_element_type: Literal["float", "byte"] = Field(default=os.getenv("ELASTIC_VECTOR_ELEMENT_TYPE", "byte"))
+
+    # Bulk indexing: documents per bulk request and concurrent bulk requests
+    es_bulk_chunk_size: int = Field(default=os.getenv("ES_BULK_CHUNK_SIZE", 1000))
+    es_bulk_threads: int = Field(default=os.getenv("ES_BULK_THREADS", 8))
 
 
     @field_validator("log_level", mode="before")
@@ -85,6 +108,7 @@ class AppConfig(BaseSettings):
             self.vertex_model = os.getenv("VERTEX_MODEL", self.vertex_model)
             self.vertex_model_genai = os.getenv("VERTEX_MODEL_GENAI", self.vertex_model_genai)
             self.vertex_model_embed = os.getenv("VERTEX_MODEL_EMBED", self.vertex_model_embed)
+            self.vertex_embed_batch_size = int(os.getenv("VERTEX_EMBED_BATCH_SIZE", self.vertex_embed_batch_size))
             self.gcs_bucket = os.getenv("GCS_BUCKET", self.gcs_bucket)
             self.elastic_cloud_endpoint = os.getenv("ELASTIC_CLOUD_ENDPOINT", self.elastic_cloud_endpoint)
             self.elastic_api_key = os.getenv("ELASTIC_API_KEY", self.elastic_api_key)
@@ -93,15 +117,24 @@ class AppConfig(BaseSettings):
             self.elastic_index_statements = os.getenv("ELASTIC_IDX_STATEMENTS", self.elastic_index_statements)
             self.elastic_vector_field = os.getenv("ELASTIC_VECTOR_FIELD", self.elastic_vector_field)
             self.elastic_vector_dim = os.getenv("ELASTIC_VECTOR_DIM", self.elastic_vector_dim)
+            self.elastic_vector_element_type = os.getenv("ELASTIC_VECTOR_ELEMENT_TYPE", self.elastic_vector_element_type)
             self.elastic_alias_txn_view = os.getenv("ELASTIC_ALIAS_TXN_VIEW", self.elastic_alias_txn_view)
+            self.es_bulk_chunk_size = int(os.getenv("ES_BULK_CHUNK_SIZE", self.es_bulk_chunk_size))
+            self.es_bulk_threads = int(os.getenv("ES_BULK_THREADS", self.es_bulk_threads))
+        # Size vectors from the embedding model unless ELASTIC_VECTOR_DIM is set explicitly
+        if not os.getenv("ELASTIC_VECTOR_DIM"):
+            self.elastic_vector_dim = EMBED_DIMS.get(self.vertex_model_embed, self.elastic_vector_dim)
         if self.uploads_dir is None:
             self.uploads_dir = self.data_dir / "uploads"
+        if self.cache_dir is None:
+            self.cache_dir = self.data_dir / "cache"
         if self.log_file is None:
             self.log_file = self.logs_dir / "app.log"
 
         # Ensure directories exist
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.uploads_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         return self
 
@@ -4,18 +4,62 @@ Storage abstraction layer for local and GCS file operations.
 Provides unified interface for file storage operations with support for:
 - Local filesystem storage (development)
 - Google Cloud Storage (production)
+- A persistent content-hash index of stored uploads (HashIndex)
 
 Implements automatic backend selection based on environment configuration.
 """
 from __future__ import annotations
+import functools
+import io
+import json
 import os
+import shutil
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple
 
 from core.logger import get_logger
+from core.utils import content_hash_algorithm, content_hash_file, content_hash_stream, safe_write
 
 log = get_logger("core/storage")
 
+# Seconds allowed for a single GCS object download
+GCS_DOWNLOAD_TIMEOUT = 300
+# Sidecar file (in the storage root) mapping stored upload names to content hashes
+HASH_INDEX_FILE = ".content_hashes.json"
+# Stored files hashed concurrently while (re)building the hash index
+HASH_INDEX_WORKERS = 4
+# Custom object metadata recording a stored file's content hash (GCS only)
+HASH_METADATA_KEY = "content-hash"
+HASH_ALGORITHM_METADATA_KEY = "content-hash-algorithm"
+
+
+def _suffix_glob(suffix: str) -> str:
+    """
+    Case-insensitive glob for a file suffix, e.g. ".pdf" -> "*.[pP][dD][fF]".
+    
+    Works for both Path.rglob and GCS list_blobs(match_glob=...).
+    """
+    return "*" + "".join(f"[{c.lower()}{c.upper()}]" if c.isalpha() else c for c in suffix)
+
+
+def content_hash_metadata(file_hash: str) -> Dict[str, str]:
+    """
+    Object metadata recording a content hash, for save_file(metadata=...).
+    
+    Lets GCSStorage.hash_file return the hash from object metadata instead
+    of downloading the file.
+    
+    Args:
+        file_hash: Content hash from core.utils.content_hash
+        
+    Returns:
+        Dict[str, str]: Custom metadata for the stored object
+    """
+    return {HASH_METADATA_KEY: file_hash, HASH_ALGORITHM_METADATA_KEY: content_hash_algorithm()}
+
 
 class StorageBackend:
     """
@@ -25,13 +69,19 @@ class StorageBackend:
     and implement all abstract methods.
     """
     
-    def save_file(self, file_obj: BinaryIO, destination_path: str) -> str:
+    def save_file(
+        self,
+        file_obj: BinaryIO,
+        destination_path: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         Save file to storage backend.
         
         Args:
             file_obj: Binary file object to save
             destination_path: Destination path for the file
+            metadata: Custom metadata stored with the object where supported
             
         Returns:
             str: Full path or URL where file was saved
@@ -56,6 +106,67 @@ class StorageBackend:
         """
         raise NotImplementedError(f"{self.__class__.__name__}.read_file() must be implemented")
     
+    def open_file(self, file_path: str) -> BinaryIO:
+        """
+        Open a stored file for streaming reads.
+        
+        Args:
+            file_path: Path to file to open
+            
+        Returns:
+            BinaryIO: Readable binary file object (caller closes it)
+            
+        Raises:
+            NotImplementedError: Must be implemented by subclass
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}.open_file() must be implemented")
+    
+    def download_to_path(self, file_path: str, local_path: str) -> None:
+        """
+        Copy a stored file to a local path without holding it in memory.
+        
+        Args:
+            file_path: Path to file in storage
+            local_path: Local filesystem path to write (overwritten)
+            
+        Raises:
+            NotImplementedError: Must be implemented by subclass
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}.download_to_path() must be implemented")
+    
+    def hash_file(self, file_path: str) -> Tuple[str, int]:
+        """
+        Compute the content hash (core.utils.content_hash) and size of a stored file.
+        
+        Streams the file through open_file; backends with direct file access
+        override this.
+        
+        Args:
+            file_path: Path to file in storage
+            
+        Returns:
+            tuple[str, int]: (hex digest, size in bytes)
+        """
+        with self.open_file(file_path) as f:
+            file_hash = content_hash_stream(f)
+            # The stream is at EOF after hashing, so its position is the size
+            return file_hash, f.tell()
+    
+    def get_file_size(self, file_path: str) -> int:
+        """
+        Get the size of a file in storage without reading its contents.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            int: File size in bytes
+            
+        Raises:
+            NotImplementedError: Must be implemented by subclass
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}.get_file_size() must be implemented")
+    
     def delete_file(self, file_path: str) -> None:
         """
         Delete a file from storage.
@@ -68,12 +179,14 @@ class StorageBackend:
         """
         raise NotImplementedError(f"{self.__class__.__name__}.delete_file() must be implemented")
     
-    def list_files(self, prefix: str = "") -> list[str]:
+    def list_files(self, prefix: str = "", suffix: Optional[str] = None) -> list[str]:
         """
         List files in storage with optional prefix filter.
         
         Args:
             prefix: Optional prefix to filter files
+            suffix: Optional file suffix (e.g. ".pdf", case-insensitive); filtered
+                by the backend so other files are never listed
             
         Returns:
             list[str]: List of file paths
@@ -108,13 +221,19 @@ class LocalStorage(StorageBackend):
             log.error(f"Failed to create local storage directory {self.base_dir}: {e}")
             raise
     
-    def save_file(self, file_obj: BinaryIO, destination_path: str) -> str:
+    def save_file(
+        self,
+        file_obj: BinaryIO,
+        destination_path: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         Save file to local filesystem.
         
         Args:
             file_obj: Binary file object to save
             destination_path: Relative path within base directory
+            metadata: Ignored (the filesystem keeps no object metadata)
             
         Returns:
             str: Full path where file was saved
@@ -131,8 +250,8 @@ class LocalStorage(StorageBackend):
             file_size = file_obj.tell()
             file_obj.seek(0)  # Reset to beginning
             
-            with open(full_path, "wb") as f:
-                f.write(file_obj.read())
+            # Stream to disk atomically instead of reading the whole file into memory
+            safe_write(full_path, file_obj)
             
             log.info(
                 f"Saved file to local storage: path={full_path} "
@@ -185,6 +304,98 @@ class LocalStorage(StorageBackend):
             )
             raise IOError(f"Failed to read file from local storage: {e}")
     
+    def open_file(self, file_path: str) -> BinaryIO:
+        """
+        Open a file in local storage for reading.
+        
+        Args:
+            file_path: Relative path within base directory
+            
+        Returns:
+            BinaryIO: Open binary file (caller closes it)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        full_path = self.base_dir / file_path
+        
+        if not full_path.exists():
+            log.error(f"File not found in local storage: {full_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        return open(full_path, "rb")
+    
+    def download_to_path(self, file_path: str, local_path: str) -> None:
+        """
+        Copy a file from local storage to another local path.
+        
+        Args:
+            file_path: Relative path within base directory
+            local_path: Destination path (overwritten)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If file cannot be copied
+        """
+        full_path = self.base_dir / file_path
+        
+        if not full_path.exists():
+            log.error(f"File not found in local storage: {full_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        try:
+            shutil.copyfile(full_path, local_path)
+            log.debug(f"Copied file from local storage: path={full_path} to={local_path}")
+        except Exception as e:
+            log.error(
+                f"Failed to copy file from local storage: "
+                f"path={file_path} error={e}",
+                exc_info=True
+            )
+            raise IOError(f"Failed to copy file from local storage: {e}")
+    
+    def get_file_size(self, file_path: str) -> int:
+        """
+        Get file size from local filesystem metadata.
+        
+        Args:
+            file_path: Relative path within base directory
+            
+        Returns:
+            int: File size in bytes
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        full_path = self.base_dir / file_path
+        
+        if not full_path.exists():
+            log.error(f"File not found in local storage: {full_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        return full_path.stat().st_size
+    
+    def hash_file(self, file_path: str) -> Tuple[str, int]:
+        """
+        Hash a file in local storage without reading it into memory.
+        
+        Args:
+            file_path: Relative path within base directory
+            
+        Returns:
+            tuple[str, int]: (hex digest, size in bytes)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        full_path = self.base_dir / file_path
+        
+        if not full_path.exists():
+            log.error(f"File not found in local storage: {full_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        return content_hash_file(full_path), full_path.stat().st_size
+    
     def delete_file(self, file_path: str) -> None:
         """
         Delete file from local filesystem.
@@ -213,12 +424,13 @@ class LocalStorage(StorageBackend):
             )
             raise IOError(f"Failed to delete file from local storage: {e}")
     
-    def list_files(self, prefix: str = "") -> list[str]:
+    def list_files(self, prefix: str = "", suffix: Optional[str] = None) -> list[str]:
         """
         List files in local filesystem.
         
         Args:
             prefix: Optional prefix to filter files
+            suffix: Optional file suffix (e.g. ".pdf", case-insensitive)
             
         Returns:
             list[str]: List of relative file paths
@@ -231,7 +443,7 @@ class LocalStorage(StorageBackend):
                 return []
             
             files = []
-            for item in search_path.rglob("*"):
+            for item in search_path.rglob(_suffix_glob(suffix) if suffix else "*"):
                 if item.is_file():
                     rel_path = item.relative_to(self.base_dir)
                     files.append(str(rel_path))
@@ -287,13 +499,19 @@ class GCSStorage(StorageBackend):
             )
             raise RuntimeError(f"Failed to initialize GCS storage: {e}")
     
-    def save_file(self, file_obj: BinaryIO, destination_path: str) -> str:
+    def save_file(
+        self,
+        file_obj: BinaryIO,
+        destination_path: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         Upload file to GCS.
         
         Args:
             file_obj: Binary file object to upload
             destination_path: Path within GCS bucket
+            metadata: Custom object metadata (e.g. content_hash_metadata())
             
         Returns:
             str: GCS URL (gs://bucket/path)
@@ -303,6 +521,8 @@ class GCSStorage(StorageBackend):
         """
         try:
             blob = self.bucket.blob(destination_path)
+            if metadata:
+                blob.metadata = metadata
             
             # Reset file pointer if needed
             if hasattr(file_obj, 'seek'):
@@ -369,6 +589,146 @@ class GCSStorage(StorageBackend):
             )
             raise IOError(f"Failed to download file from GCS: {e}")
     
+    def open_file(self, file_path: str) -> BinaryIO:
+        """
+        Open a GCS object for streaming reads.
+        
+        The object is fetched in ranged chunks as it is read rather than
+        downloaded in full up front.
+        
+        Args:
+            file_path: Path within GCS bucket
+            
+        Returns:
+            BinaryIO: Readable blob reader (caller closes it)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If the object cannot be opened
+        """
+        from google.api_core.exceptions import NotFound
+        
+        try:
+            return self.bucket.blob(file_path).open("rb")
+        except NotFound:
+            log.error(f"File not found in GCS: gs://{self.bucket_name}/{file_path}")
+            raise FileNotFoundError(f"File not found in GCS: {file_path}")
+        except Exception as e:
+            log.error(
+                f"Failed to open file in GCS: "
+                f"path={file_path} error={e}",
+                exc_info=True
+            )
+            raise IOError(f"Failed to open file in GCS: {e}")
+    
+    def download_to_path(self, file_path: str, local_path: str) -> None:
+        """
+        Stream a GCS object straight to a local file.
+        
+        The object is written to disk as it arrives rather than being
+        materialized as bytes first. Checksum validation is skipped; the
+        transfer is already protected by TLS.
+        
+        Args:
+            file_path: Path within GCS bucket
+            local_path: Local filesystem path to write (overwritten)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If download fails
+        """
+        from google.api_core.exceptions import NotFound
+        
+        try:
+            blob = self.bucket.blob(file_path)
+            blob.download_to_filename(local_path, checksum=None, timeout=GCS_DOWNLOAD_TIMEOUT)
+            
+            log.debug(
+                f"Downloaded file from GCS: "
+                f"path=gs://{self.bucket_name}/{file_path} to={local_path}"
+            )
+            
+        except NotFound:
+            log.error(f"File not found in GCS: gs://{self.bucket_name}/{file_path}")
+            raise FileNotFoundError(f"File not found in GCS: {file_path}")
+        except Exception as e:
+            log.error(
+                f"Failed to download file from GCS: "
+                f"path={file_path} error={e}",
+                exc_info=True
+            )
+            raise IOError(f"Failed to download file from GCS: {e}")
+    
+    def get_file_size(self, file_path: str) -> int:
+        """
+        Get file size from GCS object metadata (no download).
+        
+        Args:
+            file_path: Path within GCS bucket
+            
+        Returns:
+            int: File size in bytes
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If metadata lookup fails
+        """
+        try:
+            blob = self.bucket.get_blob(file_path)
+        except Exception as e:
+            log.error(
+                f"Failed to fetch GCS metadata: "
+                f"path={file_path} error={e}",
+                exc_info=True
+            )
+            raise IOError(f"Failed to fetch GCS metadata: {e}")
+        
+        if blob is None:
+            log.error(f"File not found in GCS: gs://{self.bucket_name}/{file_path}")
+            raise FileNotFoundError(f"File not found in GCS: {file_path}")
+        
+        return blob.size or 0
+    
+    def hash_file(self, file_path: str) -> Tuple[str, int]:
+        """
+        Get a GCS object's content hash, from its metadata when recorded.
+        
+        Objects saved with content_hash_metadata() for the current algorithm
+        cost one metadata request; others are downloaded and hashed. GCS's
+        own MD5/CRC32C are not used: they are a different function than
+        core.utils.content_hash, so they cannot be compared to upload hashes.
+        
+        Args:
+            file_path: Path within GCS bucket
+            
+        Returns:
+            tuple[str, int]: (hex digest, size in bytes)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If metadata lookup or download fails
+        """
+        try:
+            blob = self.bucket.get_blob(file_path)
+        except Exception as e:
+            log.error(
+                f"Failed to fetch GCS metadata: "
+                f"path={file_path} error={e}",
+                exc_info=True
+            )
+            raise IOError(f"Failed to fetch GCS metadata: {e}")
+        
+        if blob is None:
+            log.error(f"File not found in GCS: gs://{self.bucket_name}/{file_path}")
+            raise FileNotFoundError(f"File not found in GCS: {file_path}")
+        
+        metadata = blob.metadata or {}
+        file_hash = metadata.get(HASH_METADATA_KEY)
+        if file_hash and metadata.get(HASH_ALGORITHM_METADATA_KEY) == content_hash_algorithm():
+            return file_hash, blob.size or 0
+        
+        return super().hash_file(file_path)
+    
     def delete_file(self, file_path: str) -> None:
         """
         Delete file from GCS.
@@ -400,18 +760,23 @@ class GCSStorage(StorageBackend):
             )
             raise IOError(f"Failed to delete file from GCS: {e}")
     
-    def list_files(self, prefix: str = "") -> list[str]:
+    def list_files(self, prefix: str = "", suffix: Optional[str] = None) -> list[str]:
         """
         List files in GCS bucket.
         
         Args:
             prefix: Optional prefix to filter files
+            suffix: Optional file suffix (e.g. ".pdf", case-insensitive); matched
+                server-side with match_glob
             
         Returns:
             list[str]: List of file paths in bucket
         """
         try:
-            blobs = self.bucket.list_blobs(prefix=prefix)
+            if suffix:
+                blobs = self.bucket.list_blobs(prefix=prefix, match_glob="*" + _suffix_glob(suffix))
+            else:
+                blobs = self.bucket.list_blobs(prefix=prefix)
             files = [blob.name for blob in blobs]
             
             log.debug(
@@ -429,6 +794,7 @@ class GCSStorage(StorageBackend):
             return []
 
 
+@functools.lru_cache(maxsize=1)
 def get_storage_backend() -> StorageBackend:
     """
     Factory function to get appropriate storage backend.
@@ -437,6 +803,10 @@ def get_storage_backend() -> StorageBackend:
     - Production with GCS bucket configured: GCSStorage
     - Otherwise: LocalStorage
     
+    The backend is created once per process and shared, so GCS credentials
+    and the HTTP session are reused across files. Failures raise and are
+    not cached.
+    
     Returns:
         StorageBackend: Configured storage backend instance
         
@@ -463,3 +833,246 @@ def get_storage_backend() -> StorageBackend:
         log.error(f"Failed to initialize storage backend: {e}", exc_info=True)
         raise RuntimeError(f"Failed to initialize storage backend: {e}")
 
+
+
+class HashIndex:
+    """
+    Persistent index of stored upload content hashes.
+    
+    Maps each stored PDF's name to its content hash, byte size and the
+    algorithm that produced the hash in HASH_INDEX_FILE, kept in the storage root so it is shared
+    by every instance using the same bucket. Hashes are computed once, when a
+    file is uploaded, instead of re-reading every stored PDF per duplicate
+    check. Writes merge this process's change into the stored file, so entries
+    recorded by other instances are kept; call load() again (see
+    get_hash_index(refresh=True)) to see their uploads and deletes.
+    
+    On load the index is reconciled against a listing of the storage root:
+    entries for removed files are dropped, and files that are missing from
+    the index or were hashed with another algorithm are hashed once. Lookups
+    by hash and by name are constant-time (reverse dict and name set).
+    
+    Sizes are kept as a cheap first signature: content whose byte length
+    matches no stored file cannot be a duplicate, so it need not be hashed
+    for the check (see contains_size).
+    """
+    
+    def __init__(self, storage: StorageBackend):
+        """
+        Initialize the index for a storage backend (not loaded yet).
+        
+        Args:
+            storage: Backend holding the uploads and the index file
+        """
+        self.storage = storage
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Derived lookups: content hash -> file name, and names of all stored files
+        self._hash_to_name: Dict[str, str] = {}
+        self._names: Set[str] = set()
+        # Stored file count per byte size; entries written before sizes were
+        # recorded are counted under None and disable the size filter
+        self._sizes: Counter = Counter()
+        # Serializes add/remove (and their index writes) when uploads are saved concurrently
+        self._lock = threading.Lock()
+    
+    def load(self) -> "HashIndex":
+        """
+        Read the index file and reconcile it with the stored PDFs.
+        
+        Returns:
+            HashIndex: self, for chaining
+        """
+        entries = self._read_stored()
+        
+        algorithm = content_hash_algorithm()
+        listed = [f for f in self.storage.list_files() if f != HASH_INDEX_FILE]
+        stored = [f for f in listed if f.lower().endswith(".pdf")]
+        
+        def _reconcile(file_path: str) -> Tuple[Optional[Dict[str, Any]], str]:
+            """Return (entry or None if unreadable, 'kept' | 'rehashed' | 'resized' | 'failed')."""
+            entry = entries.get(file_path)
+            if entry is None or entry.get("algorithm") != algorithm:
+                try:
+                    file_hash, size = self.storage.hash_file(file_path)
+                    return {"hash": file_hash, "size": size, "algorithm": algorithm}, "rehashed"
+                except Exception as e:
+                    log.error(f"Error hashing stored file {file_path}: {e}")
+                    return None, "failed"
+            if entry.get("size") is None:
+                # Entry from before sizes were recorded: a metadata lookup, not a re-hash
+                try:
+                    return {**entry, "size": self.storage.get_file_size(file_path)}, "resized"
+                except Exception as e:
+                    log.warning(f"Could not read size of stored file {file_path}: {e}")
+            return entry, "kept"
+        
+        # Files are hashed on a small pool: hashing releases the GIL and GCS reads
+        # are network-bound; large blake3 inputs also use blake3's own threads
+        workers = min(HASH_INDEX_WORKERS, len(stored))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash-index") as executor:
+                outcomes = list(executor.map(_reconcile, stored))
+        else:
+            outcomes = [_reconcile(file_path) for file_path in stored]
+        
+        reconciled: Dict[str, Dict[str, Any]] = {
+            file_path: entry for file_path, (entry, _) in zip(stored, outcomes) if entry is not None
+        }
+        rehashed = sum(1 for _, kind in outcomes if kind == "rehashed")
+        resized = sum(1 for _, kind in outcomes if kind == "resized")
+        
+        with self._lock:
+            self._entries = reconciled
+            self._hash_to_name = {entry["hash"]: Path(name).name for name, entry in reconciled.items()}
+            self._names = {Path(f).name for f in listed}
+            self._sizes = Counter(entry.get("size") for entry in reconciled.values())
+            if rehashed or resized or len(reconciled) != len(entries):
+                log.info(f"Hash index rebuilt: files={len(reconciled)} hashed={rehashed}")
+                self._save()
+        return self
+    
+    def add(self, name: str, file_hash: str, size: Optional[int] = None) -> None:
+        """
+        Record the content hash of a newly stored file and persist the index.
+        
+        Args:
+            name: Stored file name (relative to the storage root)
+            file_hash: Content hash from core.utils.content_hash
+            size: File size in bytes (enables the size pre-check for this entry)
+        """
+        with self._lock:
+            previous = self._entries.get(name)
+            if previous is not None:
+                self._sizes[previous.get("size")] -= 1
+            self._entries[name] = {"hash": file_hash, "size": size, "algorithm": content_hash_algorithm()}
+            self._sizes[size] += 1
+            self._hash_to_name[file_hash] = Path(name).name
+            self._names.add(Path(name).name)
+            self._save({name: self._entries[name]})
+    
+    def remove(self, name: str) -> None:
+        """
+        Forget a deleted file and persist the index.
+        
+        Args:
+            name: Stored file name (relative to the storage root)
+        """
+        with self._lock:
+            self._names.discard(Path(name).name)
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._sizes[entry.get("size")] -= 1
+                if self._hash_to_name.get(entry["hash"]) == Path(name).name:
+                    del self._hash_to_name[entry["hash"]]
+                self._save({name: None})
+    
+    def contains_hash(self, file_hash: str) -> Optional[str]:
+        """
+        Find a stored file with the given content hash.
+        
+        Args:
+            file_hash: Content hash from core.utils.content_hash
+            
+        Returns:
+            Name of the matching stored file, or None
+        """
+        return self._hash_to_name.get(file_hash)
+    
+    def add_name(self, name: str) -> None:
+        """
+        Record a newly stored file that is not hashed (e.g. a CSV) for name checks.
+        
+        Args:
+            name: Stored file name (relative to the storage root)
+        """
+        with self._lock:
+            self._names.add(Path(name).name)
+    
+    def contains_size(self, size: int) -> bool:
+        """
+        Check whether a stored file could have content of this byte length.
+        
+        A False result proves the content is not a duplicate without hashing
+        it. Always True while any entry predates size tracking.
+        
+        Args:
+            size: Content length in bytes
+            
+        Returns:
+            True if a stored file has this size (or sizes are incomplete)
+        """
+        return self._sizes[size] > 0 or self._sizes[None] > 0
+    
+    def contains_name(self, name: str) -> bool:
+        """
+        Check whether any stored file (PDF or not) has this file name.
+        
+        Args:
+            name: File name to look up
+            
+        Returns:
+            True if a stored file has the name
+        """
+        return name in self._names
+    
+    def _read_stored(self) -> Dict[str, Dict[str, Any]]:
+        """Read the entries of the stored index file ({} if missing or unreadable)."""
+        try:
+            data = json.loads(self.storage.read_file(HASH_INDEX_FILE))
+            return data.get("files", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"Ignoring unreadable hash index, rebuilding: {e}")
+            return {}
+    
+    def _save(self, changes: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        Write the index file (atomic on both backends).
+        
+        Args:
+            changes: Entries this process changed (None for a removed file). When
+                given they are merged into the stored file rather than replacing
+                it, so entries other instances wrote since our load survive;
+                without it the reconciled in-memory entries are written as-is.
+        """
+        entries = self._entries
+        if changes is not None:
+            entries = self._read_stored()
+            for name, entry in changes.items():
+                if entry is None:
+                    entries.pop(name, None)
+                else:
+                    entries[name] = entry
+        data = json.dumps({"files": entries}, sort_keys=True).encode("utf-8")
+        try:
+            self.storage.save_file(io.BytesIO(data), HASH_INDEX_FILE)
+        except Exception as e:
+            # Not fatal: the next load re-hashes whatever the index is missing
+            log.error(f"Failed to save hash index: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_hash_index() -> HashIndex:
+    """Load the process-wide HashIndex once (failures raise and are not cached)."""
+    return HashIndex(get_storage_backend()).load()
+
+
+def get_hash_index(refresh: bool = False) -> HashIndex:
+    """
+    Get the process-wide HashIndex for the configured storage backend.
+    
+    Loaded (and reconciled) on first use, then kept current by this process's
+    add/remove. Other instances sharing the bucket change storage too, so
+    callers starting an upload batch pass refresh=True to reload the index
+    file and re-list storage once for the batch.
+    
+    Args:
+        refresh: Reload an already loaded index before returning it
+    
+    Returns:
+        HashIndex: Loaded index shared by all sessions in this process
+    """
+    if not refresh or _shared_hash_index.cache_info().currsize == 0:
+        return _shared_hash_index()
+    return _shared_hash_index().load()
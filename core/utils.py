@@ -3,19 +3,34 @@ Utility functions for common operations.
 
 Provides helper functions for:
 - File size formatting
-- Cryptographic hashing
+- Cryptographic hashing (content hashes use BLAKE3 when available)
 - Safe file writing
 - ID generation
 """
 from __future__ import annotations
 from pathlib import Path
 import hashlib
-from typing import Union
+import os
+import shutil
+from typing import BinaryIO, Callable, Union
+
+try:
+    import blake3
+except ImportError:  # optional: content hashes fall back to SHA-256
+    blake3 = None
 
 from core.logger import get_logger
 
 log = get_logger("core/utils")
 
+# Buffer size used when streaming file objects to disk
+WRITE_CHUNK_SIZE = 1024 * 1024
+# Read size used when hashing file objects incrementally
+HASH_CHUNK_SIZE = 1024 * 1024
+# Inputs at least this large are hashed by blake3 on several threads; below it
+# the thread start-up costs more than it saves
+BLAKE3_MULTITHREAD_MIN_BYTES = 4 * 1024 * 1024
+
 
 def human_size(num_bytes: Union[int, float]) -> str:
     """
@@ -85,6 +100,123 @@ def sha256_bytes(data: bytes) -> str:
     return hash_digest
 
 
+def blake3_bytes(data: Union[bytes, memoryview]) -> str:
+    """
+    Calculate the BLAKE3 hash of byte data.
+    
+    BLAKE3 is SIMD-accelerated and hashes large inputs on multiple threads,
+    so it is several times faster than SHA-256 on multi-megabyte PDFs.
+    
+    Args:
+        data: Bytes or any buffer (e.g. memoryview) to hash
+        
+    Returns:
+        str: Hexadecimal hash digest (64 chars)
+        
+    Raises:
+        RuntimeError: If the blake3 package is not installed
+        
+    Examples:
+        >>> blake3_bytes(b"hello")
+        "ea8f163db38682925e4491c5e58d4bb3506ef8c14eb78a86e908c5624a67200f"
+    """
+    if blake3 is None:
+        error_msg = "blake3 is not installed"
+        log.error(error_msg)
+        raise RuntimeError(error_msg)
+    
+    max_threads = blake3.blake3.AUTO if len(data) >= BLAKE3_MULTITHREAD_MIN_BYTES else 1
+    return blake3.blake3(data, max_threads=max_threads).hexdigest()
+
+
+def content_hash_algorithm() -> str:
+    """
+    Name of the algorithm used for upload content hashes.
+    
+    Returns:
+        str: "blake3", or "sha256" when CONTENT_HASH_ALGORITHM=sha256 is set
+        (e.g. FIPS environments) or blake3 is not installed
+    """
+    from core.config import config
+    
+    if config.content_hash_algorithm == "blake3" and blake3 is not None:
+        return "blake3"
+    return "sha256"
+
+
+def content_hash(data: Union[bytes, memoryview]) -> str:
+    """
+    Hash upload content with the configured algorithm (see content_hash_algorithm).
+    
+    Args:
+        data: Bytes, or a memoryview over them (hashed without copying)
+        
+    Returns:
+        str: Hexadecimal hash digest
+    """
+    if content_hash_algorithm() == "blake3":
+        return blake3_bytes(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_hash_stream(stream: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Hash a binary stream with the configured content hash algorithm.
+    
+    Reads fixed-size chunks from the current position, so large files are
+    never held in memory. Produces the same digest as content_hash() on
+    the full contents.
+    
+    Args:
+        stream: Readable binary file object
+        chunk_size: Bytes read per chunk
+        
+    Returns:
+        str: Hexadecimal hash digest
+        
+    Examples:
+        >>> with open("statement.pdf", "rb") as f:
+        ...     content_hash_stream(f)
+        "abc123..."
+    """
+    if content_hash_algorithm() == "blake3":
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    else:
+        hasher = hashlib.sha256()
+    
+    while chunk := stream.read(chunk_size):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def content_hash_file(file_path: Union[str, Path]) -> str:
+    """
+    Hash a local file with the configured content hash algorithm.
+    
+    With blake3 the file is memory-mapped and hashed straight from the page
+    cache (no read buffers); SHA-256 streams it in HASH_CHUNK_SIZE chunks.
+    Produces the same digest as content_hash() on the full contents.
+    
+    Args:
+        file_path: Path to a local file
+        
+    Returns:
+        str: Hexadecimal hash digest
+        
+    Examples:
+        >>> content_hash_file(Path("data/uploads/statement.pdf"))
+        "abc123..."
+    """
+    if content_hash_algorithm() == "blake3":
+        large = os.path.getsize(file_path) >= BLAKE3_MULTITHREAD_MIN_BYTES
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO if large else 1)
+        hasher.update_mmap(file_path)
+        return hasher.hexdigest()
+    
+    with open(file_path, "rb") as f:
+        return content_hash_stream(f)
+
+
 def sha256_file(file_path: Path) -> str:
     """
     Calculate SHA-256 hash of a file.
@@ -141,44 +273,57 @@ def sha256_file(file_path: Path) -> str:
         raise IOError(f"Failed to hash file: {e}")
 
 
-def safe_write(path: Path, data: bytes) -> None:
+def safe_write(path: Path, data: Union[bytes, BinaryIO]) -> None:
     """
-    Safely write bytes to a file, creating directories as needed.
+    Safely write bytes or a binary stream to a file, creating directories as needed.
     
-    Creates parent directories if they don't exist and writes data atomically.
+    Creates parent directories if they don't exist and writes data atomically:
+    content goes to a temporary sibling file that is renamed over the target
+    once complete. File-like sources are copied in WRITE_CHUNK_SIZE pieces
+    from their current position, so large uploads are never duplicated in
+    memory.
     
     Args:
         path: Path where file should be written
-        data: Bytes to write
+        data: Bytes, or a readable binary file object, to write
         
     Raises:
-        TypeError: If data is not bytes
+        TypeError: If data is neither bytes nor a readable binary stream
         IOError: If write operation fails
         
     Examples:
         >>> safe_write(Path("output/data.bin"), b"content")
+        >>> with open("input.pdf", "rb") as src:
+        ...     safe_write(Path("output/input.pdf"), src)
     """
-    if not isinstance(data, bytes):
-        error_msg = f"Expected bytes, got {type(data)}"
+    if not isinstance(data, bytes) and not hasattr(data, "read"):
+        error_msg = f"Expected bytes or binary file object, got {type(data)}"
         log.error(error_msg)
         raise TypeError(error_msg)
     
     path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
     
     try:
         # Create parent directories
         path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write file
-        with path.open("wb") as f:
-            f.write(data)
+        # Write to a temporary file, then atomically move it into place
+        with tmp_path.open("wb") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, length=WRITE_CHUNK_SIZE)
+            size = f.tell()
+        os.replace(tmp_path, path)
         
         log.debug(
             f"Safely wrote file: path={path} "
-            f"size={human_size(len(data))}"
+            f"size={human_size(size)}"
         )
         
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         log.error(
             f"Failed to write file {path}: {e}",
             exc_info=True
@@ -229,6 +374,47 @@ def make_id(*parts: str) -> str:
     return hash_id
 
 
+def make_id_with_prefix(*prefix: str) -> Callable[..., str]:
+    """
+    Build a fast ID generator for parts that share a common leading prefix.
+    
+    The returned function produces exactly the same IDs as
+    ``make_id(*prefix, *parts)``, but the prefix is hashed once and the
+    hasher state is copied per call. Intended for hot loops such as
+    per-transaction IDs within one account; per-call validation and debug
+    logging are skipped.
+    
+    Args:
+        *prefix: Leading string parts shared by every generated ID
+        
+    Returns:
+        Callable taking the remaining (at least one) string parts and
+        returning the 32-character hexadecimal ID
+        
+    Raises:
+        TypeError: If any prefix part is not a string
+        
+    Examples:
+        >>> txn_id = make_id_with_prefix("account")
+        >>> txn_id("123", "2024-01-01") == make_id("account", "123", "2024-01-01")
+        True
+    """
+    for i, part in enumerate(prefix):
+        if not isinstance(part, str):
+            error_msg = f"Prefix part {i} is not a string: {type(part)}"
+            log.error(error_msg)
+            raise TypeError(error_msg)
+    
+    base = hashlib.sha256(("||".join(prefix) + "||").encode("utf-8") if prefix else b"")
+    
+    def _make(*parts: str) -> str:
+        hasher = base.copy()
+        hasher.update("||".join(parts).encode("utf-8"))
+        return hasher.hexdigest()[:32]
+    
+    return _make
+
+
 def format_currency(amount: Union[int, float], currency: str | None = None) -> str:
     """
     Format an amount with the appropriate currency symbol or code.
@@ -1,4 +1,4 @@
-from .embedding import embed_texts
+from .embedding import embed_texts, quantize_vectors
 from .indexer import ensure_statements_index, ensure_transactions_index, ensure_transaction_alias
 from .client import es
 from .prompts import SYSTEM_PROMPT
@@ -4,6 +4,12 @@ from typing import Optional
 
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionError as ESConnectionError
+from elasticsearch.serializer import JsonSerializer
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the client's stdlib json serializer
+    orjson = None
 
 from core.config import config as cfg
 from core.logger import get_logger
@@ -13,6 +19,32 @@ log = get_logger("elastic/client")
 _client: Optional[Elasticsearch] = None
 
 
+class OrjsonSerializer(JsonSerializer):
+    """
+    JSON serializer backed by orjson.
+    
+    The bulk helpers serialize every action and document line through the
+    client's application/json serializer, so this speeds up building large
+    bulk request bodies as well as regular request bodies. NumPy arrays and
+    scalars are serialized directly.
+    """
+    
+    def dumps(self, data) -> bytes:
+        if isinstance(data, (str, bytes)):
+            return super().dumps(data)
+        return orjson.dumps(data, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def default_serializer() -> Optional[JsonSerializer]:
+    """
+    Serializer to pass to new Elasticsearch clients.
+    
+    Returns:
+        OrjsonSerializer when orjson is installed, otherwise None (client default)
+    """
+    return OrjsonSerializer() if orjson is not None else None
+
+
 def es() -> Elasticsearch:
     """
     Get or create Elasticsearch client singleton.
@@ -47,6 +79,7 @@ def es() -> Elasticsearch:
                 request_timeout=30,
                 retry_on_timeout=True,
                 max_retries=3,
+                serializer=default_serializer(),
             )
             
             # Test connection
@@ -3,17 +3,25 @@ Text embedding generation using Vertex AI.
 
 Provides functions to:
 - Generate text embeddings using Vertex AI models
-- Cache embedding model instances
+- Cache Vertex AI prediction clients
+- Persist embeddings on disk so repeated texts skip Vertex AI
 - Determine embedding dimensions
+- Quantize embeddings to int8 for byte vector storage
 """
 from __future__ import annotations
+import hashlib
+import sqlite3
+import threading
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
 
+import numpy as np
 from google.cloud import aiplatform
 from google.api_core.exceptions import GoogleAPIError
-from vertexai.language_models import TextEmbeddingModel
+from google.protobuf import json_format
+from google.protobuf.struct_pb2 import Value
 
 from core.logger import get_logger
 from core.config import config
@@ -24,45 +32,163 @@ log = get_logger("elastic/embedding")
 EMBED_MODEL_NAME = config.vertex_model_embed
 MAX_RETRY_ATTEMPTS = 3
 RETRY_DELAY_SECONDS = 2
+# Maximum instances Vertex AI accepts in a single embedding predict request
+MAX_EMBED_BATCH_SIZE = 250
+# Texts sent per predict request (VERTEX_EMBED_BATCH_SIZE, capped at the API limit)
+EMBED_BATCH_SIZE = max(1, min(config.vertex_embed_batch_size, MAX_EMBED_BATCH_SIZE))
+# Sub-batches of one embed_texts call sent concurrently over the shared channel
+EMBED_MAX_CONCURRENCY = 8
+# Persistent embedding cache (config.cache_dir/embeddings.sqlite3), evicted least-recently-used
+EMBED_DISK_CACHE_MAX_ENTRIES = 200_000
+# gRPC channel settings: keepalive pings stop idle connections between uploads
+# from being dropped; message limits match the generated transport defaults
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+]
 
 
-@lru_cache(maxsize=1)
-def _load_model(project_id: str, location: str, model_name: str = EMBED_MODEL_NAME) -> TextEmbeddingModel:
+@lru_cache(maxsize=4)
+def _get_prediction_client(location: str) -> aiplatform.gapic.PredictionServiceClient:
     """
-    Load and cache Vertex AI embedding model.
+    Create and cache a Vertex AI prediction client for a region.
     
-    Uses LRU cache to avoid reloading the model on every call.
+    The gRPC channel and credentials are set up once and reused by every
+    embedding call, instead of going through the high-level SDK wrapper
+    (per-call auth refresh and model lookup). Concurrent calls (e.g. files
+    parsed in parallel) are multiplexed over the same HTTP/2 connection.
     
     Args:
-        project_id: GCP project ID
         location: GCP region (e.g., 'us-central1')
-        model_name: Embedding model name
         
     Returns:
-        TextEmbeddingModel: Loaded embedding model
+        PredictionServiceClient: Regional prediction client
         
     Raises:
-        RuntimeError: If model initialization fails
+        RuntimeError: If client initialization fails
     """
     try:
-        log.info(
-            f"Initializing Vertex AI embedding model: "
-            f"project={project_id} location={location} model={model_name}"
-        )
+        log.info(f"Initializing Vertex AI prediction client: location={location}")
         
-        aiplatform.init(project=project_id, location=location)
-        model = TextEmbeddingModel.from_pretrained(model_name)
+        # One HTTP/2 channel per region, kept alive between ingests so later
+        # embedding calls skip the TCP/TLS handshake
+        transport_cls = aiplatform.gapic.PredictionServiceClient.get_transport_class("grpc")
+        host = f"{location}-aiplatform.googleapis.com:443"
+        channel = transport_cls.create_channel(host, options=GRPC_CHANNEL_OPTIONS)
+        client = aiplatform.gapic.PredictionServiceClient(
+            transport=transport_cls(host=host, channel=channel)
+        )
         
-        log.info(f"Vertex AI embedding model loaded successfully: {model_name}")
-        return model
+        log.info(f"Vertex AI prediction client ready: location={location}")
+        return client
         
     except Exception as e:
         log.error(
-            f"Failed to load Vertex AI embedding model: "
-            f"model={model_name} error={e}",
+            f"Failed to initialize Vertex AI prediction client: "
+            f"location={location} error={e}",
             exc_info=True
         )
-        raise RuntimeError(f"Failed to load embedding model: {e}")
+        raise RuntimeError(f"Failed to initialize prediction client: {e}")
+
+
+class _EmbeddingDiskCache:
+    """
+    SQLite-backed LRU of embedding vectors keyed by (model, text).
+    
+    Keys are blake2b digests of "model|text", so a change of
+    VERTEX_MODEL_EMBED simply misses and old-model rows age out. Vectors are
+    stored as float32 bytes. Errors are logged and treated as misses; the
+    cache never fails an embedding call.
+    """
+    
+    def __init__(self, path, max_entries: int = EMBED_DISK_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return hashlib.blake2b(f"{model_name}|{text}".encode(), digest_size=16).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+            self._conn = conn
+        return self._conn
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for the given keys and mark them recently used."""
+        found: Dict[str, List[float]] = {}
+        if not keys:
+            return found
+        try:
+            with self._lock:
+                conn = self._connect()
+                # Stay well under SQLite's bound-parameter limit
+                for offset in range(0, len(keys), 500):
+                    chunk = keys[offset:offset + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                if found:
+                    now = time.time()
+                    with conn:
+                        conn.executemany(
+                            "UPDATE embeddings SET used = ? WHERE key = ?",
+                            [(now, key) for key in found]
+                        )
+        except sqlite3.Error as e:
+            log.warning(f"Embedding cache read failed: path={self.path} error={e}")
+        return found
+    
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """Store vectors and evict the least recently used rows beyond max_entries."""
+        if not items:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                now = time.time()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, used) VALUES (?, ?, ?)",
+                        [
+                            (key, np.asarray(vec, dtype=np.float32).tobytes(), now)
+                            for key, vec in items.items()
+                        ]
+                    )
+                    (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+                    if count > self.max_entries:
+                        conn.execute(
+                            "DELETE FROM embeddings WHERE key IN "
+                            "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+                            (count - self.max_entries,)
+                        )
+        except sqlite3.Error as e:
+            log.warning(f"Embedding cache write failed: path={self.path} error={e}")
+
+
+_embed_disk_cache = _EmbeddingDiskCache(config.cache_dir / "embeddings.sqlite3")
+
+
+def _endpoint_path(project_id: str, location: str, model_name: str) -> str:
+    """Build the publisher model endpoint path used by PredictionServiceClient.predict."""
+    return f"projects/{project_id}/locations/{location}/publishers/google/models/{model_name}"
 
 
 def embed_texts(
@@ -75,8 +201,10 @@ def embed_texts(
     """
     Generate embeddings for a list of texts.
     
-    Automatically batches requests to Vertex AI and includes retry logic.
-    Returns embeddings in the same order as input texts.
+    Texts already embedded with the same model are served from the on-disk
+    cache; the rest are batched to Vertex AI (up to EMBED_MAX_CONCURRENCY
+    batches in flight) with retry logic. Returns embeddings in the same
+    order as input texts.
     
     Args:
         texts: List of text strings to embed
@@ -127,39 +255,105 @@ def embed_texts(
         log.error(error_msg)
         raise ValueError(error_msg)
     
+    # Serve repeats (e.g. recurring merchants across monthly statements) from disk
+    keys = [_EmbeddingDiskCache.key(model_name, t) for t in non_empty_texts]
+    cached = _embed_disk_cache.get_many(list(dict.fromkeys(keys)))
+    # Distinct uncached texts, embedded once each
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, non_empty_texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+    
+    log.info(
+        f"Generating embeddings: count={len(non_empty_texts)} cached={len(non_empty_texts) - len(missing)} "
+        f"model={model_name} total_chars={sum(len(t) for t in missing.values())}"
+    )
+    
+    # Vertex caps instances per predict request, so send fixed-size sub-batches;
+    # several are in flight at once so their latencies overlap
+    to_embed = list(missing.values())
+    batches = [
+        to_embed[offset:offset + EMBED_BATCH_SIZE]
+        for offset in range(0, len(to_embed), EMBED_BATCH_SIZE)
+    ]
+    
+    def predict(batch: List[str]) -> List[List[float]]:
+        return _predict_batch(batch, project_id=project_id, location=location, model_name=model_name)
+    
+    fresh: List[List[float]] = []
+    if len(batches) == 1:
+        fresh = predict(batches[0])
+    elif batches:
+        with ThreadPoolExecutor(max_workers=min(len(batches), EMBED_MAX_CONCURRENCY)) as pool:
+            # map preserves input order, so vectors stay aligned with the texts
+            for batch_vectors in pool.map(predict, batches):
+                fresh.extend(batch_vectors)
+    
+    embedded = dict(zip(missing, fresh))
+    _embed_disk_cache.put_many(embedded)
+    cached.update(embedded)
+    vectors = [cached[key] for key in keys]
+    
+    # Validate all embeddings have same dimension
+    dimensions = {len(v) for v in vectors}
+    if len(dimensions) > 1:
+        log.warning(f"Inconsistent embedding dimensions: {dimensions}")
+    
+    elapsed = time.time() - start_time
     log.info(
-        f"Generating embeddings: count={len(non_empty_texts)} "
-        f"model={model_name} total_chars={sum(len(t) for t in non_empty_texts)}"
+        f"Generated embeddings successfully: "
+        f"count={len(vectors)} dim={len(vectors[0])} "
+        f"batches={len(batches)} elapsed={elapsed:.2f}s"
     )
     
+    return vectors
+
+
+def _predict_batch(
+    texts: List[str],
+    *,
+    project_id: str,
+    location: str,
+    model_name: str,
+) -> List[List[float]]:
+    """
+    Embed one sub-batch of texts with a single predict call, retrying transient errors.
+    
+    Args:
+        texts: Non-empty texts (at most EMBED_BATCH_SIZE)
+        project_id: GCP project ID
+        location: GCP region
+        model_name: Embedding model name
+        
+    Returns:
+        List of embedding vectors in input order
+        
+    Raises:
+        RuntimeError: If embedding generation fails after retries
+    """
     # Retry logic for transient errors
     last_error = None
     for attempt in range(MAX_RETRY_ATTEMPTS):
         try:
-            model = _load_model(project_id, location, model_name)
+            client = _get_prediction_client(location)
             
-            # Generate embeddings (Vertex AI handles batching internally)
-            response = model.get_embeddings(non_empty_texts)
+            # Single predict call with all texts as instances
+            instances = [json_format.ParseDict({"content": t}, Value()) for t in texts]
+            response = client.predict(
+                endpoint=_endpoint_path(project_id, location, model_name),
+                instances=instances
+            )
             
             # Extract vectors
-            vectors = [embedding.values for embedding in response]
+            vectors = [list(p["embeddings"]["values"]) for p in response.predictions]
             
-            if not vectors:
-                raise RuntimeError("Empty embeddings returned from Vertex AI")
-            
-            # Validate all embeddings have same dimension
-            dimensions = [len(v) for v in vectors]
-            if len(set(dimensions)) > 1:
-                log.warning(
-                    f"Inconsistent embedding dimensions: {set(dimensions)}"
+            if len(vectors) != len(texts):
+                raise RuntimeError(
+                    f"Vertex AI returned {len(vectors)} embeddings for {len(texts)} texts"
                 )
             
-            elapsed = time.time() - start_time
-            log.info(
-                f"Generated embeddings successfully: "
-                f"count={len(vectors)} dim={len(vectors[0])} "
-                f"elapsed={elapsed:.2f}s attempt={attempt + 1}"
-            )
+            if attempt > 0:
+                log.info(f"Embedding batch succeeded on attempt {attempt + 1}")
             
             return vectors
             
@@ -240,3 +434,36 @@ def embedding_dim(
             exc_info=True
         )
         raise RuntimeError(f"Failed to determine embedding dimension: {e}")
+
+
+def quantize_vectors(vectors: List[List[float]]) -> Tuple[List[List[int]], List[float]]:
+    """
+    Quantize embedding vectors to int8 for Elasticsearch byte dense_vectors.
+    
+    Each vector is scaled independently so its largest component maps to 127.
+    Cosine similarity is scale-invariant, so the per-vector scale only needs to
+    be stored if the original magnitudes must be recovered (value = q * scale).
+    
+    Args:
+        vectors: List of float embedding vectors (all the same dimension)
+        
+    Returns:
+        Tuple of (quantized vectors as int lists, per-vector scales)
+        
+    Examples:
+        >>> q, scales = quantize_vectors([[0.5, -1.0, 0.25]])
+        >>> q
+        [[64, -127, 32]]
+    """
+    if not vectors:
+        return [], []
+    
+    arr = np.asarray(vectors, dtype=np.float32)
+    max_abs = np.max(np.abs(arr), axis=1, keepdims=True)
+    # Guard all-zero vectors against division by zero
+    max_abs[max_abs == 0] = 1.0
+    
+    quantized = np.clip(np.rint(arr * (127.0 / max_abs)), -128, 127).astype(np.int8)
+    scales = (max_abs[:, 0] / 127.0).tolist()
+    
+    return quantized.tolist(), scales
@@ -6,7 +6,7 @@ from core.config import config
 from models.intent import IntentClassification, IntentResponse
 from elastic.client import es
 from elastic.query_builders import q_aggregate, q_trend, q_listing, q_text_qa, q_hybrid
-from elastic.embedding import embed_texts
+from elastic.embedding import embed_texts, quantize_vectors
 
 log = get_logger("elastic/executors")
 
@@ -379,6 +379,9 @@ def execute_text_qa(user_query: str, plan: IntentClassification, size: int = 10)
                 model_name=config.vertex_model_embed
             )
             query_embedding = embeddings[0]
+            if config.elastic_vector_element_type == "byte":
+                # Byte vector fields require int8 query vectors
+                query_embedding = quantize_vectors([query_embedding])[0][0]
             
             # Build kNN query
             vector_query = {
@@ -10,17 +10,31 @@ Provides functions for:
 from __future__ import annotations
 import os
 import time
+from collections.abc import Iterable, Sized
 from typing import Dict, Any, List, Optional
 
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ApiError, NotFoundError
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import bulk, parallel_bulk
 
+from core.config import config
 from core.logger import get_logger
+from .client import default_serializer
 from .mappings import mapping_transactions, mapping_statements
 
 log = get_logger("elastic/indexer")
 
+# Bulk request sizing for large ingests (documents / bytes per request; ES_BULK_CHUNK_SIZE)
+BULK_CHUNK_SIZE = max(1, config.es_bulk_chunk_size)
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+# Concurrent bulk requests (Elasticsearch indexes each request on its own write thread; ES_BULK_THREADS)
+BULK_THREAD_COUNT = max(1, config.es_bulk_threads)
+BULK_QUEUE_SIZE = 4
+# Refresh interval restored after a bulk load (Elasticsearch default)
+DEFAULT_REFRESH_INTERVAL = "1s"
+# Translog size that triggers a flush on write-heavy indices created here (None keeps the cluster default)
+TRANSLOG_FLUSH_THRESHOLD_SIZE: Optional[str] = None
+
 
 def es_client() -> Elasticsearch:
     """
@@ -45,7 +59,12 @@ def es_client() -> Elasticsearch:
             raise RuntimeError(error_msg)
         
         log.debug(f"Creating Elasticsearch client for endpoint: {endpoint}")
-        return Elasticsearch(endpoint, api_key=api_key, request_timeout=30)
+        return Elasticsearch(
+            endpoint,
+            api_key=api_key,
+            request_timeout=30,
+            serializer=default_serializer()
+        )
         
     except RuntimeError:
         raise
@@ -117,20 +136,33 @@ def index_docs(index_name: str, docs: List[Dict[str, Any]]) -> int:
     if not docs:
         return 0
     # Use bulk API for speed
-    from elasticsearch.helpers import bulk
-
     actions = [{"_op_type": "index", "_index": index_name, "_source": d} for d in docs]
     success, _ = bulk(es, actions)
     log.info(f"Indexed {success} document(s) into {index_name}")
     return success
 
-def ensure_statements_index(index_name: str, *, vector_dim: Optional[int] = None):
+def _write_settings(refresh_interval: str, translog_flush_threshold_size: Optional[str]) -> Dict[str, Any]:
+    """Index settings applied at creation for bulk-loaded indices."""
+    settings: Dict[str, Any] = {"refresh_interval": refresh_interval}
+    if translog_flush_threshold_size:
+        settings["translog"] = {"flush_threshold_size": translog_flush_threshold_size}
+    return {"index": settings}
+
+def ensure_statements_index(
+    index_name: str,
+    *,
+    vector_dim: Optional[int] = None,
+    refresh_interval: str = DEFAULT_REFRESH_INTERVAL,
+    translog_flush_threshold_size: Optional[str] = TRANSLOG_FLUSH_THRESHOLD_SIZE,
+):
     """
     Ensure statements index exists, creating it if necessary.
     
     Args:
         index_name: Name of the statements index
         vector_dim: Embedding dimension for vector field (optional)
+        refresh_interval: Refresh interval set at creation
+        translog_flush_threshold_size: Translog flush threshold set at creation (optional)
         
     Raises:
         ApiError: If index creation fails
@@ -145,9 +177,10 @@ def ensure_statements_index(index_name: str, *, vector_dim: Optional[int] = None
             return
         
         log.info(f"Creating statements index: {index_name} with vector_dim={vector_dim}")
-        mapping = mapping_statements(vector_dim)
+        body = mapping_statements(vector_dim, config.elastic_vector_element_type)
+        body["settings"] = _write_settings(refresh_interval, translog_flush_threshold_size)
         
-        es.indices.create(index=index_name, body=mapping)
+        es.indices.create(index=index_name, body=body)
         
         log.info(f"Successfully created statements index: {index_name} (dim={vector_dim})")
         
@@ -164,7 +197,13 @@ def ensure_statements_index(index_name: str, *, vector_dim: Optional[int] = None
         )
         raise
 
-def ensure_transactions_index(index_pattern: str, *, vector_dim: Optional[int] = None):
+def ensure_transactions_index(
+    index_pattern: str,
+    *,
+    vector_dim: Optional[int] = None,
+    refresh_interval: str = DEFAULT_REFRESH_INTERVAL,
+    translog_flush_threshold_size: Optional[str] = TRANSLOG_FLUSH_THRESHOLD_SIZE,
+):
     """
     Ensure transactions data stream exists, creating it if necessary.
     
@@ -174,6 +213,8 @@ def ensure_transactions_index(index_pattern: str, *, vector_dim: Optional[int] =
     Args:
         index_pattern: Base pattern for data stream (e.g., 'finsync-transactions')
         vector_dim: Embedding dimension for vector field (optional)
+        refresh_interval: Refresh interval for backing indices
+        translog_flush_threshold_size: Translog flush threshold for backing indices (optional)
         
     Raises:
         ApiError: If data stream creation fails
@@ -193,7 +234,10 @@ def ensure_transactions_index(index_pattern: str, *, vector_dim: Optional[int] =
         body = {
             "index_patterns": [f"{index_pattern}*"],
             "data_stream": {},
-            "template": mapping_transactions(vector_dim),
+            "template": {
+                **mapping_transactions(vector_dim, config.elastic_vector_element_type),
+                "settings": _write_settings(refresh_interval, translog_flush_threshold_size),
+            },
             "priority": 200  # High priority to override default templates
         }
         
@@ -273,6 +317,35 @@ def ensure_transaction_alias(alias_name: str, index_pattern: str):
         )
         raise
 
+def set_refresh_interval(index: str, interval: str) -> bool:
+    """
+    Update the refresh interval of an index or data stream.
+    
+    Setting "-1" disables periodic refreshes, which avoids creating a new
+    segment every second while a bulk load is running. For data streams the
+    setting is applied to all backing indices.
+    
+    Best-effort: the interval only affects indexing speed, so a failed update
+    is logged and reported to the caller instead of raised.
+    
+    Args:
+        index: Index or data stream name
+        interval: Refresh interval (e.g. "1s", "30s", "-1")
+        
+    Returns:
+        bool: True if the setting was applied
+    """
+    log.info(f"Setting refresh_interval={interval} on {index}")
+    
+    try:
+        es = es_client()
+        es.indices.put_settings(index=index, settings={"index": {"refresh_interval": interval}})
+        return True
+        
+    except Exception as e:
+        log.warning(f"Could not set refresh_interval={interval} on {index}: {e}")
+        return False
+
 def _strip_none(d: Dict[str, Any]) -> Dict[str, Any]:
     """
     Remove None values from dictionary.
@@ -287,17 +360,32 @@ def _strip_none(d: Dict[str, Any]) -> Dict[str, Any]:
     """
     return {k: v for k, v in d.items() if v is not None}
 
-def bulk_index(index: str, docs: List[Dict[str, Any]], *, id_field: Optional[str] = None) -> int:
+def bulk_index(
+    index: str,
+    docs: Iterable[Any],
+    *,
+    id_field: Optional[str] = None,
+    chunk_size: int = 500,
+    max_chunk_bytes: int = 100 * 1024 * 1024,
+    thread_count: int = BULK_THREAD_COUNT,
+) -> int:
     """
     Bulk index documents into Elasticsearch.
     
     Automatically detects data streams and uses appropriate operation type.
+    Documents are consumed lazily and sent chunk by chunk on a pool of
+    worker threads, so passing a generator keeps peak memory bounded by
+    roughly queue size x chunk size rather than the total document count.
     Handles partial failures gracefully and logs detailed error information.
     
     Args:
         index: Target index or data stream name
-        docs: List of document dictionaries to index
+        docs: Iterable (list or generator) of document dictionaries, or
+            objects exposing ``to_source()``, to index
         id_field: Optional field name to use as document ID
+        chunk_size: Number of documents per bulk request
+        max_chunk_bytes: Maximum size of a single bulk request in bytes
+        thread_count: Number of bulk requests sent concurrently
         
     Returns:
         int: Number of successfully indexed documents
@@ -312,13 +400,13 @@ def bulk_index(index: str, docs: List[Dict[str, Any]], *, id_field: Optional[str
     """
     start_time = time.time()
     
-    if not docs:
+    if isinstance(docs, Sized) and not docs:
         log.debug("No documents to index, skipping bulk operation")
         return 0
     
     log.info(
         f"Starting bulk index operation: index={index} "
-        f"doc_count={len(docs)} id_field={id_field or 'auto'}"
+        f"id_field={id_field or 'auto'} chunk_size={chunk_size} threads={thread_count}"
     )
     
     try:
@@ -337,51 +425,51 @@ def bulk_index(index: str, docs: List[Dict[str, Any]], *, id_field: Optional[str
         except NotFoundError:
             log.debug(f"Target '{index}' is a regular index, using op_type=index")
         
-        # Prepare bulk actions
-        actions = []
-        total_size = 0
-        
-        for i, d in enumerate(docs):
-            clean = _strip_none(d)
-            
-            # Estimate document size for logging
-            total_size += len(str(clean))
-            
-            action = {
-                "_op_type": op_type,
-                "_index": index,
-                "_source": clean
-            }
-            
-            # Add document ID if specified
-            if id_field and clean.get(id_field):
-                action["_id"] = clean[id_field]
-            
-            actions.append(action)
-        
-        avg_size = total_size / len(actions) if actions else 0
-        log.debug(
-            f"Prepared {len(actions)} bulk actions: "
-            f"total_size={total_size} bytes avg_size={avg_size:.0f} bytes/doc"
-        )
-        
-        # Execute bulk operation
-        ok, details = bulk(es, actions, raise_on_error=False, stats_only=False)
+        # Build bulk actions lazily so only the in-flight chunk is held in memory
+        def _actions():
+            for d in docs:
+                # Document objects (e.g. TransactionDoc) build their own None-free source
+                clean = d.to_source() if hasattr(d, "to_source") else _strip_none(d)
+                
+                action = {
+                    "_op_type": op_type,
+                    "_index": index,
+                    "_source": clean
+                }
+                
+                # Add document ID if specified
+                if id_field and clean.get(id_field):
+                    action["_id"] = clean[id_field]
+                
+                yield action
         
-        # Parse results and collect failures
+        # Execute bulk operation, collecting failures as results stream back
+        ok = 0
+        total = 0
         failed = []
-        if isinstance(details, list):
-            for item in details:
+        for success, item in parallel_bulk(
+            es,
+            _actions(),
+            thread_count=thread_count,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            queue_size=BULK_QUEUE_SIZE,
+            raise_on_error=False,
+        ):
+            total += 1
+            if success:
+                ok += 1
+            else:
                 # Extract metadata from response
-                meta = item.get("index") or item.get("create") or item.get("update") or {}
-                status = meta.get("status", 200)
-                
-                if status >= 300:
-                    failed.append(meta)
+                failed.append(item.get("index") or item.get("create") or item.get("update") or {})
+        
+        if total == 0:
+            log.debug("No documents to index, skipping bulk operation")
+            return 0
         
         # Log failures
         if failed:
-            log.warning(f"Bulk operation had {len(failed)} failures out of {len(actions)} documents")
+            log.warning(f"Bulk operation had {len(failed)} failures out of {total} documents")
             
             # Log first 10 failures with details
             for i, f in enumerate(failed[:10]):
@@ -396,13 +484,13 @@ def bulk_index(index: str, docs: List[Dict[str, Any]], *, id_field: Optional[str
                 log.error(f"... and {len(failed) - 10} more failures (not shown)")
         
         # Calculate success rate
-        success_rate = (ok / len(actions) * 100) if actions else 0
+        success_rate = ok / total * 100
         elapsed = time.time() - start_time
         docs_per_sec = ok / elapsed if elapsed > 0 else 0
         
         log.info(
             f"Bulk index completed: index={index} "
-            f"success={ok}/{len(actions)} ({success_rate:.1f}%) "
+            f"success={ok}/{total} ({success_rate:.1f}%) "
             f"failed={len(failed)} elapsed={elapsed:.2f}s "
             f"throughput={docs_per_sec:.0f} docs/sec"
         )
@@ -1,4 +1,4 @@
-def mapping_transactions(vector_dim: int | None = None):
+def mapping_transactions(vector_dim: int | None = None, element_type: str = "float"):
     props = {
         "@timestamp": {"type": "date"},
         "accountNo": {"type": "keyword"},
@@ -14,10 +14,11 @@ def mapping_transactions(vector_dim: int | None = None):
         "sourceFile": {"type": "keyword"},
     }
     if vector_dim:
-        props["desc_vector"] = {"type": "dense_vector","dims": vector_dim,"index": True,"similarity":"cosine"}
+        props["desc_vector"] = {"type": "dense_vector","dims": vector_dim,"element_type": element_type,"index": True,"similarity":"cosine"}
+        props["vector_scale"] = {"type": "float", "index": False}
     return {"mappings": {"properties": props}}
 
-def mapping_statements(vector_dim: int):
+def mapping_statements(vector_dim: int, element_type: str = "float"):
     return {
         "mappings": {
             "properties": {
@@ -27,7 +28,8 @@ def mapping_statements(vector_dim: int):
                 "statementFrom": {"type": "date"},
                 "statementTo": {"type": "date"},
                 "summary_text": {"type": "text"},
-                "summary_vector": {"type":"dense_vector","dims": vector_dim,"index": True,"similarity":"cosine"},
+                "summary_vector": {"type":"dense_vector","dims": vector_dim,"element_type": element_type,"index": True,"similarity":"cosine"},
+                "vector_scale": {"type": "float", "index": False},
                 "meta": {"type": "object", "enabled": True}
             }
         }
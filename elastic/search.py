@@ -12,7 +12,7 @@ from typing import List, Dict, Any
 from elasticsearch.exceptions import ApiError
 
 from elastic.client import es
-from elastic.embedding import embed_texts
+from elastic.embedding import embed_texts, quantize_vectors
 from core.logger import get_logger
 from core.config import config as cfg
 
@@ -43,12 +43,17 @@ def _vector_query(user_query: str, k: int = 12) -> Dict[str, Any]:
             model_name=cfg.vertex_model_embed
         )
         
+        query_vector = embedding[0]
+        if cfg.elastic_vector_element_type == "byte":
+            # Byte vector fields require int8 query vectors
+            query_vector = quantize_vectors([query_vector])[0][0]
+        
         query = {
             "knn": {
                 "field": cfg.elastic_vector_field,
                 "k": k,
                 "num_candidates": k * 4,
-                "query_vector": embedding[0]
+                "query_vector": query_vector
             }
         }
         
@@ -1,2 +1,3 @@
-from .pdf_reader import read_pdf
+from .pdf_reader import read_pdf, read_pdf_bytes
 from .parser_vertex import parse_pdf_to_json
+from .parser_csv_fast import parse_csv_fast
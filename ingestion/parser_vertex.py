@@ -1,4 +1,5 @@
 from __future__ import annotations
+import functools
 import json
 import time
 import csv
@@ -8,8 +9,8 @@ from datetime import datetime
 
 from pydantic import ValidationError
 from core.logger import get_logger
-from models.schema import ParsedStatement, StatementItem
-from ingestion.pdf_reader import read_pdf
+from models.schema import Page, ParsedStatement, StatementItem
+from ingestion.pdf_reader import PDFReadResult, read_pdf
 
 # Vertex AI
 from google.cloud import aiplatform
@@ -82,10 +83,15 @@ TEXT (may include multiple pages):
 ---
 """
 
+@functools.lru_cache(maxsize=8)
 def _init_vertex(project_id: str, location: str, model_name: str = DEFAULT_VERTEX_MODEL) -> GenerativeModel:
     """
     Initialize Vertex AI and create a GenerativeModel instance.
     
+    Cached per (project, location, model), so parsing several files reuses
+    one model handle instead of re-initializing the SDK for every file.
+    Failures raise and are not cached.
+    
     Args:
         project_id: GCP project ID
         location: GCP region (e.g., 'us-central1')
@@ -386,6 +392,7 @@ def parse_pdf_to_json(
     gcp_project: str,
     gcp_location: str,
     vertex_model: str = DEFAULT_VERTEX_MODEL,
+    pre_parsed: Optional[PDFReadResult] = None,
 ) -> ParsedStatement:
     """
     Complete pipeline: Extract text from PDF and parse to structured bank statement.
@@ -402,6 +409,8 @@ def parse_pdf_to_json(
         gcp_project: GCP project ID for Vertex AI
         gcp_location: GCP region (e.g., 'us-central1')
         vertex_model: Vertex AI model name (default: gemini-1.5-pro)
+        pre_parsed: Result of an earlier read_pdf() on the same file; when
+            given, the PDF is not opened and decoded a second time
         
     Returns:
         Validated ParsedStatement with all transactions
@@ -430,8 +439,8 @@ def parse_pdf_to_json(
     )
     
     try:
-        # Step 1: Extract text from PDF
-        pdf = read_pdf(pdf_path, password=password)
+        # Step 1: Extract text from PDF (reuse an earlier decode if the caller has one)
+        pdf = pre_parsed if pre_parsed is not None else read_pdf(pdf_path, password=password)
         text = "\n\n".join(pdf.pages).strip()
         
         if not text:
@@ -643,7 +652,7 @@ def parse_csv_to_json(
             statementFrom=statement_from,
             statementTo=statement_to,
             bankName=bank_name or "",
-            statements=items,
+            pages=[Page(pageNumber=1, statements=items)],
         )
         
         elapsed = time.time() - start_time
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, List, Optional, Dict, Any
+import io
+import itertools
 import time
 
 from PyPDF2 import PdfReader, errors as pypdf_errors
@@ -48,13 +50,22 @@ class PDFReadResult:
     pages: List[str]
 
 
-def _pypdf2_extract(path: Path, password: Optional[str]) -> PDFReadResult:
+def _pypdf2_extract(
+    path: Path,
+    password: Optional[str],
+    stream: Optional[BinaryIO] = None,
+    max_pages: Optional[int] = None,
+) -> PDFReadResult:
     """
     Primary, fast extractor using PyPDF2. Handles decryption if needed.
     
     Args:
-        path: Path to the PDF file
+        path: Path to the PDF file (only used for naming when stream is given)
         password: Optional password for encrypted PDFs
+        stream: In-memory PDF to read instead of opening path
+        max_pages: Only extract text from this many leading pages (pages are
+            parsed lazily, so the rest are never decoded); num_pages still
+            reports the document's page count
         
     Returns:
         PDFReadResult with extracted text and metadata
@@ -66,7 +77,9 @@ def _pypdf2_extract(path: Path, password: Optional[str]) -> PDFReadResult:
     log.debug(f"Starting PyPDF2 extraction: path={path.name}")
     
     try:
-        reader = PdfReader(str(path))
+        if stream is not None:
+            stream.seek(0)
+        reader = PdfReader(stream if stream is not None else str(path))
     except pypdf_errors.PdfReadError as e:
         log.error(f"PyPDF2 failed to open PDF: path={path.name} error={e!r}")
         raise
@@ -114,7 +127,7 @@ def _pypdf2_extract(path: Path, password: Optional[str]) -> PDFReadResult:
     pages_text: List[str] = []
     failed_pages = 0
     
-    for page_num, page in enumerate(reader.pages, start=1):
+    for page_num, page in enumerate(itertools.islice(reader.pages, max_pages), start=1):
         try:
             txt = page.extract_text() or ""
             pages_text.append(txt)
@@ -148,19 +161,20 @@ def _pypdf2_extract(path: Path, password: Optional[str]) -> PDFReadResult:
     return PDFReadResult(
         path=str(path),
         encrypted=encrypted,
-        num_pages=len(pages_text),
+        num_pages=len(pages_text) if max_pages is None else len(reader.pages),
         meta=meta,
         pages=pages_text,
     )
 
 
-def _pdfminer_extract(path: Path, password: Optional[str]) -> List[str]:
+def _pdfminer_extract(path: Path, password: Optional[str], stream: Optional[BinaryIO] = None) -> List[str]:
     """
     Fallback extractor using pdfminer.six when PyPDF2 produces poor results.
     
     Args:
-        path: Path to the PDF file
+        path: Path to the PDF file (only used for naming when stream is given)
         password: Optional password for encrypted PDFs
+        stream: In-memory PDF to read instead of opening path
         
     Returns:
         List of extracted text, one string per page
@@ -175,7 +189,9 @@ def _pdfminer_extract(path: Path, password: Optional[str]) -> List[str]:
         pages_text: List[str] = []
         page_count = 0
         
-        for page_layout in extract_pages(str(path), password=password or ""):
+        if stream is not None:
+            stream.seek(0)
+        for page_layout in extract_pages(stream if stream is not None else str(path), password=password or ""):
             page_count += 1
             chunks: List[str] = []
             
@@ -190,7 +206,9 @@ def _pdfminer_extract(path: Path, password: Optional[str]) -> List[str]:
         # Last resort: try whole-document extraction if no pages found
         if not pages_text:
             log.warning(f"pdfminer page extraction yielded no pages, trying whole-doc extraction: path={path.name}")
-            text = pdfminer_extract_text(str(path), password=password or "") or ""
+            if stream is not None:
+                stream.seek(0)
+            text = pdfminer_extract_text(stream if stream is not None else str(path), password=password or "") or ""
             pages_text = [text] if text else [""]
             
         total_chars = sum(len(p) for p in pages_text)
@@ -300,7 +318,7 @@ def _safe_meta(info: Dict[str, Any] | Any, key: str) -> Optional[str]:
         return None
 
 
-def read_pdf(path: str | Path, password: Optional[str] = None) -> PDFReadResult:
+def read_pdf(path: str | Path, password: Optional[str] = None, max_pages: Optional[int] = None) -> PDFReadResult:
     """
     Public API to read and extract text from a PDF file.
     
@@ -313,6 +331,9 @@ def read_pdf(path: str | Path, password: Optional[str] = None) -> PDFReadResult:
     Args:
         path: Path to the PDF file (string or Path object)
         password: Optional password for encrypted PDFs
+        max_pages: Only extract text from this many leading pages, e.g. for
+            a quick preview (num_pages is still the full count; no pdfminer
+            fallback). None reads the whole document
         
     Returns:
         PDFReadResult containing extracted text, metadata, and file info
@@ -351,19 +372,82 @@ def read_pdf(path: str | Path, password: Optional[str] = None) -> PDFReadResult:
         f"size={file_size_mb:.2f}MB password_provided={bool(password)}"
     )
     
+    return _extract(pdf_path, password, start_time, max_pages=max_pages)
+
+
+def read_pdf_bytes(
+    data: bytes,
+    name: str,
+    password: Optional[str] = None,
+    max_pages: Optional[int] = None,
+) -> PDFReadResult:
+    """
+    Read and extract text from a PDF held in memory.
+    
+    Same extraction as read_pdf, for content that is already in memory (e.g.
+    an upload), so it does not have to be written to or fetched from storage
+    first.
+    
+    Args:
+        data: PDF file contents
+        name: File name, used for logging and as PDFReadResult.path
+        password: Optional password for encrypted PDFs
+        max_pages: Only extract text from this many leading pages (see read_pdf)
+        
+    Returns:
+        PDFReadResult containing extracted text, metadata, and file info
+        
+    Raises:
+        pypdf_errors.FileNotDecryptedError: If PDF is encrypted and password is wrong/missing
+        pypdf_errors.PdfReadError: If PDF is malformed or unreadable
+        PDFSyntaxError: If PDF structure is invalid
+        Exception: For other unexpected errors
+        
+    Example:
+        >>> result = read_pdf_bytes(uploaded.getvalue(), uploaded.name)
+        >>> print(f"Extracted {result.num_pages} pages")
+    """
+    start_time = time.time()
+    log.info(
+        f"Starting PDF extraction: path={name} (in memory) "
+        f"size={len(data) / (1024 * 1024):.2f}MB password_provided={bool(password)}"
+    )
+    return _extract(Path(name), password, start_time, stream=io.BytesIO(data), max_pages=max_pages)
+
+
+def _extract(
+    pdf_path: Path,
+    password: Optional[str],
+    start_time: float,
+    stream: Optional[BinaryIO] = None,
+    max_pages: Optional[int] = None,
+) -> PDFReadResult:
+    """
+    Run PyPDF2 extraction with pdfminer fallback on a file or in-memory stream.
+    
+    Args:
+        pdf_path: Path to the PDF file (only used for naming when stream is given)
+        password: Optional password for encrypted PDFs
+        start_time: time.time() when the read started (for elapsed logging)
+        stream: In-memory PDF to read instead of opening pdf_path
+        max_pages: Only extract this many leading pages; skips the fallback
+        
+    Returns:
+        PDFReadResult containing extracted text, metadata, and file info
+    """
     try:
         # Primary extraction with PyPDF2
-        primary = _pypdf2_extract(pdf_path, password)
+        primary = _pypdf2_extract(pdf_path, password, stream, max_pages)
         
-        # Check if fallback to pdfminer is needed
-        if _needs_fallback(primary.pages):
+        # Check if fallback to pdfminer is needed (partial reads are previews only)
+        if max_pages is None and _needs_fallback(primary.pages):
             log.warning(
                 f"PyPDF2 extraction insufficient (avg chars/page < {MIN_TEXT_LEN_PER_PAGE}). "
                 f"Attempting pdfminer fallback: path={pdf_path.name}"
             )
             
             try:
-                fallback_pages = _pdfminer_extract(pdf_path, password)
+                fallback_pages = _pdfminer_extract(pdf_path, password, stream)
                 result = PDFReadResult(
                     path=str(pdf_path),
                     encrypted=primary.encrypted,
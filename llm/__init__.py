@@ -1,3 +1,4 @@
-from .vertex_chat import chat_vertex, build_user_prompt, compose_aggregate_answer, compose_text_qa_answer, compose_aggregate_filtered_answer
+from .vertex_chat import chat_vertex, chat_vertex_stream, classify_and_answer, build_user_prompt, compose_aggregate_answer, compose_text_qa_answer, compose_aggregate_filtered_answer
 from .intent_router import classify_intent, classify_intent_safe, classify_intent_with_context
-from .intent_executor import execute_intent
\ No newline at end of file
+from .local_intent import classify_intent_local
+from .intent_executor import execute_intent, execute_intents
\ No newline at end of file
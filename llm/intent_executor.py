@@ -1,6 +1,7 @@
 """Orchestrate intent execution by routing to appropriate executors and composers."""
 from __future__ import annotations
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
 from core.logger import get_logger
 from models.intent import IntentResponse
 from elastic.executors import execute_aggregate, execute_trend, execute_listing, execute_text_qa, execute_aggregate_filtered_by_text
@@ -8,6 +9,9 @@ from llm.vertex_chat import compose_aggregate_answer, compose_text_qa_answer, co
 
 log = get_logger("llm/intent_executor")
 
+# Upper bound on intents executed concurrently for one query
+MULTI_INTENT_MAX_WORKERS = 4
+
 
 def execute_intent(query: str, intent_response: IntentResponse) -> Dict[str, Any]:
     """
@@ -73,6 +77,34 @@ def execute_intent(query: str, intent_response: IntentResponse) -> Dict[str, Any
         }
 
 
+def execute_intents(query: str, intent_response: IntentResponse, intents: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute several intents for the same query in parallel.
+    
+    Each intent reuses the classification's filters and metrics; the
+    Elasticsearch queries and answer composition for different intents are
+    independent, so they run concurrently instead of one after another.
+    
+    Args:
+        query: User's query string
+        intent_response: Intent classification response (filters shared by all intents)
+        intents: Intent types to execute, primary first
+        
+    Returns:
+        Dict of intent type -> execute_intent result, in the order given
+    """
+    log.info(f"Executing {len(intents)} intents in parallel: {intents}")
+    responses = [
+        intent_response.model_copy(update={
+            "classification": intent_response.classification.model_copy(update={"intent": intent})
+        })
+        for intent in intents
+    ]
+    with ThreadPoolExecutor(max_workers=min(len(intents), MULTI_INTENT_MAX_WORKERS)) as pool:
+        results = list(pool.map(lambda response: execute_intent(query, response), responses))
+    return dict(zip(intents, results))
+
+
 def _execute_aggregate(query: str, plan) -> Dict[str, Any]:
     """Execute aggregate intent."""
     log.info("Executing aggregate intent")
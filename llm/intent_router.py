@@ -56,6 +56,7 @@ Do NOT answer the question. Do NOT compute numbers. Do NOT invent fields.
 - If the user asks a total **for a named concept** that must be discovered in statements (e.g., "all fees mentioned", "bkash spend if it appears in statements") → aggregate_filtered_by_text.
 - If the user says "show/list" of transactions → listing (transactions). If list of pages/snippets → text_qa.
 - If user requests citations/sources/pages → provenance (and set provenance=true).
+- If the query asks for two kinds of result at once (e.g. "show and total my June expenses" → listing + aggregate), classify the main one as intent and list the others in alternativeIntents with their confidence; otherwise leave alternativeIntents empty.
 - If ambiguous merchant-like token (e.g., "bkash") with an explicit total → aggregate; BUT if you cannot be sure it's a transactions merchant without confirming via statements, prefer aggregate_filtered_by_text with confidence lowered to 0.65–0.75.
 
 ### Guardrails
@@ -83,7 +84,8 @@ Return JSON matching this schema:
   "needsClarification": boolean,
   "clarifyQuestion": string | null,
   "provenance": boolean,
-  "reasoning": string | null
+  "reasoning": string | null,
+  "alternativeIntents": [{{"intent": string, "confidence": number (0.0-1.0)}}]
 }}
 
 ONLY output valid JSON. No markdown, no backticks, no explanation."""
@@ -289,6 +291,8 @@ def classify_intent_with_context(
                 context_lines.append(f"User clarified: {text}")
             elif turn_type == "confirmation":
                 context_lines.append(f"User {text}")
+            elif turn_type == "summary":
+                context_lines.append(f"Earlier in the conversation: {text}")
         
         context_lines.append("")  # Empty line for separation
     
@@ -0,0 +1,148 @@
+"""Local, rule-based intent classification for unambiguous queries."""
+from __future__ import annotations
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from core.logger import get_logger
+from models.intent import IntentClassification, IntentResponse
+
+log = get_logger("llm/local_intent")
+
+# Confidence reported for a query routed by a single unambiguous keyword group
+LOCAL_MATCH_CONFIDENCE = 0.9
+
+# Intent -> keywords that route to it
+LOCAL_INTENT_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "aggregate": frozenset({"total", "sum", "average", "avg", "count", "many", "much", "top", "net"}),
+    "trend": frozenset({"trend", "trends", "daily", "weekly", "monthly", "over", "time"}),
+    "listing": frozenset({"list"}),
+}
+
+# Query word -> metric it asks for
+LOCAL_METRIC_WORDS: Dict[str, str] = {
+    "income": "sum_income",
+    "earned": "sum_income",
+    "earnings": "sum_income",
+    "expense": "sum_expense",
+    "expenses": "sum_expense",
+    "spend": "sum_expense",
+    "spent": "sum_expense",
+    "spending": "sum_expense",
+    "net": "net",
+    "count": "count",
+    "many": "count",
+    "average": "avg",
+    "avg": "avg",
+    "merchants": "top_merchants",
+    "categories": "top_categories",
+}
+
+# Words that carry no routing signal but are allowed in a local match
+LOCAL_FILLER_WORDS: FrozenSet[str] = frozenset({
+    "a", "all", "am", "and", "are", "did", "do", "i", "is", "me", "my", "of",
+    "please", "the", "transaction", "transactions", "what", "whats", "how", "by",
+    "per", "in", "show",
+})
+
+_GRANULARITY_WORDS = {"daily": "daily", "weekly": "weekly", "monthly": "monthly"}
+_TOKEN_RE = re.compile(r"[a-z']+|\S")
+
+# Every word a locally classified query may contain. Anything else (dates,
+# amounts, merchant names, account numbers) needs filter extraction, which
+# only the LLM router does.
+_LOCAL_VOCABULARY: FrozenSet[str] = (
+    LOCAL_FILLER_WORDS
+    | frozenset(LOCAL_METRIC_WORDS)
+    | frozenset(_GRANULARITY_WORDS)
+    | frozenset().union(*LOCAL_INTENT_KEYWORDS.values())
+)
+
+
+def _tokens(query: str) -> Optional[List[str]]:
+    """Split a query into words; None if it contains anything outside the local vocabulary."""
+    tokens = [t.replace("'", "") for t in _TOKEN_RE.findall(query.lower()) if t not in "?.!,"]
+    if not tokens or any(t not in _LOCAL_VOCABULARY for t in tokens):
+        return None
+    return tokens
+
+
+def _score(tokens: List[str]) -> Tuple[Optional[str], float]:
+    """
+    Route to the only intent whose keywords appear.
+
+    Queries hitting no group or several groups ("monthly total") are not
+    routed, and neither are listings that name a metric ("list my spending"),
+    which ask for an aggregate as much as a table.
+    """
+    matched = [
+        intent for intent, keywords in LOCAL_INTENT_KEYWORDS.items()
+        if any(t in keywords for t in tokens)
+    ]
+    if len(matched) != 1:
+        return None, 0.0
+    intent = matched[0]
+    if intent == "listing" and any(t in LOCAL_METRIC_WORDS for t in tokens):
+        return None, 0.0
+    return intent, LOCAL_MATCH_CONFIDENCE
+
+
+def classify_intent_local(query: str) -> Tuple[Optional[IntentResponse], float]:
+    """
+    Classify a query without an LLM call when its wording is unambiguous.
+
+    Only queries made entirely of known intent, metric and filler words are
+    routed; those have no dates, amounts or names to extract, so an empty
+    filter set is exact rather than a guess.
+
+    Args:
+        query: User's financial query
+
+    Returns:
+        Tuple of (intent response or None, confidence)
+
+    Examples:
+        >>> response, confidence = classify_intent_local("show my monthly spending trend")
+        >>> response.classification.intent, confidence
+        ('trend', 0.9)
+        >>> response, confidence = classify_intent_local("sum of all my transactions")
+        >>> response.classification.intent, confidence
+        ('aggregate', 0.9)
+        >>> classify_intent_local("show my spending")
+        (None, 0.0)
+        >>> classify_intent_local("list my spending")
+        (None, 0.0)
+        >>> classify_intent_local("monthly total")
+        (None, 0.0)
+    """
+    start_time = time.time()
+    tokens = _tokens(query)
+    if tokens is None:
+        return None, 0.0
+
+    intent, confidence = _score(tokens)
+    if intent is None:
+        return None, 0.0
+
+    metrics = list(dict.fromkeys(LOCAL_METRIC_WORDS[t] for t in tokens if t in LOCAL_METRIC_WORDS))
+    granularity = next((_GRANULARITY_WORDS[t] for t in tokens if t in _GRANULARITY_WORDS), "monthly")
+    if intent == "trend":
+        metrics = [f"{granularity}_trend"]
+
+    classification = IntentClassification(
+        intent=intent,
+        metrics=metrics,
+        granularity=granularity,
+        needsTable=intent == "listing",
+        confidence=confidence,
+        reasoning="Matched locally by keywords",
+    )
+    processing_time = (time.time() - start_time) * 1000
+    log.info(f"Intent classified locally: intent={intent} confidence={confidence} query='{query}'")
+    return IntentResponse(
+        query=query,
+        classification=classification,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        processing_time_ms=round(processing_time, 2)
+    ), confidence
@@ -1,14 +1,21 @@
-from typing import Dict, Any, List
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from google.cloud import aiplatform
+from pydantic import ValidationError
 from core.config import config as cfg
 from core.logger import get_logger as log
 from elastic import SYSTEM_PROMPT
+from models.intent import IntentClassification, IntentResponse
 
 log = log("llm/vertex_chat")
 
 def init_vertex():
-    log.info(f"Initializing Vertex AI: {cfg.gcp_project_id}@{cfg.gcp_location}")
-    aiplatform.init(project=cfg.gcp_project_id, location=cfg.gcp_location)
+    # aiplatform.init sets process-wide defaults; only the first call does work
+    if not hasattr(init_vertex, "_initialized"):
+        log.info(f"Initializing Vertex AI: {cfg.gcp_project_id}@{cfg.gcp_location}")
+        aiplatform.init(project=cfg.gcp_project_id, location=cfg.gcp_location)
+        init_vertex._initialized = True
 
 def _short(s: str, n: int = 140) -> str:
     s = s or ""
@@ -439,3 +446,161 @@ def chat_vertex(question: str, statements, transactions) -> str:
         # Log full context safely
         log.exception(f"Vertex chat failed: {e}")
         return f"Sorry, I couldn't generate an answer ({type(e).__name__})."
+
+
+def chat_vertex_stream(question: str, statements, transactions) -> Iterator[str]:
+    """
+    Streaming variant of chat_vertex: yields answer text deltas as Vertex AI generates them.
+    
+    On failure yields the same apology message chat_vertex returns (after any
+    text already streamed).
+    """
+    log.info(f"Streaming chat with Vertex AI: question={question}")
+    from vertexai.generative_models import GenerativeModel
+    init_vertex()
+    try:
+        model = GenerativeModel(cfg.vertex_model_genai)
+        user_prompt = build_user_prompt(question, statements, transactions)
+        log.debug(f"User prompt: {user_prompt}")
+        produced = False
+        for chunk in model.generate_content([SYSTEM_PROMPT, user_prompt], stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. the final finish-reason chunk)
+                continue
+            if text:
+                produced = True
+                yield text
+        if not produced:
+            yield "(no response)"
+    except Exception as e:
+        log.exception(f"Vertex chat stream failed: {e}")
+        yield f"Sorry, I couldn't generate an answer ({type(e).__name__})."
+
+
+# Structured intents the fused request can hand off to execute_intent; anything
+# answerable from the supplied search results is answered directly instead
+FUSED_INTENT_TOOLS: Dict[str, str] = {
+    "aggregate": "Totals, sums, counts, averages or top-N computed over all matching transactions.",
+    "trend": "Time-series trend (daily, weekly or monthly) of income, expense or net.",
+    "listing": "A table of transactions, e.g. 'show last 10 bkash transactions'.",
+    "aggregate_filtered_by_text": "Total for a concept that must first be found in statements, then aggregated.",
+    "provenance": "The user asks for source evidence or citations (pages, statementId).",
+}
+
+FUSED_TOOL_PARAMETERS: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "filters": {
+            "type": "object",
+            "properties": {
+                "accountNo": {"type": "string"},
+                "dateFrom": {"type": "string", "description": "YYYY-MM-DD"},
+                "dateTo": {"type": "string", "description": "YYYY-MM-DD"},
+                "counterparty": {"type": "string"},
+                "minAmount": {"type": "number"},
+                "maxAmount": {"type": "number"},
+            },
+        },
+        "metrics": {
+            "type": "array",
+            "items": {
+                "type": "string",
+                "enum": [
+                    "sum_income", "sum_expense", "net", "count", "avg", "top_merchants",
+                    "top_categories", "monthly_trend", "weekly_trend", "daily_trend",
+                ],
+            },
+        },
+        "granularity": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
+        "needsTable": {"type": "boolean"},
+        "answerStyle": {"type": "string", "enum": ["concise", "detailed"]},
+        "confidence": {"type": "number", "description": "0.0-1.0"},
+        "needsClarification": {"type": "boolean"},
+        "clarifyQuestion": {"type": "string"},
+        "provenance": {"type": "boolean"},
+    },
+    "required": ["confidence"],
+}
+
+FUSED_ROUTING_PROMPT = """
+Routing:
+- Current date: {current_date} (resolve relative dates to YYYY-MM-DD).
+- If the question needs numbers computed over ALL transactions (totals, trends, listings,
+  concept totals or source citations), do NOT answer: call the matching tool with the plan.
+- If the confidence of your plan is below 0.6, set needsClarification=true and clarifyQuestion.
+- Otherwise answer directly from the search results below.
+"""
+
+
+def classify_and_answer(
+    question: str,
+    statements,
+    transactions,
+) -> Tuple[Optional[IntentResponse], Optional[str]]:
+    """
+    Classify and answer a question in a single Vertex AI request.
+    
+    The model is given the search results plus one tool per structured
+    intent. It either calls a tool (the query needs execute_intent) or
+    answers directly from the results, saving the separate classification
+    round-trip.
+    
+    Args:
+        question: User query
+        statements: Statement hits used as grounding
+        transactions: Transaction hits used as grounding
+        
+    Returns:
+        Tuple of (intent response, None) on a tool call, (None, answer) on a
+        direct answer, or (None, None) if the request failed or returned nothing
+    """
+    start_time = time.time()
+    log.info(f"Fused classify-and-answer: question={question}")
+    from vertexai.generative_models import FunctionDeclaration, GenerationConfig, GenerativeModel, Tool
+    init_vertex()
+    try:
+        tool = Tool(function_declarations=[
+            FunctionDeclaration(name=name, description=description, parameters=FUSED_TOOL_PARAMETERS)
+            for name, description in FUSED_INTENT_TOOLS.items()
+        ])
+        system_prompt = SYSTEM_PROMPT + FUSED_ROUTING_PROMPT.format(
+            current_date=datetime.now(timezone.utc).date().isoformat()
+        )
+        model = GenerativeModel(cfg.vertex_model_genai, tools=[tool])
+        resp = model.generate_content(
+            [system_prompt, build_user_prompt(question, statements, transactions)],
+            generation_config=GenerationConfig(temperature=0.0),
+        )
+        
+        calls = resp.candidates[0].function_calls if resp.candidates else []
+        if not calls:
+            answer = (resp.text or "").strip()
+            if not answer:
+                # Neither a tool call nor text: let the caller fall back to the two-step path
+                log.warning("Fused request returned no function call and no text")
+                return None, None
+            log.info(f"Fused request answered directly in {(time.time() - start_time) * 1000:.0f}ms")
+            return None, answer
+        
+        call = calls[0]
+        args = {k: v for k, v in call.to_dict().get("args", {}).items() if v is not None}
+        classification = IntentClassification(intent=call.name, **args)
+        processing_time = (time.time() - start_time) * 1000
+        log.info(
+            f"Fused request routed to intent={classification.intent} "
+            f"confidence={classification.confidence} time={processing_time:.0f}ms"
+        )
+        return IntentResponse(
+            query=question,
+            classification=classification,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            processing_time_ms=round(processing_time, 2)
+        ), None
+    except ValidationError as e:
+        log.error(f"Fused request returned an invalid plan: {e}")
+        return None, None
+    except Exception as e:
+        log.exception(f"Fused classify-and-answer failed: {e}")
+        return None, None
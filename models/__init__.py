@@ -1,8 +1,10 @@
 # Models package
 from .intent import (
+    AlternativeIntent,
     IntentClassification,
     IntentFilters,
     IntentResponse,
     ConversationTurn,
     ConversationContext
 )
+from .documents import TransactionDoc
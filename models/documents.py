@@ -0,0 +1,79 @@
+"""Elasticsearch document models built during ingestion."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(slots=True)
+class TransactionDoc:
+    """
+    Transaction document destined for the transactions data stream.
+
+    Slotted so large statements hold compact objects rather than one dict per
+    row; the ``_source`` dict is only built by ``to_source`` while the bulk
+    request for its chunk is being assembled.
+
+    Attributes:
+        id: Deterministic transaction ID
+        accountNo: Account number
+        bankName: Bank name
+        accountName: Account holder name
+        type: 'credit' or 'debit'
+        amount: Absolute transaction amount
+        description: Transaction description
+        currency: Statement currency
+        sourceStatementId: Parent statement document ID
+        sourceFile: Uploaded source filename
+        timestamp: Transaction date (ISO string), also used for @timestamp
+        pageNumber: Page the transaction appeared on
+        balance: Running balance after the transaction, if present
+        category: Transaction category, if assigned
+        desc_vector: Description embedding (float32 array, or int8 values)
+        vector_scale: Per-vector scale for int8 embeddings
+    """
+    id: str
+    accountNo: str
+    bankName: Optional[str]
+    accountName: Optional[str]
+    type: str
+    amount: float
+    description: str
+    currency: Optional[str]
+    sourceStatementId: str
+    sourceFile: str
+    timestamp: str
+    pageNumber: Optional[int]
+    balance: Optional[float] = None
+    category: Optional[str] = None
+    desc_vector: Optional[Union["np.ndarray", List[float], List[int]]] = None
+    vector_scale: Optional[float] = None
+
+    def to_source(self) -> Dict[str, Any]:
+        """
+        Build the Elasticsearch ``_source`` for this transaction.
+
+        Returns:
+            Document dict with None-valued fields omitted
+        """
+        source = {
+            "id": self.id,
+            "accountNo": self.accountNo,
+            "type": self.type,
+            "amount": self.amount,
+            "description": self.description,
+            "sourceStatementId": self.sourceStatementId,
+            "sourceFile": self.sourceFile,
+            "timestamp": self.timestamp,
+            "@timestamp": self.timestamp,
+        }
+        for key in (
+            "bankName", "accountName", "currency", "pageNumber",
+            "balance", "category", "desc_vector", "vector_scale",
+        ):
+            value = getattr(self, key)
+            if value is not None:
+                source[key] = value
+        return source
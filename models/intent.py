@@ -15,17 +15,26 @@ class IntentFilters(BaseModel):
     maxAmount: Optional[float] = None
 
 
+IntentType = Literal[
+    "aggregate",
+    "text_qa",
+    "aggregate_filtered_by_text",
+    "listing",
+    "trend",
+    "provenance"
+]
+
+
+class AlternativeIntent(BaseModel):
+    """A secondary intent the same query also asks for."""
+    intent: IntentType
+    confidence: float = Field(default=0.0, ge=0.0, le=1.0)
+
+
 class IntentClassification(BaseModel):
     """Intent classification result from LLM."""
     
-    intent: Literal[
-        "aggregate",
-        "text_qa",
-        "aggregate_filtered_by_text",
-        "listing",
-        "trend",
-        "provenance"
-    ] = Field(..., description="The classified intent type")
+    intent: IntentType = Field(..., description="The classified intent type")
     
     filters: IntentFilters = Field(
         default_factory=IntentFilters,
@@ -78,6 +87,11 @@ class IntentClassification(BaseModel):
         default=None,
         description="Brief reasoning for classification (optional)"
     )
+    
+    alternativeIntents: List[AlternativeIntent] = Field(
+        default_factory=list,
+        description="Other intents the query also asks for (e.g. listing + aggregate)"
+    )
 
 
 class IntentResponse(BaseModel):
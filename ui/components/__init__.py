@@ -11,11 +11,12 @@ from .clarification_dialog import (
 )
 from .intent_results import (
     render_intent_results,
+    render_multi_intent_results,
     render_aggregate_results,
     render_trend_results,
     render_listing_results
 )
-from .uploaded_files_display import render_uploaded_files_display
+from .uploaded_files_display import render_uploaded_files_display, invalidate_uploaded_files_list
 
 __all__ = [
     "render_upload_form",
@@ -28,9 +29,11 @@ __all__ = [
     "render_conversation_context_display",
     "render_clarification_mode_indicator",
     "render_intent_results",
+    "render_multi_intent_results",
     "render_aggregate_results",
     "render_trend_results",
     "render_listing_results",
     "render_uploaded_files_display",
+    "invalidate_uploaded_files_list",
 ]
 
@@ -2,7 +2,7 @@
 from __future__ import annotations
 from typing import List, Dict
 import streamlit as st
-from ui.components.intent_results import render_intent_results
+from ui.components.intent_results import render_intent_results, render_multi_intent_results
 
 
 def render_chat_history(history: List[Dict], max_turns: int = 10) -> None:
@@ -10,7 +10,8 @@ def render_chat_history(history: List[Dict], max_turns: int = 10) -> None:
     Render chat history in a clean chat interface style.
     
     Args:
-        history: List of chat turns with 'q', 'a', and 'results' keys
+        history: List of chat turns with 'q', 'a', and 'results' keys (search hits
+            are stored as IDs; see SessionManager.get_full_results_for_turn)
         max_turns: Maximum number of turns to display
     """
     if not history:
@@ -33,6 +34,11 @@ def render_chat_history(history: List[Dict], max_turns: int = 10) -> None:
             results = turn.get("results", {})
             intent_result = results.get("intent_result")
             
+            # Queries answered by several intents render one tab per intent
+            if results.get("intent_results"):
+                st.divider()
+                render_multi_intent_results(results["intent_results"])
+            
             # If we have intent data, render the visual components
             if intent_result and turn.get("intent"):
                 intent_type = turn["intent"].get("classification", {}).get("intent")
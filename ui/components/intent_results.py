@@ -375,3 +375,15 @@ def render_intent_results(intent: str, data: Dict[str, Any], citations: List[Dic
     else:
         st.info(f"No visualization available for intent: {intent}")
 
+
+def render_multi_intent_results(results: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Render results for a query that asked for several intents, one tab each.
+    
+    Args:
+        results: Intent type -> result data (with an optional 'citations' key)
+    """
+    tabs = st.tabs([intent.replace("_", " ").title() for intent in results])
+    for tab, (intent, data) in zip(tabs, results.items()):
+        with tab:
+            render_intent_results(intent, data, data.get("citations", []))
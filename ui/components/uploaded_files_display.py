@@ -1,6 +1,8 @@
 """Component to display previously uploaded files."""
 from __future__ import annotations
-from typing import List, Dict
+import html
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import streamlit as st
@@ -12,68 +14,91 @@ from ui.services import UploadService
 
 log = get_logger("ui/components/uploaded_files_display")
 
+# Concurrent size lookups when listing files (network-bound on GCS)
+_SIZE_LOOKUP_WORKERS = 16
+# Seconds a storage listing is reused across reruns (uploads/deletes here clear it sooner)
+_FILES_LIST_TTL = 60
+
 
 def get_uploaded_files_list() -> List[Dict]:
     """
     Get list of uploaded files from storage backend.
     
+    Memoized across Streamlit reruns for _FILES_LIST_TTL seconds, so widget
+    interactions do not re-list the bucket; call invalidate_uploaded_files_list()
+    after changing stored files.
+    
     Returns:
         List of file info dictionaries with name, size, and modified date
     """
     try:
-        storage = get_storage_backend()
-        files = storage.list_files()
-        
-        # Filter for PDF files only
-        pdf_files = [f for f in files if f.lower().endswith('.pdf')]
-        
-        file_list = []
-        for file_path in pdf_files:
-            try:
-                filename = Path(file_path).name
-                
-                # Try to get file size
-                try:
-                    file_content = storage.read_file(file_path)
-                    size_bytes = len(file_content)
-                    size_human = _format_size(size_bytes)
-                except Exception as e:
-                    log.warning(f"Could not read file size for {filename}: {e}")
-                    size_bytes = 0
-                    size_human = "Unknown"
-                
-                file_list.append({
-                    "name": filename,
-                    "path": file_path,
-                    "size_bytes": size_bytes,
-                    "size_human": size_human
-                })
-            except Exception as e:
-                log.error(f"Error processing file {file_path}: {e}")
-                continue
-        
-        # Sort by name
-        file_list.sort(key=lambda x: x["name"].lower())
-        
-        return file_list
-        
+        return _list_uploaded_files()
     except Exception as e:
         log.error(f"Error retrieving uploaded files: {e}")
         return []
 
 
+def invalidate_uploaded_files_list() -> None:
+    """Drop the memoized listing so the next render reads storage again."""
+    _list_uploaded_files.clear()
+
+
+@st.cache_data(show_spinner=False, ttl=_FILES_LIST_TTL)
+def _list_uploaded_files() -> List[Dict]:
+    """List stored PDFs with sizes (failures raise, so they are not cached)."""
+    storage = get_storage_backend()
+    # PDF files only, filtered by the backend
+    pdf_files = storage.list_files(suffix=".pdf")
+    
+    # Size lookups are independent (one HEAD request each on GCS), so run them concurrently
+    def _safe_size(file_path: str) -> Optional[int]:
+        try:
+            return storage.get_file_size(file_path)
+        except Exception as e:
+            log.warning(f"Could not read file size for {Path(file_path).name}: {e}")
+            return None
+    
+    if pdf_files:
+        with ThreadPoolExecutor(max_workers=min(_SIZE_LOOKUP_WORKERS, len(pdf_files))) as executor:
+            sizes = list(executor.map(_safe_size, pdf_files))
+    else:
+        sizes = []
+    
+    file_list = []
+    for file_path, size_bytes in zip(pdf_files, sizes):
+        file_list.append({
+            "name": Path(file_path).name,
+            "path": file_path,
+            "size_bytes": size_bytes or 0,
+            "size_human": _format_size(size_bytes) if size_bytes is not None else "Unknown"
+        })
+    
+    # Sort by name
+    file_list.sort(key=lambda x: x["name"].lower())
+    
+    return file_list
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def _format_size(size_bytes: int) -> str:
     """Format size in bytes to human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
+    size_bytes = int(size_bytes)
+    if size_bytes <= 0:
+        return "0.0 B"
+    # Each unit is 2**10 larger, so the bit length picks the unit directly
+    exponent = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * exponent)):.1f} {_SIZE_UNITS[exponent]}"
 
 
+@st.fragment
 def render_uploaded_files_display() -> None:
     """
     Display all previously uploaded files.
+    
+    Runs as a fragment: Refresh, the delete picker and Delete rerun only this
+    section, not the upload form or the ingest status above it.
     """
     st.divider()
     
@@ -83,7 +108,8 @@ def render_uploaded_files_display() -> None:
         st.subheader("📁 Previously Uploaded Files")
     with col2:
         if st.button("🔄 Refresh", use_container_width=True):
-            st.rerun()
+            invalidate_uploaded_files_list()
+            st.rerun(scope="fragment")
     
     with st.spinner("Loading uploaded files..."):
         files = get_uploaded_files_list()
@@ -107,32 +133,40 @@ def render_uploaded_files_display() -> None:
         storage_type = "GCS" if config.environment == "production" and config.gcs_bucket else "Local"
         st.metric("Storage Type", storage_type)
     
-    st.caption("These files have been successfully uploaded and indexed. Use the 🗑️ button to delete files that failed to process.")
-    
-    # Display files in a compact list
-    with st.container():
-        for idx, file_info in enumerate(files, 1):
-            col1, col2, col3 = st.columns([3, 1, 1])
-            
-            with col1:
-                st.markdown(f"**{idx}.** 📄 `{file_info['name']}`")
-            
-            with col2:
-                st.markdown(f"<div style='text-align: right;'>{file_info['size_human']}</div>", unsafe_allow_html=True)
-            
-            with col3:
-                # Add delete button for each file
-                if st.button("🗑️", key=f"delete_{file_info['name']}", help="Delete this file", use_container_width=True):
-                    with st.spinner(f"Deleting {file_info['name']}..."):
-                        if UploadService.delete_file(file_info['name']):
-                            st.success(f"✅ Deleted {file_info['name']}")
-                            st.rerun()
-                        else:
-                            st.error(f"❌ Failed to delete {file_info['name']}")
-            
-            # Add subtle separator between files
-            if idx < len(files):
-                st.markdown("<hr style='margin: 0.3rem 0; opacity: 0.1; border: none; height: 1px; background: #ccc;'>", unsafe_allow_html=True)
+    st.caption("These files have been successfully uploaded and indexed. Use 🗑️ Delete below to remove files that failed to process.")
+    
+    # Display files in a compact list, emitted as a single HTML block instead of per-row widgets
+    rows = ["<table style='width: 100%; border-collapse: collapse;'>"]
+    for idx, file_info in enumerate(files, 1):
+        rows.append(
+            "<tr style='border-bottom: 1px solid rgba(204, 204, 204, 0.1);'>"
+            f"<td><b>{idx}.</b> 📄 <code>{html.escape(file_info['name'])}</code></td>"
+            f"<td style='text-align: right;'>{file_info['size_human']}</td>"
+            "</tr>"
+        )
+    rows.append("</table>")
+    st.markdown("".join(rows), unsafe_allow_html=True)
+    
+    # Single delete control for the whole list
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        file_to_delete = st.selectbox(
+            "Select a file to delete",
+            options=[f["name"] for f in files],
+            index=None,
+            placeholder="Select a file to delete",
+            label_visibility="collapsed",
+            key="delete_file_select"
+        )
+    with col2:
+        if st.button("🗑️ Delete", disabled=file_to_delete is None, help="Delete the selected file", use_container_width=True):
+            with st.spinner(f"Deleting {file_to_delete}..."):
+                if UploadService.delete_file(file_to_delete):
+                    invalidate_uploaded_files_list()
+                    st.success(f"✅ Deleted {file_to_delete}")
+                    st.rerun(scope="fragment")
+                else:
+                    st.error(f"❌ Failed to delete {file_to_delete}")
     
     # Optional: Add expander with more details
     with st.expander("📊 View detailed file information"):
@@ -1,8 +1,8 @@
 """UI services module."""
 from .session_manager import SessionManager
-from .upload_service import UploadService
+from .upload_service import BufferedUpload, UploadService
 from .parse_service import ParseService
 from .clarification_manager import ClarificationManager
 
-__all__ = ["SessionManager", "UploadService", "ParseService", "ClarificationManager"]
+__all__ = ["SessionManager", "BufferedUpload", "UploadService", "ParseService", "ClarificationManager"]
 
@@ -1,7 +1,9 @@
 """Clarification management service for interactive query refinement."""
 from __future__ import annotations
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
+import threading
+import weakref
 
 from core.logger import get_logger
 from models.intent import IntentResponse, ConversationContext
@@ -9,6 +11,11 @@ from ui.services.session_manager import SessionManager
 
 log = get_logger("ui/services/clarification_manager")
 
+# model_dump() results keyed by id() of live IntentResponse objects (pydantic
+# models are unhashable, so no WeakKeyDictionary); entries drop when the model dies
+_intent_dumps: Dict[int, Tuple[weakref.ref, Dict[str, Any]]] = {}
+_intent_dumps_lock = threading.Lock()
+
 
 class ClarificationManager:
     """Manages clarification flow and decision logic."""
@@ -16,6 +23,58 @@ class ClarificationManager:
     # Maximum number of clarification attempts before proceeding anyway
     MAX_CLARIFICATION_ITERATIONS = 2
     
+    # Conversation-derived strings kept per session (most recent versions only)
+    CONTEXT_CACHE_SIZE = 8
+    
+    @staticmethod
+    def _cached_conversation_text(kind: str, build: Callable[[List[str], List[str]], str]) -> str:
+        """
+        Return text derived from the current conversation, rebuilding it only
+        when the conversation version has changed.
+        
+        Args:
+            kind: Name of the derived text (part of the cache key)
+            build: Builds the text from the conversation's turn types and texts
+        """
+        cache = SessionManager.get_conversation_text_cache()
+        key = (kind, SessionManager.get_conversation_version())
+        text = cache.get(key)
+        if text is None:
+            text = build(*SessionManager.get_conversation_columns())
+            cache[key] = text
+            # Dicts keep insertion order, so the oldest entries come first
+            while len(cache) > ClarificationManager.CONTEXT_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        return text
+    
+    @staticmethod
+    def dump_intent(intent: Optional[IntentResponse]) -> Optional[Dict[str, Any]]:
+        """
+        Serialize an intent response once and reuse the dict for the same object.
+        
+        The returned dict is shared; callers must treat it as read-only.
+        
+        Args:
+            intent: Intent classification response (or None)
+            
+        Returns:
+            intent.model_dump() result, or None
+        """
+        if intent is None:
+            return None
+        
+        key = id(intent)
+        with _intent_dumps_lock:
+            entry = _intent_dumps.get(key)
+            if entry is not None and entry[0]() is intent:
+                return entry[1]
+        
+        dumped = intent.model_dump()
+        ref = weakref.ref(intent, lambda _ref, key=key: _drop_intent_dump(key, _ref))
+        with _intent_dumps_lock:
+            _intent_dumps[key] = (ref, dumped)
+        return dumped
+    
     @staticmethod
     def should_ask_for_confirmation(intent: IntentResponse) -> bool:
         """
@@ -76,7 +135,9 @@ class ClarificationManager:
             query: User's query
             intent: Intent classification response
         """
-        log.info(f"Entering confirmation mode for query: '{query}' (confidence: {intent.classification.confidence})")
+        log.info("Entering confirmation mode for query: '{}' (confidence: {})", query, intent.classification.confidence)
+        # Serialize once now; the search that follows reuses the same dict
+        ClarificationManager.dump_intent(intent)
         
         # Store state
         SessionManager.set_pending_query(query)
@@ -101,7 +162,9 @@ class ClarificationManager:
             query: User's query
             intent: Intent classification response
         """
-        log.info(f"Entering clarification mode for query: '{query}'")
+        log.info("Entering clarification mode for query: '{}'", query)
+        # Serialize once now; the search that follows reuses the same dict
+        ClarificationManager.dump_intent(intent)
         
         # Store state
         SessionManager.set_pending_query(query)
@@ -118,6 +181,7 @@ class ClarificationManager:
         SessionManager.add_conversation_turn("clarification_request", clarify_question or "", {
             "confidence": intent.classification.confidence
         })
+        SessionManager.increment_clarification_count()
         
         # Track intent
         SessionManager.add_intent_to_history(query, intent.classification.confidence)
@@ -136,7 +200,7 @@ class ClarificationManager:
         pending_query = SessionManager.get_pending_query()
         
         if confirmed:
-            log.info(f"User confirmed query: '{pending_query}'")
+            log.info("User confirmed query: '{}'", pending_query)
             SessionManager.add_conversation_turn("confirmation", "yes", {
                 "action": "confirmed"
             })
@@ -144,7 +208,7 @@ class ClarificationManager:
             SessionManager.set_clarification_mode(None)
             return True, pending_query
         else:
-            log.info(f"User rejected query: '{pending_query}'")
+            log.info("User rejected query: '{}'", pending_query)
             SessionManager.add_conversation_turn("confirmation", "no", {
                 "action": "rejected"
             })
@@ -163,7 +227,7 @@ class ClarificationManager:
         Returns:
             Tuple of (needs_reclassification, cumulative_query)
         """
-        log.info(f"User provided clarification: '{clarification}'")
+        log.info("User provided clarification: '{}'", clarification)
         
         # Add clarification to conversation
         SessionManager.add_conversation_turn("clarification_response", clarification)
@@ -171,17 +235,16 @@ class ClarificationManager:
         # Build cumulative query
         cumulative_query = SessionManager.get_cumulative_query()
         
-        log.debug(f"Cumulative query after clarification: '{cumulative_query}'")
+        log.debug("Cumulative query after clarification: '{}'", cumulative_query)
         
-        # Check iteration count
-        conversation = SessionManager.get_current_conversation()
-        clarification_count = sum(
-            1 for turn in conversation 
-            if turn["type"] == "clarification_request"
-        )
+        # Check iteration count (maintained alongside the conversation, no rescan)
+        clarification_count = SessionManager.get_clarification_count()
         
         if clarification_count >= ClarificationManager.MAX_CLARIFICATION_ITERATIONS:
-            log.warning(f"Reached max clarification iterations ({ClarificationManager.MAX_CLARIFICATION_ITERATIONS}), proceeding anyway")
+            log.warning(
+                "Reached max clarification iterations ({}), proceeding anyway",
+                ClarificationManager.MAX_CLARIFICATION_ITERATIONS
+            )
             SessionManager.set_clarification_mode(None)
             return False, cumulative_query
         
@@ -196,15 +259,19 @@ class ClarificationManager:
         Returns:
             Formatted conversation context string
         """
-        conversation = SessionManager.get_current_conversation()
-        
-        if not conversation:
+        return ClarificationManager._cached_conversation_text(
+            "llm_context", ClarificationManager._format_conversation_context
+        )
+    
+    @staticmethod
+    def _format_conversation_context(types: List[str], texts: List[str]) -> str:
+        """Format conversation turns for an LLM prompt."""
+        if not types:
             return ""
         
         lines = ["### Previous Conversation:"]
-        for turn in conversation:
-            turn_type = turn["type"]
-            text = turn["text"]
+        for i, turn_type in enumerate(types):
+            text = texts[i]
             
             if turn_type == "query":
                 lines.append(f"User originally asked: {text}")
@@ -218,6 +285,44 @@ class ClarificationManager:
         lines.append("")  # Empty line for separation
         return "\n".join(lines)
     
+    @staticmethod
+    def build_windowed_conversation(max_turns: int = 6) -> List[Dict]:
+        """
+        Get the conversation for context classification, bounded in size.
+        
+        The last max_turns turns are kept verbatim; older turns are folded
+        into a single leading "summary" turn, so the prompt stays the same
+        size however long the clarification runs.
+        
+        Args:
+            max_turns: Number of most recent turns to keep verbatim
+            
+        Returns:
+            List of turn dicts with 'type' and 'text' keys
+        """
+        conversation = SessionManager.get_current_conversation()
+        if len(conversation) <= max_turns:
+            return conversation
+        
+        summary = ClarificationManager._cached_conversation_text(
+            f"window_summary:{max_turns}",
+            lambda types, texts: ClarificationManager._format_older_turns(types[:-max_turns], texts[:-max_turns])
+        )
+        return [{"type": "summary", "text": summary}] + conversation[-max_turns:]
+    
+    @staticmethod
+    def _format_older_turns(types: List[str], texts: List[str]) -> str:
+        """Condense turns outside the verbatim window into one line."""
+        parts = []
+        for i, turn_type in enumerate(types):
+            if turn_type == "query":
+                parts.append(f"asked \"{texts[i]}\"")
+            elif turn_type == "clarification_response":
+                parts.append(f"clarified \"{texts[i]}\"")
+            elif turn_type == "confirmation":
+                parts.append(f"answered {texts[i]} to a confirmation")
+        return "User " + "; then ".join(parts) if parts else "No earlier user input"
+    
     @staticmethod
     def get_clarification_summary() -> str:
         """
@@ -226,17 +331,22 @@ class ClarificationManager:
         Returns:
             Summary string
         """
-        conversation = SessionManager.get_current_conversation()
-        
-        if not conversation:
+        return ClarificationManager._cached_conversation_text(
+            "summary", ClarificationManager._format_clarification_summary
+        )
+    
+    @staticmethod
+    def _format_clarification_summary(types: List[str], texts: List[str]) -> str:
+        """Summarize the original query and clarifications."""
+        if not types:
             return "No clarifications"
         
         parts = []
-        for turn in conversation:
-            if turn["type"] == "query":
-                parts.append(f"• Original: \"{turn['text']}\"")
-            elif turn["type"] == "clarification_response":
-                parts.append(f"• Clarified: \"{turn['text']}\"")
+        for i, turn_type in enumerate(types):
+            if turn_type == "query":
+                parts.append(f"• Original: \"{texts[i]}\"")
+            elif turn_type == "clarification_response":
+                parts.append(f"• Clarified: \"{texts[i]}\"")
         
         return "\n".join(parts) if parts else "No clarifications"
     
@@ -247,3 +357,10 @@ class ClarificationManager:
         SessionManager.set_clarification_mode(None)
         # Keep conversation context for this search, clear after results
 
+
+def _drop_intent_dump(key: int, ref: weakref.ref) -> None:
+    """Remove a cached dump once its IntentResponse is garbage collected."""
+    with _intent_dumps_lock:
+        entry = _intent_dumps.get(key)
+        if entry is not None and entry[0] is ref:
+            del _intent_dumps[key]
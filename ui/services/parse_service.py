@@ -1,22 +1,92 @@
 """Parsing and indexing business logic service."""
 from __future__ import annotations
+import functools
+import itertools
+import multiprocessing
 import os
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, List, Dict, Optional, Tuple
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+
+import numpy as np
 
 from core.config import config
 from core.logger import get_logger
-from core.utils import make_id
+from core.utils import make_id, make_id_with_prefix
 from core.storage import get_storage_backend
 from ingestion import parse_pdf_to_json
 from ingestion.parser_vertex import parse_csv_to_json
-from elastic import embed_texts
-from elastic.indexer import ensure_statements_index, ensure_transactions_index, bulk_index
+from ingestion.parser_csv_fast import parse_csv_fast
+from ingestion.pdf_reader import PDFReadResult, read_pdf_bytes
+from elastic import embed_texts, quantize_vectors
+from elastic.indexer import (
+    ensure_statements_index,
+    ensure_transactions_index,
+    bulk_index,
+    set_refresh_interval,
+    BULK_CHUNK_SIZE,
+    BULK_MAX_CHUNK_BYTES,
+    DEFAULT_REFRESH_INTERVAL,
+)
+from models.documents import TransactionDoc
 from models.schema import ParsedStatement
 
 log = get_logger("ui/services/parse_service")
 
+# Process-wide LRU of description embeddings keyed by (model, normalized text).
+# Stored as float32 arrays (~3 KB per 768-dim vector) to keep memory bounded.
+DESC_EMBED_CACHE_SIZE = 10_000
+
+# Transactions (and description length) included in each page's summary text
+SUMMARY_MAX_TXNS = 200
+SUMMARY_DESC_MAX_CHARS = 120
+_desc_embed_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_desc_embed_cache_lock = threading.Lock()
+
+# Leading fields of each summary line (description is appended, truncated)
+_summary_fields = attrgetter("statementDate", "statementType", "statementAmount")
+
+# Worker processes for PDF text extraction: PyPDF2/pdfminer are pure Python and
+# hold the GIL, so decoding on the parse threads would run one file at a time
+PDF_DECODE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf_decode_pool() -> ProcessPoolExecutor:
+    """Process pool for read_pdf_bytes, created on first use and shared."""
+    # spawn: forking the multi-threaded Streamlit server is unsafe
+    return ProcessPoolExecutor(
+        max_workers=PDF_DECODE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _decode_pdf(content: bytes, name: str, password: Optional[str]) -> PDFReadResult:
+    """
+    Extract a PDF's text on the decode process pool.
+    
+    Falls back to decoding on the calling thread if the pool is unusable
+    (e.g. a worker died); decode errors are re-raised unchanged.
+    """
+    try:
+        future = _pdf_decode_pool().submit(read_pdf_bytes, content, name, password)
+    except (BrokenProcessPool, RuntimeError) as e:
+        log.warning(f"PDF decode pool unavailable, decoding in-process: {e!r}")
+        _pdf_decode_pool.cache_clear()
+        return read_pdf_bytes(content, name, password=password)
+    
+    try:
+        return future.result()
+    except BrokenProcessPool as e:
+        log.warning(f"PDF decode worker failed, decoding in-process: {e!r}")
+        _pdf_decode_pool.cache_clear()
+        return read_pdf_bytes(content, name, password=password)
+
 
 class ParseService:
     """Handles parsing and indexing business logic."""
@@ -70,14 +140,15 @@ class ParseService:
                 else:
                     gcs_path = filename  # Just the filename
                 
-                file_content = storage.read_file(gcs_path)
-                
-                # Create temporary file
-                temp_fd, temp_path = tempfile.mkstemp(suffix=f"_{filename}")
+                # Stream straight into the temp file; only the extension is kept from
+                # the (user-supplied) filename
+                temp_fd, temp_path = tempfile.mkstemp(suffix=Path(filename).suffix)
+                os.close(temp_fd)
                 try:
-                    os.write(temp_fd, file_content)
-                finally:
-                    os.close(temp_fd)
+                    storage.download_to_path(gcs_path, temp_path)
+                except Exception:
+                    os.unlink(temp_path)
+                    raise
                 
                 log.info(f"Downloaded to temporary file: {temp_path}")
                 return temp_path, True
@@ -95,11 +166,20 @@ class ParseService:
         file_ext: str,
         password: Optional[str] = None,
         gcp_project: Optional[str] = None,
-        gcp_location: Optional[str] = None
+        gcp_location: Optional[str] = None,
+        pre_parsed: Optional[PDFReadResult] = None,
+        content: Optional[bytes] = None
     ) -> ParsedStatement:
         """
-        Parse a single file (PDF or CSV) using Vertex AI.
-        Automatically handles GCS paths by downloading first.
+        Parse a single file (PDF or CSV).
+        PDFs are parsed with Vertex AI; CSVs with a recognized column layout
+        are parsed locally. Automatically handles GCS paths by downloading first.
+        
+        Args:
+            pre_parsed: read_pdf() result already obtained for this PDF (e.g. from
+                UploadService.parse_pdf_info); skips both the download and a second decode
+            content: The PDF's bytes if still in memory (e.g. from the upload);
+                decoded directly instead of downloading file_path
         
         Returns:
             Parsed statement object or None if parsing failed.
@@ -107,11 +187,31 @@ class ParseService:
         gcp_project = gcp_project or config.gcp_project_id or os.getenv("GCP_PROJECT_ID")
         gcp_location = gcp_location or config.gcp_location or os.getenv("GCP_LOCATION", "us-central1")
         
+        if pre_parsed is None and content is not None and file_ext.lower() == "pdf":
+            pre_parsed = _decode_pdf(content, Path(file_path).name, password)
+        
+        if pre_parsed is not None and file_ext.lower() == "pdf":
+            return parse_pdf_to_json(
+                file_path,
+                password,
+                gcp_project=gcp_project,
+                gcp_location=gcp_location,
+                vertex_model=config.vertex_model,
+                pre_parsed=pre_parsed
+            )
+        
         # Download from GCS if needed
         local_path, is_temp = ParseService._download_gcs_file_if_needed(file_path)
         
         try:
-            # TODO: Add CSV support
+            if file_ext.lower() == "csv":
+                # Known column layouts parse locally; anything else goes to the generic parser
+                try:
+                    return parse_csv_fast(local_path)
+                except ValueError as e:
+                    log.info(f"Fast CSV parser not applicable, falling back: {e}")
+                    return parse_csv_to_json(local_path)
+            
             result = parse_pdf_to_json(
                     local_path,
                     password,
@@ -151,35 +251,53 @@ class ParseService:
         Returns:
             List of statement document dicts
         """
-        stmt_docs = []
-        for i, page in enumerate(parsed.pages):
-            statement_id = make_id(
+        # Build every page's summary first so all pages are embedded in one call
+        statement_ids = []
+        summaries = []
+        for page in parsed.pages:
+            statement_ids.append(make_id(
                 str(parsed.accountNo),
                 str(parsed.statementFrom),
                 str(parsed.statementTo),
                 str(page.pageNumber),
-            )
+            ))
         
-            head_txn = "\n".join(
-                f"{statement.statementDate} {statement.statementType} {statement.statementAmount} {statement.statementDescription}"
-                for statement in page.statements[:200]
-            )
+            # Descriptions are capped so the summary stays within a small embedding token budget
+            head_lines = [
+                " ".join((
+                    *map(str, _summary_fields(statement)),
+                    statement.statementDescription[:SUMMARY_DESC_MAX_CHARS],
+                ))
+                for statement in page.statements[:SUMMARY_MAX_TXNS]
+            ]
+            head_txn = "\n".join(head_lines)
         
-            summary_text = (
+            summaries.append(
                 f"Account: {parsed.accountName or 'Unknown'}\n"
                 f"Bank: {parsed.bankName or 'Unknown'}\n"
                 f"Range: {parsed.statementFrom}..{parsed.statementTo}\n"
                 f"Page: {page.pageNumber}\n"
                 f"Transactions:\n{head_txn}"
             )
-
-            summary_vector = embed_texts(
-                [summary_text],
-                project_id=gcp_project,
-                location=gcp_location,
-                model_name=config.vertex_model_embed
-            )[0]
         
+        if not summaries:
+            return []
+        
+        summary_vectors = embed_texts(
+            summaries,
+            project_id=gcp_project,
+            location=gcp_location,
+            model_name=config.vertex_model_embed
+        )
+        
+        summary_scales: List[Optional[float]] = [None] * len(summary_vectors)
+        if config.elastic_vector_element_type == "byte":
+            summary_vectors, summary_scales = quantize_vectors(summary_vectors)
+        
+        stmt_docs = []
+        for page, statement_id, summary_text, summary_vector, summary_scale in zip(
+            parsed.pages, statement_ids, summaries, summary_vectors, summary_scales
+        ):
             stmt_docs.append({
                 "id": statement_id,
                 "accountNo": str(parsed.accountNo),
@@ -190,6 +308,7 @@ class ParseService:
                 "statementTo": str(parsed.statementTo),
                 "summary_text": summary_text,
                 "summary_vector": summary_vector,
+                "vector_scale": summary_scale,
                 "meta": {"sourceFile": source_file},
             })
         return stmt_docs
@@ -202,10 +321,49 @@ class ParseService:
         embed_descriptions: bool = False,
         gcp_project: Optional[str] = None,
         gcp_location: Optional[str] = None
-    ) -> List[Dict]:
+    ) -> List[TransactionDoc]:
         """
         Create transaction documents for indexing.
         
+        Materialized form of iter_transaction_docs.
+        
+        Args:
+            parsed: Parsed statement object
+            statement_id: Parent statement ID
+            source_file: Source filename
+            embed_descriptions: Whether to generate embeddings for descriptions
+            gcp_project: GCP project ID
+            gcp_location: GCP location
+            
+        Returns:
+            List of TransactionDoc objects
+        """
+        return list(ParseService.iter_transaction_docs(
+            parsed,
+            statement_id,
+            source_file,
+            embed_descriptions=embed_descriptions,
+            gcp_project=gcp_project,
+            gcp_location=gcp_location
+        ))
+    
+    @staticmethod
+    def iter_transaction_docs(
+        parsed,
+        statement_id: str,
+        source_file: str,
+        embed_descriptions: bool = False,
+        gcp_project: Optional[str] = None,
+        gcp_location: Optional[str] = None
+    ) -> Iterator[TransactionDoc]:
+        """
+        Prepare transaction documents for streaming into bulk_index.
+        
+        Description embedding and column conversion run immediately (so this
+        can be called on a worker thread ahead of indexing); the documents
+        themselves are built only as the returned iterator is consumed, so
+        bulk_index holds roughly one chunk of them at a time.
+        
         Args:
             parsed: Parsed statement object
             statement_id: Parent statement ID
@@ -215,94 +373,223 @@ class ParseService:
             gcp_location: GCP location
             
         Returns:
-            List of transaction document dicts
+            Iterator of TransactionDoc objects
         """
         gcp_project = gcp_project or config.gcp_project_id or os.getenv("GCP_PROJECT_ID")
         gcp_location = gcp_location or config.gcp_location or os.getenv("GCP_LOCATION", "us-central1")
         
-        tx_docs = []
-        # Flatten all transactions from all pages, preserving page information
-        all_statements = []
-        for page in parsed.pages:
-            for stmt in page.statements:
-                all_statements.append((page.pageNumber, stmt))
+        # Flatten all transactions from all pages into parallel columns
+        # (no per-row (page, txn) tuples)
+        txns = list(itertools.chain.from_iterable(page.statements for page in parsed.pages))
+        page_nums = list(itertools.chain.from_iterable(
+            itertools.repeat(page.pageNumber, len(page.statements)) for page in parsed.pages
+        ))
+        descriptions = [txn.statementDescription or "" for txn in txns]
         
-        for i, (page_num, txn) in enumerate(all_statements):
-            # Generate deterministic transaction ID based on transaction attributes only
-            # This ensures the same transaction always gets the same ID, preventing duplicates
-            txn_id = make_id(
-                str(parsed.accountNo),
-                str(txn.statementDate),
-                str(txn.statementAmount),
-                txn.statementDescription or "",
-                str(txn.statementBalance)
+        # Embed descriptions up front in batched requests instead of one RPC per row.
+        # Repeated descriptions are embedded once; empty ones get no vector.
+        vectors: List[Optional[Union[List[int], np.ndarray]]] = [None] * len(txns)
+        scales: List[Optional[float]] = [None] * len(txns)
+        if embed_descriptions:
+            desc_vecs = _embed_descriptions(
+                descriptions,
+                gcp_project=gcp_project,
+                gcp_location=gcp_location
             )
-            
-            # TODO: Embed descriptions if needed
-            # vec = None
-            # if embed_descriptions:
-            #     vec = embed_texts(
-            #         [txn.statementDescription or ""],
-            #         project_id=gcp_project,
-            #         location=gcp_location,
-            #         model_name=config.vertex_model_embed
-            #     )[0]
-            vec = embed_texts(
-                [txn.statementDescription or ""],
-                project_id=gcp_project,
-                location=gcp_location,
-                model_name=config.vertex_model_embed
-            )[0]
-
-            tx_doc = {
-                "id": txn_id,
-                "accountNo": str(parsed.accountNo),
-                "bankName": parsed.bankName,
-                "accountName": parsed.accountName,
-                "type": txn.statementType,
-                "amount": float(txn.statementAmount),
-                "description": txn.statementDescription or "",
-                "category": None,
-                "currency": parsed.currency,
-                "sourceStatementId": statement_id,
-                "sourceFile": source_file,
-                "timestamp": str(txn.statementDate),
-                "@timestamp": str(txn.statementDate),
-                "pageNumber": txn.statementPage or page_num,
-            }
-            
-            # Add balance if present
-            if txn.statementBalance is not None:
-                tx_doc["balance"] = float(txn.statementBalance)
-            
-            # Add vector if generated
-            if vec is not None:
-                tx_doc["desc_vector"] = vec
-            
-            tx_docs.append(tx_doc)
+            present = [i for i, vec in enumerate(desc_vecs) if vec is not None]
+            if present:
+                if config.elastic_vector_element_type == "byte":
+                    # Quantize the whole batch in one vectorized pass
+                    quantized, quant_scales = quantize_vectors([desc_vecs[i] for i in present])
+                    for i, vec, scale in zip(present, quantized, quant_scales):
+                        vectors[i] = vec
+                        scales[i] = scale
+                else:
+                    # float32 arrays go to the orjson serializer as-is, which writes
+                    # the shortest float32 repr instead of widened float64 digits
+                    for i in present:
+                        vectors[i] = desc_vecs[i]
+        
+        # Convert numeric and date columns in bulk rather than per row
+        amounts, balances, timestamps = _numeric_columns(txns)
+        
+        account_no = str(parsed.accountNo)
+        # Same IDs as make_id(account_no, ...) with the account prefix hashed once
+        make_txn_id = make_id_with_prefix(account_no)
+        # Fields shared by every transaction of this statement are bound once;
+        # each row only supplies its own values
+        new_tx_doc = functools.partial(
+            TransactionDoc,
+            accountNo=account_no,
+            bankName=parsed.bankName,
+            accountName=parsed.accountName,
+            currency=parsed.currency,
+            sourceStatementId=statement_id,
+            sourceFile=source_file,
+        )
         
-        return tx_docs
+        columns = zip(txns, page_nums, descriptions, timestamps, amounts, balances, vectors, scales)
+        return (
+            new_tx_doc(
+                # Deterministic ID from transaction attributes only, so the same
+                # transaction always gets the same ID, preventing duplicates
+                id=make_txn_id(timestamp, str(txn.statementAmount), description, str(txn.statementBalance)),
+                type=txn.statementType,
+                amount=amount,
+                description=description,
+                timestamp=timestamp,
+                pageNumber=txn.statementPage or page_num,
+                balance=balance,
+                desc_vector=vector,
+                vector_scale=scale,
+            )
+            for txn, page_num, description, timestamp, amount, balance, vector, scale in columns
+        )
     
     @staticmethod
     def index_documents(
         stmt_docs: List[Dict],
-        txn_docs: List[Dict]
-    ) -> None:
+        txn_docs: Iterable[TransactionDoc]
+    ) -> Tuple[int, int]:
         """
         Index statement and transaction documents to Elasticsearch.
         
+        Transactions are indexed first so that a failure part-way through
+        leaves no statement document behind to trip the duplicate-statement
+        check on retry (transaction IDs are deterministic, so re-indexing
+        them is idempotent).
+        
         Args:
             stmt_docs: Statement documents
-            txn_docs: Transaction documents
+            txn_docs: Transaction documents (list or generator, consumed lazily)
+            
+        Returns:
+            (statements_indexed, transactions_indexed)
         """
         idx_statements = config.elastic_index_statements
         idx_transactions = config.elastic_index_transactions
         
-        if stmt_docs:
-            bulk_index(idx_statements, stmt_docs, id_field="id")
-            log.info(f"Indexed {len(stmt_docs)} statement(s)")
+        # Pause refreshes during the bulk load; restore them even if indexing fails.
+        # Both toggles are best-effort (they never raise), so neither can fail
+        # the ingest or mask the outcome of the bulk load.
+        paused = set_refresh_interval(idx_transactions, "-1")
+        try:
+            txn_count = bulk_index(
+                idx_transactions,
+                txn_docs,
+                id_field="id",
+                chunk_size=BULK_CHUNK_SIZE,
+                max_chunk_bytes=BULK_MAX_CHUNK_BYTES
+            )
+        finally:
+            if paused:
+                set_refresh_interval(idx_transactions, DEFAULT_REFRESH_INTERVAL)
+        log.info(f"Indexed {txn_count} transaction(s)")
+        
+        stmt_count = 0
+        if len(stmt_docs) > 1:
+            paused = set_refresh_interval(idx_statements, "-1")
+            try:
+                stmt_count = bulk_index(idx_statements, stmt_docs, id_field="id", chunk_size=BULK_CHUNK_SIZE)
+            finally:
+                if paused:
+                    set_refresh_interval(idx_statements, DEFAULT_REFRESH_INTERVAL)
+        elif stmt_docs:
+            stmt_count = bulk_index(idx_statements, stmt_docs, id_field="id", chunk_size=BULK_CHUNK_SIZE)
+        log.info(f"Indexed {stmt_count} statement(s)")
+        
+        return stmt_count, txn_count
+
+
+def _embed_descriptions(
+    descs: List[str],
+    *,
+    gcp_project: Optional[str],
+    gcp_location: Optional[str],
+) -> List[Optional[np.ndarray]]:
+    """
+    Embed transaction descriptions, reusing vectors for repeated text.
+    
+    Descriptions are keyed by their stripped, lower-cased text. Only keys not
+    already in the process-wide cache are sent to Vertex AI (one request per
+    unique description), so recurring merchants within and across statements
+    are embedded once.
+    
+    Args:
+        descs: Description per transaction (may contain empty strings)
+        gcp_project: GCP project ID
+        gcp_location: GCP region
         
-        if txn_docs:
-            bulk_index(idx_transactions, txn_docs, id_field="id")
-            log.info(f"Indexed {len(txn_docs)} transaction(s)")
+    Returns:
+        float32 vector per description, or None for empty descriptions
+    """
+    model_name = config.vertex_model_embed
+    stripped = [desc.strip() for desc in descs]
+    keys = [text.lower() for text in stripped]
+    
+    # Distinct non-empty keys in order of appearance, with the first original text seen
+    unique = dict.fromkeys(key for key in keys if key)
+    for key, text in zip(keys, stripped):
+        if key and unique[key] is None:
+            unique[key] = text
+    
+    found: Dict[str, np.ndarray] = {}
+    missing: Dict[str, str] = {}  # key -> text to embed
+    with _desc_embed_cache_lock:
+        for key, text in unique.items():
+            vec = _desc_embed_cache.get((model_name, key))
+            if vec is not None:
+                _desc_embed_cache.move_to_end((model_name, key))
+                found[key] = vec
+            else:
+                missing[key] = text
+    
+    if missing:
+        embedded = embed_texts(
+            list(missing.values()),
+            project_id=gcp_project,
+            location=gcp_location,
+            model_name=model_name
+        )
+        with _desc_embed_cache_lock:
+            for key, vec in zip(missing, embedded):
+                arr = np.asarray(vec, dtype=np.float32)
+                found[key] = arr
+                _desc_embed_cache[(model_name, key)] = arr
+            while len(_desc_embed_cache) > DESC_EMBED_CACHE_SIZE:
+                _desc_embed_cache.popitem(last=False)
+    
+    log.debug(
+        f"Description embeddings: rows={len(descs)} unique={len(found)} "
+        f"embedded={len(missing)} cached={len(found) - len(missing)}"
+    )
+    return [found.get(key) if key else None for key in keys]
 
+
+def _numeric_columns(
+    txns: List,
+) -> Tuple[List[float], List[Optional[float]], List[str]]:
+    """
+    Extract amount, balance and date columns from transactions in bulk.
+    
+    Values are gathered into NumPy arrays and converted back to Python
+    objects in a single pass each, instead of calling float()/str() per row.
+    
+    Args:
+        txns: StatementItem objects
+        
+    Returns:
+        (amounts, balances with None where missing, ISO date strings)
+    """
+    count = len(txns)
+    amounts = np.fromiter((t.statementAmount for t in txns), dtype=np.float64, count=count)
+    balances = np.fromiter(
+        (np.nan if t.statementBalance is None else t.statementBalance for t in txns),
+        dtype=np.float64,
+        count=count
+    )
+    # datetime64[D] renders as YYYY-MM-DD, identical to str(date)
+    dates = np.array([t.statementDate for t in txns], dtype="datetime64[D]").astype(str)
+    
+    balance_list = [None if b != b else b for b in balances.tolist()]  # NaN marks missing
+    return amounts.tolist(), balance_list, dates.tolist()
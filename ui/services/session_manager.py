@@ -1,8 +1,10 @@
 """Session state management service."""
 from __future__ import annotations
 import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import streamlit as st
 
 from core.config import config
@@ -10,50 +12,71 @@ from core.logger import get_logger
 
 log = get_logger("ui/services/session_manager")
 
+# Low-confidence intents remembered per session (oldest dropped first)
+INTENT_HISTORY_SIZE = 10
+
+# Full search results kept in memory for the most recent chat turns only;
+# history entries themselves store hit IDs and counts
+TURN_RESULTS_CACHE_SIZE = 4
+
+# Hits retrieved per chat search; also used to re-run an older turn's search
+SEARCH_TOP_K = 20
+
 
 class SessionManager:
     """Centralized session state management."""
     
     @staticmethod
     def init_session() -> None:
-        """Initialize session-specific state."""
-        if "session_upload_dir" not in st.session_state:
-            session_id = uuid.uuid4().hex
-            session_dir = config.uploads_dir / f"session-{session_id}"
-            session_dir.mkdir(parents=True, exist_ok=True)
-            st.session_state["session_upload_dir"] = session_dir
-            log.info(f"Session folder created: {session_dir}")
-        
-        if "uploads_meta" not in st.session_state:
-            st.session_state["uploads_meta"] = []
+        """
+        Initialize session-specific state.
         
-        if "password" not in st.session_state:
-            st.session_state["password"] = ""
+        Idempotent: after the first call a single sentinel lookup returns
+        early, since every getter below calls this on each rerun.
+        """
+        state = st.session_state
+        if state.get("_session_initialized"):
+            return
         
-        if "chat_history" not in st.session_state:
-            st.session_state["chat_history"] = []
+        state.setdefault("uploads_meta", [])
+        state.setdefault("password", "")
+        state.setdefault("chat_history", [])
+        state.setdefault("turn_results_cache", OrderedDict())
         
         # Clarification state
-        if "pending_query" not in st.session_state:
-            st.session_state["pending_query"] = None
-        
-        if "pending_intent" not in st.session_state:
-            st.session_state["pending_intent"] = None
+        state.setdefault("pending_query", None)
+        state.setdefault("pending_intent", None)
+        state.setdefault("clarification_mode", None)
         
-        if "clarification_mode" not in st.session_state:
-            st.session_state["clarification_mode"] = None
+        # Conversation turns stored column-wise: parallel type/text/meta lists
+        state.setdefault("conversation_types", [])
+        state.setdefault("conversation_texts", [])
+        state.setdefault("conversation_meta", [])
         
-        if "current_conversation" not in st.session_state:
-            st.session_state["current_conversation"] = []
+        state.setdefault("intent_history", deque(maxlen=INTENT_HISTORY_SIZE))
+        state.setdefault("clarification_count", 0)
+        state.setdefault("conversation_version", 0)
+        state.setdefault("conversation_text_cache", {})
         
-        if "intent_history" not in st.session_state:
-            st.session_state["intent_history"] = []
+        state["_session_initialized"] = True
     
     @staticmethod
     def get_upload_dir() -> Path:
-        """Get the current session's upload directory."""
-        SessionManager.init_session()
-        return st.session_state["session_upload_dir"]
+        """
+        Get the current session's upload directory.
+        
+        The directory is created on first use rather than in init_session,
+        so page renders never touch the filesystem; uploads themselves go
+        through the storage backend and do not need it.
+        """
+        state = st.session_state
+        session_dir = state.get("session_upload_dir")
+        if session_dir is None:
+            session_dir = config.uploads_dir / f"session-{uuid.uuid4().hex}"
+            session_dir.mkdir(parents=True, exist_ok=True)
+            state["session_upload_dir"] = session_dir
+            log.info(f"Session folder created: {session_dir}")
+        return session_dir
     
     @staticmethod
     def get_uploads_meta() -> List[Dict]:
@@ -84,17 +107,76 @@ class SessionManager:
         return st.session_state.get("chat_history", [])
     
     @staticmethod
-    def add_chat_turn(query: str, answer: str, results: Dict, intent: Optional[Dict] = None) -> None:
-        """Add a turn to chat history."""
+    def add_chat_turn(
+        query: str,
+        answer: str,
+        results: Dict,
+        intent: Optional[Dict] = None,
+        filters: Optional[Dict] = None
+    ) -> None:
+        """
+        Add a turn to chat history.
+        
+        Search hits are reduced to their IDs and counts before being stored,
+        so the history stays small as the conversation grows. The full
+        results of recent turns remain available via get_full_results_for_turn.
+        
+        Args:
+            query: User query
+            answer: Assistant answer
+            results: Search results, or {"intent_result": ...} for structured intents
+            intent: Serialized intent response, if any
+            filters: Keyword filters the results were searched with, if any
+        """
         SessionManager.init_session()
+        turn_id = uuid.uuid4().hex
         turn_data = {
+            "id": turn_id,
             "q": query,
             "a": answer,
-            "results": results
+            "results": _compact_results(results)
         }
         if intent:
             turn_data["intent"] = intent
+        if filters:
+            turn_data["filters"] = filters
         st.session_state["chat_history"].append(turn_data)
+        
+        cache = st.session_state["turn_results_cache"]
+        cache[turn_id] = results
+        while len(cache) > TURN_RESULTS_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    @staticmethod
+    def get_full_results_for_turn(turn_id: str) -> Optional[Dict]:
+        """
+        Get the full search results for a chat turn.
+        
+        Recent turns are served from memory; older ones re-run the search.
+        
+        Args:
+            turn_id: ID of the chat turn
+            
+        Returns:
+            Search results dict, or None if the turn doesn't exist
+        """
+        SessionManager.init_session()
+        cache = st.session_state["turn_results_cache"]
+        if turn_id in cache:
+            cache.move_to_end(turn_id)
+            return cache[turn_id]
+        
+        turn = next((t for t in st.session_state["chat_history"] if t.get("id") == turn_id), None)
+        if turn is None:
+            return None
+        if "intent_result" in turn["results"] or "intent_results" in turn["results"]:
+            return turn["results"]
+        
+        # Imported here: only old turns need it, and it pulls in the search clients
+        from elastic.search import hybrid_search
+        
+        log.info(f"Re-running search for chat turn {turn_id}")
+        return hybrid_search(turn["q"], filters=turn.get("filters", {}), top_k=SEARCH_TOP_K)
     
     # Clarification state management
     
@@ -138,30 +220,76 @@ class SessionManager:
     
     @staticmethod
     def get_current_conversation() -> List[Dict]:
-        """Get the current conversation context."""
+        """Get the current conversation context as a list of turn dicts."""
+        SessionManager.init_session()
+        return [
+            {"type": turn_type, "text": text, **meta}
+            for turn_type, text, meta in zip(
+                st.session_state["conversation_types"],
+                st.session_state["conversation_texts"],
+                st.session_state["conversation_meta"],
+            )
+        ]
+    
+    @staticmethod
+    def get_conversation_columns() -> Tuple[List[str], List[str]]:
+        """Get the current conversation's turn types and texts as parallel lists (read-only)."""
         SessionManager.init_session()
-        return st.session_state.get("current_conversation", [])
+        return st.session_state["conversation_types"], st.session_state["conversation_texts"]
     
     @staticmethod
     def add_conversation_turn(turn_type: str, text: str, metadata: Optional[Dict] = None) -> None:
         """Add a turn to current conversation context."""
-        from datetime import datetime, timezone
         SessionManager.init_session()
-        turn = {
-            "type": turn_type,
-            "text": text,
+        st.session_state["conversation_types"].append(turn_type)
+        st.session_state["conversation_texts"].append(text)
+        st.session_state["conversation_meta"].append({
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "metadata": metadata or {}
-        }
-        st.session_state["current_conversation"].append(turn)
-        log.debug(f"Added conversation turn: {turn_type}")
+        })
+        st.session_state["conversation_version"] += 1
+        log.debug("Added conversation turn: {}", turn_type)
     
     @staticmethod
     def clear_conversation_context() -> None:
         """Clear the current conversation context."""
-        st.session_state["current_conversation"] = []
+        st.session_state["conversation_types"] = []
+        st.session_state["conversation_texts"] = []
+        st.session_state["conversation_meta"] = []
+        st.session_state["conversation_version"] = st.session_state.get("conversation_version", 0) + 1
+        SessionManager.reset_clarification_count()
         log.debug("Cleared conversation context")
     
+    @staticmethod
+    def get_conversation_version() -> int:
+        """Get a counter that changes whenever the current conversation changes."""
+        SessionManager.init_session()
+        return st.session_state["conversation_version"]
+    
+    @staticmethod
+    def get_conversation_text_cache() -> Dict:
+        """Get the per-session cache of text derived from conversation versions."""
+        SessionManager.init_session()
+        return st.session_state["conversation_text_cache"]
+    
+    @staticmethod
+    def get_clarification_count() -> int:
+        """Get the number of clarification requests in the current conversation."""
+        SessionManager.init_session()
+        return st.session_state.get("clarification_count", 0)
+    
+    @staticmethod
+    def increment_clarification_count() -> int:
+        """Record a clarification request; returns the new count."""
+        SessionManager.init_session()
+        st.session_state["clarification_count"] += 1
+        return st.session_state["clarification_count"]
+    
+    @staticmethod
+    def reset_clarification_count() -> None:
+        """Reset the clarification request counter."""
+        st.session_state["clarification_count"] = 0
+    
     @staticmethod
     def clear_clarification_state() -> None:
         """Clear all clarification-related state."""
@@ -173,17 +301,24 @@ class SessionManager:
     
     @staticmethod
     def get_cumulative_query() -> str:
-        """Build cumulative query from conversation context."""
+        """Build cumulative query from conversation context (cached per conversation version)."""
         SessionManager.init_session()
-        conversation = st.session_state.get("current_conversation", [])
+        version = st.session_state["conversation_version"]
+        cached = st.session_state.get("_cumulative_query_cache")
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        types, texts = SessionManager.get_conversation_columns()
         
         # Combine original query with all clarifications
         parts = []
-        for turn in conversation:
-            if turn["type"] in ["query", "clarification_response"]:
-                parts.append(turn["text"])
+        for i, turn_type in enumerate(types):
+            if turn_type == "query" or turn_type == "clarification_response":
+                parts.append(texts[i])
         
-        return " ".join(parts) if parts else ""
+        cumulative = " ".join(parts) if parts else ""
+        st.session_state["_cumulative_query_cache"] = (version, cumulative)
+        return cumulative
     
     @staticmethod
     def add_intent_to_history(query: str, confidence: float) -> None:
@@ -191,9 +326,65 @@ class SessionManager:
         SessionManager.init_session()
         st.session_state["intent_history"].append({
             "query": query,
-            "confidence": confidence
-        })
-        # Keep only last 10 for memory efficiency
-        if len(st.session_state["intent_history"]) > 10:
-            st.session_state["intent_history"] = st.session_state["intent_history"][-10:]
+            "confidence": confidence,
+            "turn": len(st.session_state["chat_history"])
+        })  # bounded deque drops the oldest entry
+    
+    @staticmethod
+    def has_recent_low_confidence(window: int) -> bool:
+        """
+        Check whether a query in the last few chat turns needed confirmation or clarification.
+        
+        Args:
+            window: Number of most recent chat turns to look back over
+            
+        Returns:
+            True if a low-confidence intent was recorded within the window
+        """
+        SessionManager.init_session()
+        first_turn = len(st.session_state["chat_history"]) - window
+        return any(
+            entry.get("turn", 0) >= first_turn
+            for entry in st.session_state["intent_history"]
+        )
+    
+    @staticmethod
+    def get_ingest_job() -> Optional[Any]:
+        """Get the session's current (or last) background ingest job."""
+        return st.session_state.get("ingest_job")
+    
+    @staticmethod
+    def set_ingest_job(job: Optional[Any]) -> None:
+        """Set the session's background ingest job."""
+        st.session_state["ingest_job"] = job
 
+
+def _compact_results(results: Dict) -> Dict:
+    """
+    Reduce search results to what chat history needs to keep.
+    
+    Structured intent results are kept as-is because the history view
+    renders them; raw search hits are replaced with their IDs and counts.
+    
+    Args:
+        results: Results passed to add_chat_turn
+        
+    Returns:
+        Dict to store in the chat turn
+    """
+    if "intent_result" in results or "intent_results" in results:
+        return results
+    
+    vector_hits = results.get("transactions_vector", [])
+    keyword_hits = results.get("transactions_keyword", [])
+    fused_hits = results.get("fused", [])
+    return {
+        "vector_ids": [h["_id"] for h in vector_hits],
+        "keyword_ids": [h["_id"] for h in keyword_hits],
+        "fused_ids": [h["_id"] for h in fused_hits],
+        "summary_counts": {
+            "vector": len(vector_hits),
+            "keyword": len(keyword_hits),
+            "fused": len(fused_hits),
+        },
+    }
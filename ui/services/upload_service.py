@@ -1,61 +1,137 @@
 """Upload business logic service."""
 from __future__ import annotations
+import io
+import os
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple
 from streamlit.runtime.uploaded_file_manager import UploadedFile
-from io import BytesIO
-import hashlib
 
 from core.config import config
 from core.logger import get_logger
-from core.utils import human_size, safe_write, sha256_bytes
-from core.storage import get_storage_backend
-from ingestion import read_pdf
+from core.utils import content_hash, human_size, safe_write
+from core.storage import HashIndex, content_hash_metadata, get_hash_index, get_storage_backend
+from ingestion import read_pdf, read_pdf_bytes
 
 log = get_logger("ui/services/upload_service")
 
+# Extension whitelist as a set for constant-time membership checks
+_ALLOWED_EXT = frozenset(ext.lower() for ext in config.allowed_ext)
+# Total upload size limit in bytes
+_MAX_TOTAL_BYTES = config.max_total_mb * 1024 * 1024
+
+
+class BufferedUpload(io.BytesIO):
+    """
+    In-memory copy of an upload that can outlive the Streamlit script run.
+    
+    Has the ``name``/``size`` attributes of UploadedFile that process_upload
+    uses, so uploads can be saved from a background thread. The bytes are
+    shared with the BytesIO buffer, not copied.
+    """
+    
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+@dataclass(frozen=True)
+class DupResult:
+    """Outcome of UploadService.check_duplicate for one upload."""
+    by_name: bool = False
+    by_hash: Optional[str] = None  # name of the stored file with the same content
+    
+    @property
+    def is_duplicate(self) -> bool:
+        return self.by_name or self.by_hash is not None
+
 
 class UploadService:
     """Handles file upload business logic."""
     
+    @staticmethod
+    def check_duplicate(
+        filename: str,
+        file_hash: str,
+        file_size: Optional[int] = None,
+        *,
+        hash_index: Optional[HashIndex] = None
+    ) -> DupResult:
+        """
+        Check an upload's name and content against stored files in one index lookup.
+        
+        Args:
+            filename: Name of the uploaded file
+            file_hash: core.utils.content_hash of the upload
+            file_size: Upload size in bytes (skips the hash lookup when no stored file matches)
+            hash_index: Loaded HashIndex to check (defaults to get_hash_index())
+            
+        Returns:
+            DupResult; empty if the index cannot be loaded
+        """
+        try:
+            hash_index = hash_index or get_hash_index()
+        except Exception as e:
+            log.error("Error using storage backend for duplicate check: {}", e)
+            return DupResult()
+        
+        by_name = hash_index.contains_name(filename)
+        if by_name:
+            log.warning("Duplicate file detected by name: {}", filename)
+            return DupResult(by_name=True)
+        
+        if file_size is not None and not hash_index.contains_size(file_size):
+            return DupResult()
+        existing = hash_index.contains_hash(file_hash)
+        if existing:
+            log.warning("Duplicate file detected by hash: {}", existing)
+        return DupResult(by_hash=existing)
+    
     @staticmethod
     def check_duplicate_by_hash(
-        file_content: bytes,
+        file_content: Optional[bytes] = None,
         upload_dir: Path = None,
-        use_storage_backend: bool = True
+        use_storage_backend: bool = True,
+        *,
+        file_hash: Optional[str] = None,
+        hash_index: Optional[HashIndex] = None,
+        file_size: Optional[int] = None
     ) -> Tuple[bool, Optional[str]]:
         """
         Check if a file with the same content hash already exists.
         
+        Content whose size matches no stored file is reported as new without
+        being hashed.
+        
         Args:
-            file_content: The file content bytes
+            file_content: The file content bytes (not needed if file_hash is given)
             upload_dir: Directory to check for existing files (deprecated, kept for compatibility)
             use_storage_backend: If True, use storage backend (default: True)
+            file_hash: Precomputed core.utils.content_hash of the content
+            hash_index: Loaded HashIndex to check (defaults to get_hash_index())
+            file_size: Content size in bytes (defaults to len(file_content))
             
         Returns:
             (is_duplicate, existing_filename)
         """
-        file_hash = sha256_bytes(file_content)
+        if file_size is None and file_content is not None:
+            file_size = len(file_content)
         
-        # Always use storage backend for consistency
+        # Stored files are hashed once, at upload time, into the sidecar index
         try:
-            storage = get_storage_backend()
-            files = storage.list_files()
-            
-            for file_path in files:
-                if file_path.lower().endswith('.pdf'):
-                    try:
-                        existing_content = storage.read_file(file_path)
-                        existing_hash = sha256_bytes(existing_content)
-                        if existing_hash == file_hash:
-                            filename = Path(file_path).name
-                            log.warning(f"Duplicate file detected by hash: {filename}")
-                            return True, filename
-                    except Exception as e:
-                        log.error(f"Error checking file {file_path}: {e}")
-                        continue
+            hash_index = hash_index or get_hash_index()
+            # Cheap signature first: no stored file of this size means no duplicate
+            if file_size is not None and not hash_index.contains_size(file_size):
+                return False, None
+            if file_hash is None:
+                file_hash = content_hash(file_content)
+            existing = hash_index.contains_hash(file_hash)
+            if existing:
+                log.warning("Duplicate file detected by hash: {}", existing)
+                return True, existing
         except Exception as e:
-            log.error(f"Error using storage backend for duplicate check: {e}")
+            log.error("Error using storage backend for duplicate check: {}", e)
         
         return False, None
     
@@ -63,7 +139,9 @@ class UploadService:
     def check_duplicate_by_name(
         filename: str,
         upload_dir: Path = None,
-        use_storage_backend: bool = True
+        use_storage_backend: bool = True,
+        *,
+        hash_index: Optional[HashIndex] = None
     ) -> bool:
         """
         Check if a file with the same name already exists.
@@ -72,23 +150,39 @@ class UploadService:
             filename: Name of the file to check
             upload_dir: Directory to check for existing files (deprecated, kept for compatibility)
             use_storage_backend: If True, use storage backend (default: True)
+            hash_index: Loaded HashIndex to check (defaults to get_hash_index())
             
         Returns:
             True if file exists, False otherwise
         """
         # Always use storage backend for consistency
         try:
-            storage = get_storage_backend()
-            files = storage.list_files()
-            # Check if filename exists in the list
-            exists = any(Path(f).name == filename for f in files)
+            hash_index = hash_index or get_hash_index()
+            exists = hash_index.contains_name(filename)
             if exists:
-                log.warning(f"Duplicate file detected by name: {filename}")
+                log.warning("Duplicate file detected by name: {}", filename)
             return exists
         except Exception as e:
-            log.error(f"Error using storage backend for name check: {e}")
+            log.error("Error using storage backend for name check: {}", e)
             return False
     
+    @staticmethod
+    def hash_upload(file: UploadedFile) -> str:
+        """
+        Content-hash an uploaded file without copying its bytes.
+        
+        UploadedFile is a BytesIO; getvalue() returns a fresh copy on every
+        call, while getbuffer() exposes the existing buffer.
+        
+        Args:
+            file: Uploaded file from Streamlit
+            
+        Returns:
+            core.utils.content_hash of the file contents
+        """
+        with file.getbuffer() as view:
+            return content_hash(view)
+    
     @staticmethod
     def validate_files(files: List[UploadedFile]) -> tuple[bool, Optional[str]]:
         """
@@ -103,9 +197,12 @@ class UploadService:
         if len(files) > config.max_files:
             return False, f"Too many files. Max allowed: {config.max_files}."
         
-        total_size = sum(f.size for f in files)
-        if total_size > config.max_total_mb * 1024 * 1024:
-            return False, f"Total upload size exceeds {config.max_total_mb} MB."
+        # Stop at the first file that crosses the limit
+        total_size = 0
+        for f in files:
+            total_size += f.size
+            if total_size > _MAX_TOTAL_BYTES:
+                return False, f"Total upload size exceeds {config.max_total_mb} MB."
         
         return True, None
     
@@ -114,7 +211,10 @@ class UploadService:
         file: UploadedFile,
         upload_dir: Path = None,
         password: Optional[str] = None,
-        use_storage_backend: bool = None
+        use_storage_backend: bool = None,
+        *,
+        file_hash: Optional[str] = None,
+        hash_index: Optional[HashIndex] = None
     ) -> Optional[Dict]:
         """
         Process a single uploaded file.
@@ -124,29 +224,52 @@ class UploadService:
             upload_dir: Directory for uploads (deprecated, kept for compatibility)
             password: Optional password for encrypted PDFs
             use_storage_backend: If True, use storage backend (auto-detects if None)
+            file_hash: Precomputed core.utils.content_hash of the file, e.g. from
+                the duplicate check; computed here if omitted
+            hash_index: Loaded HashIndex to record the file in (defaults to
+                get_hash_index())
         
         Returns:
             File metadata dict or None if processing failed.
         """
-        name = Path(file.name).name
-        ext = Path(name).suffix.lower().lstrip(".")
+        # Plain string splits; same result as Path(...).name / .suffix without the objects
+        name = os.path.basename(file.name)
+        stem, dot, ext = name.rpartition(".")
+        ext = ext.lower() if dot and stem else ""
         
         # Validate extension
-        if ext not in config.allowed_ext:
-            log.warning(f"Rejected file (ext): {name}")
+        if ext not in _ALLOWED_EXT:
+            log.warning("Rejected file (ext): {}", name)
             return None
         
         # Auto-detect storage backend usage
         if use_storage_backend is None:
             use_storage_backend = True  # Always use storage backend for consistency
         
+        # Hashed once; used for the hash index and as the parse cache key
+        if file_hash is None:
+            file_hash = UploadService.hash_upload(file)
+        
         # Save file using storage backend (no session directories)
         try:
             storage = get_storage_backend()
-            file_obj = BytesIO(file.getvalue())
+            # UploadedFile is already a binary stream; hand it over directly rather than
+            # copying its contents into a second buffer
+            file.seek(0)
             # Save directly to root of storage (no session subdirectories)
-            file_path = storage.save_file(file_obj, name)
-            log.info(f"Saved file via storage backend: {file_path}")
+            # Loaded before saving so the new file is not picked up (and hashed) as unindexed
+            if hash_index is None:
+                hash_index = get_hash_index()
+            # PDFs carry their hash as object metadata so index rebuilds skip the download
+            file_path = storage.save_file(
+                file, name, metadata=content_hash_metadata(file_hash) if ext == "pdf" else None
+            )
+            log.info("Saved file via storage backend: {}", file_path)
+            if ext == "pdf":
+                # Record the content hash now so duplicate checks never re-read this file
+                hash_index.add(name, file_hash, size=file.size)
+            else:
+                hash_index.add_name(name)
             
             # For local storage, path is absolute; for GCS it's gs://...
             # Normalize for consistent metadata
@@ -155,7 +278,7 @@ class UploadService:
             else:
                 display_path = str(file_path)
         except Exception as e:
-            log.error(f"Failed to save {name}: {e}")
+            log.error("Failed to save {}: {}", name, e)
             return None
         
         # Build metadata
@@ -165,9 +288,10 @@ class UploadService:
             "size_bytes": file.size,
             "size_human": human_size(file.size),
             "path": display_path,
+            "content_hash": file_hash,
             "storage_type": "gcs" if config.gcs_bucket and config.environment == "production" else "local"
         }
-        log.info(f"Saved upload: {meta}")
+        log.info("Saved upload: {}", meta)
         
         return meta
     
@@ -216,19 +340,86 @@ class UploadService:
                 hit = response["hits"]["hits"][0]["_source"]
                 source_file = hit.get("source_file", "unknown")
                 log.warning(
-                    f"Duplicate statement found in Elasticsearch: "
-                    f"Account={account_no}, Period={statement_from} to {statement_to}, "
-                    f"Source={source_file}"
+                    "Duplicate statement found in Elasticsearch: "
+                    "Account={}, Period={} to {}, Source={}",
+                    account_no, statement_from, statement_to, source_file
                 )
                 return True, source_file
             
             return False, None
             
         except Exception as e:
-            log.error(f"Error checking Elasticsearch for duplicates: {e}")
+            log.error("Error checking Elasticsearch for duplicates: {}", e)
             # Don't block upload if ES check fails
             return False, None
     
+    @staticmethod
+    def check_duplicates_in_elasticsearch_batch(
+        statements: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[str]]:
+        """
+        Check many (account, period) tuples against indexed statements in one round trip.
+        
+        Sends a single msearch with one size-1 term query per distinct tuple
+        instead of one search request per parsed file.
+        
+        Args:
+            statements: (account_no, statement_from, statement_to) tuples,
+                dates in ISO format (YYYY-MM-DD)
+        
+        Returns:
+            Dict mapping each tuple to the existing source file if it is already
+            indexed, or None if it is new
+        """
+        keys = list(dict.fromkeys(statements))
+        duplicates: Dict[Tuple[str, str, str], Optional[str]] = dict.fromkeys(keys)
+        if not keys:
+            return duplicates
+        
+        try:
+            from elastic.client import es
+            
+            index = config.elastic_index_statements
+            searches: List[Dict[str, Any]] = []
+            for account_no, statement_from, statement_to in keys:
+                searches.append({"index": index})
+                searches.append({
+                    "size": 1,
+                    "query": {
+                        "bool": {
+                            "filter": [
+                                {"term": {"accountNo": account_no}},
+                                {"term": {"statementFrom": statement_from}},
+                                {"term": {"statementTo": statement_to}}
+                            ]
+                        }
+                    },
+                    "_source": ["meta.sourceFile"]
+                })
+            
+            response = es().msearch(searches=searches)
+            
+            for key, result in zip(keys, response["responses"]):
+                if "error" in result:
+                    log.error("Error checking Elasticsearch for duplicates of {}: {}", key, result['error'])
+                    continue
+                hits = result["hits"]["hits"]
+                if hits:
+                    source_file = hits[0]["_source"].get("meta", {}).get("sourceFile") or "unknown"
+                    account_no, statement_from, statement_to = key
+                    log.warning(
+                        "Duplicate statement found in Elasticsearch: "
+                        "Account={}, Period={} to {}, Source={}",
+                        account_no, statement_from, statement_to, source_file
+                    )
+                    duplicates[key] = source_file
+        
+        except Exception as e:
+            log.error("Error checking Elasticsearch for duplicates: {}", e)
+            # Don't block upload if ES check fails
+        
+        return duplicates
+    
     @staticmethod
     def delete_file(filename: str) -> bool:
         """
@@ -242,39 +433,57 @@ class UploadService:
         """
         try:
             storage = get_storage_backend()
+            hash_index = get_hash_index()
             storage.delete_file(filename)
-            log.info(f"Deleted file from storage: {filename}")
+            hash_index.remove(filename)
+            log.info("Deleted file from storage: {}", filename)
             return True
         except Exception as e:
-            log.error(f"Failed to delete file {filename}: {e}")
+            log.error("Failed to delete file {}: {}", filename, e)
             return False
     
     @staticmethod
     def parse_pdf_info(
         file_path: str,
-        password: Optional[str] = None
+        password: Optional[str] = None,
+        content: Optional[bytes] = None,
+        max_pages: Optional[int] = None
     ) -> Optional[Dict]:
         """
         Parse PDF file to extract basic information.
         
+        Args:
+            file_path: Path of the PDF (only its name is used when content is given)
+            password: Optional password for encrypted PDFs
+            content: The PDF's bytes if already in memory; read instead of file_path
+            max_pages: Decode only this many leading pages (e.g. 1 for a quick
+                preview of page count, producer and first-page text)
+        
         Returns:
-            PDF info dict or None if parsing failed.
+            PDF info dict or None if parsing failed. ``read_result`` holds the
+            decoded PDF so it can be passed to ParseService.parse_file(pre_parsed=...)
+            instead of decoding the file again; it is None for partial reads.
         """
         try:
-            result = read_pdf(file_path, password=password)
+            if content is not None:
+                result = read_pdf_bytes(content, Path(file_path).name, password=password, max_pages=max_pages)
+            else:
+                result = read_pdf(file_path, password=password, max_pages=max_pages)
             info = {
                 "name": Path(file_path).name,
                 "num_pages": result.num_pages,
                 "encrypted": result.encrypted,
                 "title": result.meta.title,
+                "producer": result.meta.producer,
+                "first_page_text": result.pages[0] if result.pages else "",
+                "read_result": result if max_pages is None else None,
             }
             log.info(
-                f"Parsed PDF: name={info['name']} "
-                f"pages={info['num_pages']} "
-                f"encrypted={info['encrypted']}"
+                "Parsed PDF: name={} pages={} encrypted={}",
+                info["name"], info["num_pages"], info["encrypted"]
             )
             return info
         except Exception as e:
-            log.error(f"Failed to parse PDF {Path(file_path).name}: {e}")
+            log.error("Failed to parse PDF {}: {}", Path(file_path).name, e)
             return None
 
@@ -1,14 +1,26 @@
 """Chat page - orchestrates search and chat functionality with clarification."""
 from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
 import streamlit as st
 
 from core.logger import get_logger
+from elastic.client import es
 from elastic.search import hybrid_search
-from llm.vertex_chat import chat_vertex
+from llm.vertex_chat import chat_vertex_stream, classify_and_answer, init_vertex
 from llm.intent_router import classify_intent_safe, classify_intent_with_context
-from llm.intent_executor import execute_intent
+from llm.local_intent import classify_intent_local
+from llm.intent_executor import execute_intent, execute_intents
+from models.intent import IntentResponse
 from ui.services import SessionManager
 from ui.services.clarification_manager import ClarificationManager
+from ui.services.session_manager import SEARCH_TOP_K
 from ui.components import (
     render_chat_history,
     render_intent_display,
@@ -17,11 +29,47 @@ from ui.components import (
     render_clarification_dialog,
     render_conversation_context_display,
     render_clarification_mode_indicator,
-    render_intent_results
+    render_intent_results,
+    render_multi_intent_results
 )
 
 log = get_logger("ui/pages/chat_page")
 
+# Minimum time between streamed answer redraws (~one frame)
+STREAM_FLUSH_SECONDS = 0.016
+# Runs retrieval speculatively while the intent is being classified
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-search")
+
+# Exact-match cache of intent classifications, keyed by normalized query,
+# conversation context and date (relative periods depend on "today").
+# Shared by all sessions, hence the lock.
+INTENT_CACHE_SIZE = 256
+INTENT_CACHE_MIN_CONFIDENCE = 0.5
+_intent_cache: "OrderedDict[Tuple[str, str, str], IntentResponse]" = OrderedDict()
+_intent_cache_lock = threading.Lock()
+
+# New queries are classified and answered in one request unless a query in
+# this many recent turns needed confirmation or clarification
+FUSED_LOOKBACK_TURNS = 3
+# Local keyword classifications above this confidence skip the LLM router
+LOCAL_INTENT_MIN_CONFIDENCE = 0.85
+# Secondary intents above this confidence are executed alongside the main one
+ALTERNATIVE_INTENT_MIN_CONFIDENCE = 0.6
+STRUCTURED_INTENTS = ("aggregate", "trend", "listing", "text_qa", "aggregate_filtered_by_text", "provenance")
+
+
+@st.cache_resource(show_spinner=False)
+def _get_chat_client() -> bool:
+    """Initialize Vertex AI once per process; later calls are a cache lookup."""
+    init_vertex()
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def _get_search_client():
+    """Create the shared Elasticsearch client once per process."""
+    return es()
+
 
 def render() -> None:
     """Render the chat/search page with clarification flow."""
@@ -39,6 +87,8 @@ def render() -> None:
     
     # Check if we're in clarification mode
     clarification_mode = SessionManager.get_clarification_mode()
+    # Completed turns only need a full rerun when they leave the clarification layout
+    st.session_state["chat_layout_active"] = not clarification_mode
     
     if clarification_mode:
         # Show clarification mode indicator
@@ -48,8 +98,7 @@ def render() -> None:
         _handle_clarification_interaction(clarification_mode)
     else:
         # Normal mode: Display chat history and input
-        history = SessionManager.get_chat_history()
-        render_chat_history(history, max_turns=10)
+        _chat_history_fragment()
         
         # Check if processing is in progress
         is_processing = st.session_state.get("is_processing", False)
@@ -66,6 +115,34 @@ def render() -> None:
             _handle_new_query(user_query.strip())
 
 
+@st.fragment
+def _chat_history_fragment() -> None:
+    """Render chat history; interactions inside it rerun only this block."""
+    history = SessionManager.get_chat_history()
+    render_chat_history(history, max_turns=10)
+
+
+def _complete_turn() -> None:
+    """
+    Reset per-query state after a chat turn has been answered and saved.
+    
+    In the chat layout the turn is already on screen (question and streamed
+    answer), so the page is usually not rerun; the history fragment shows the
+    turn from the next run on. The page is rerun when this run left output
+    the history would not replace: the empty-history placeholder on the first
+    turn, or the intent classification display. Turns started from the
+    clarification dialog rerun to switch back to the chat layout.
+    """
+    SessionManager.clear_clarification_state()
+    st.session_state["is_processing"] = False
+    drew_intent = st.session_state.pop("turn_drew_intent", False)
+    if not st.session_state.get("chat_layout_active", False):
+        log.info("Chat turn complete, returning to chat layout")
+        st.rerun()
+    elif drew_intent or len(SessionManager.get_chat_history()) == 1:
+        st.rerun()
+
+
 def _handle_clarification_interaction(mode: str) -> None:
     """
     Handle user interaction in clarification mode.
@@ -95,7 +172,7 @@ def _handle_clarification_interaction(mode: str) -> None:
             should_proceed, query_to_use = ClarificationManager.handle_confirmation_response(confirmed)
             
             if should_proceed and query_to_use:
-                log.info(f"Proceeding with confirmed query: '{query_to_use}'")
+                log.info("Proceeding with confirmed query: '{}'", query_to_use)
                 _proceed_with_search(query_to_use, pending_intent)
             else:
                 log.info("User rejected query, clearing state")
@@ -114,7 +191,7 @@ def _handle_clarification_interaction(mode: str) -> None:
                 _proceed_with_search(pending_query, pending_intent)
             else:
                 # Handle clarification input
-                log.info(f"Processing clarification: '{clarification}'")
+                log.info("Processing clarification: '{}'", clarification)
                 _handle_clarification_input(clarification)
 
 
@@ -130,13 +207,10 @@ def _handle_clarification_input(clarification: str) -> None:
     if needs_reclassification:
         # Re-classify with context
         with st.spinner("🔄 Understanding your clarification..."):
-            log.info(f"Re-classifying with cumulative query: '{cumulative_query}'")
+            log.info("Re-classifying with cumulative query: '{}'", cumulative_query)
             
-            conversation = SessionManager.get_current_conversation()
-            intent_response = classify_intent_with_context(
-                cumulative_query,
-                conversation
-            )
+            conversation = ClarificationManager.build_windowed_conversation()
+            intent_response = _classify_cached(cumulative_query, conversation)
             
             if intent_response:
                 # Check if we need more clarification or can proceed
@@ -173,28 +247,60 @@ def _handle_new_query(query: str) -> None:
     Args:
         query: User's query string
     """
+    st.session_state["turn_drew_intent"] = False
+    # Ignore a replayed submission of the query that is already being processed
+    query_nonce = hashlib.blake2b(
+        (query + str(len(SessionManager.get_chat_history()))).encode("utf-8"), digest_size=8
+    ).hexdigest()
+    if st.session_state.get("is_processing") and st.session_state.get("last_query_nonce") == query_nonce:
+        log.info("Duplicate submission ignored for query: '{}'", query)
+        return
+    st.session_state["last_query_nonce"] = query_nonce
+    
     # Set processing flag to disable input
     st.session_state["is_processing"] = True
     
+    # Show the question right away; history picks it up once the turn is saved
+    with st.chat_message("user"):
+        st.markdown(query)
+    
+    # Start retrieval now; it is only needed for the fallback flow, but it is
+    # independent of intent classification, so its latency hides behind it
+    search_future = _EXECUTOR.submit(_cached_hybrid_search, query, "{}", SEARCH_TOP_K)
+    
     try:
         # Step 1: Classify intent
         with st.spinner("🎯 Analyzing your query..."):
-            log.info(f"Starting intent classification for query: '{query}'")
-            intent_response = classify_intent_safe(query)
+            intent_response, local_confidence = classify_intent_local(query)
+            if local_confidence <= LOCAL_INTENT_MIN_CONFIDENCE:
+                intent_response = None
+            
+            if intent_response is None and not SessionManager.has_recent_low_confidence(FUSED_LOOKBACK_TURNS):
+                intent_response, answer = _classify_and_answer(query, search_future)
+                if answer is not None:
+                    _save_direct_answer(query, answer, search_future)
+                    return
+            
+            if intent_response is None:
+                log.info("Starting intent classification for query: '{}'", query)
+                intent_response = _classify_cached(query)
             
             if intent_response:
                 log.info(
-                    f"Intent classified: {intent_response.classification.intent} "
-                    f"(confidence: {intent_response.classification.confidence})"
+                    "Intent classified: {} (confidence: {})",
+                    intent_response.classification.intent,
+                    intent_response.classification.confidence
                 )
                 
                 # Display intent classification results
                 render_intent_display(intent_response)
+                st.session_state["turn_drew_intent"] = True
                 
                 # Step 2: Decision point based on intent
                 if ClarificationManager.should_ask_for_confirmation(intent_response):
                     # Low confidence - ask for confirmation
                     log.info("Low confidence, entering confirmation mode")
+                    _discard_search(search_future)
                     ClarificationManager.enter_confirmation_mode(query, intent_response)
                     st.session_state["is_processing"] = False
                     st.rerun()
@@ -203,6 +309,7 @@ def _handle_new_query(query: str) -> None:
                 elif ClarificationManager.should_ask_for_clarification(intent_response):
                     # Needs specific clarification
                     log.info("Needs clarification, entering clarification mode")
+                    _discard_search(search_future)
                     ClarificationManager.enter_clarification_mode(query, intent_response)
                     st.session_state["is_processing"] = False
                     st.rerun()
@@ -211,26 +318,70 @@ def _handle_new_query(query: str) -> None:
                 else:
                     # High confidence - proceed immediately
                     log.info("High confidence, proceeding with search")
-                    _proceed_with_search(query, intent_response)
+                    _proceed_with_search(query, intent_response, search_future=search_future)
             else:
                 log.warning("Intent classification failed, proceeding with default workflow")
                 render_intent_error("Could not classify query intent")
-                _proceed_with_search_without_intent(query)
+                _proceed_with_search_without_intent(query, search_future=search_future)
                 
     except Exception as e:
-        log.exception(f"Error in new query handler: {e!r}")
+        _discard_search(search_future)
+        log.exception("Error in new query handler: {!r}", e)
         st.error(f"❌ An error occurred: {str(e)}")
         # Clear processing flag on error
         st.session_state["is_processing"] = False
 
 
-def _proceed_with_search(query: str, intent_response) -> None:
+def _classify_and_answer(
+    query: str, search_future: Future
+) -> Tuple[Optional[IntentResponse], Optional[str]]:
+    """
+    Classify the query and, when possible, answer it in the same LLM request.
+    
+    Waits for the speculative search so the model has grounding for a direct
+    answer; the same results are reused if the query falls back to search.
+    
+    Args:
+        query: User's query string
+        search_future: Speculative search for this query
+        
+    Returns:
+        classify_and_answer result: (intent, None), (None, answer) or (None, None)
+    """
+    log.info("Starting fused classification for query: '{}'", query)
+    results = _search_results(query, search_future)
+    return classify_and_answer(
+        query,
+        results["transactions_vector"],
+        results["transactions_keyword"]
+    )
+
+
+def _save_direct_answer(query: str, answer: str, search_future: Future) -> None:
+    """
+    Show and save an answer the fused request produced without a tool call.
+    
+    Args:
+        query: User's query string
+        answer: Answer text
+        search_future: Speculative search the answer was grounded on
+    """
+    log.info("Fused request answered directly, skipping intent execution")
+    with st.chat_message("assistant"):
+        st.markdown(answer)
+    # Same results the answer was grounded on (the search result is memoized)
+    SessionManager.add_chat_turn(query, answer, _search_results(query, search_future))
+    _complete_turn()
+
+
+def _proceed_with_search(query: str, intent_response, search_future: Optional[Future] = None) -> None:
     """
     Execute the search and answer workflow.
     
     Args:
         query: Query to search for (may be cumulative with clarifications)
         intent_response: Intent classification response
+        search_future: Speculative search already running for this query
     """
     try:
         # Check if we have intent classification and route accordingly
@@ -238,9 +389,15 @@ def _proceed_with_search(query: str, intent_response) -> None:
             intent_type = intent_response.classification.intent
             
             # Route based on intent type
-            if intent_type in ["aggregate", "trend", "listing", "text_qa", "aggregate_filtered_by_text", "provenance"]:
+            if intent_type in STRUCTURED_INTENTS:
                 # Use new intent execution flow for structured queries
-                log.info(f"Using intent executor for: {intent_type}")
+                log.info("Using intent executor for: {}", intent_type)
+                _discard_search(search_future)
+                
+                extra_intents = _alternative_intents(intent_response)
+                if extra_intents:
+                    _run_multi_intent(query, intent_response, [intent_type, *extra_intents])
+                    return
                 
                 with st.spinner(f"🔍 Processing {intent_type} query..."):
                     result = execute_intent(query, intent_response)
@@ -250,13 +407,7 @@ def _proceed_with_search(query: str, intent_response) -> None:
                 data = result.get("data", {})
                 citations = result.get("citations", [])
                 
-                # Strip technical source information from answer
-                # Split at "**Statement Sources:**" to remove the technical details
-                if "**Statement Sources:**" in answer:
-                    answer = answer.split("**Statement Sources:**")[0].strip()
-                    # Also remove the note about aggregation
-                    if "*Note: Transaction amounts were aggregated" in answer:
-                        answer = answer.split("*Note: Transaction amounts were aggregated")[0].strip()
+                answer = _strip_sources(answer)
                 
                 # Use a chat message container for proper formatting
                 with st.chat_message("assistant"):
@@ -270,7 +421,7 @@ def _proceed_with_search(query: str, intent_response) -> None:
                 
                 # Save to chat history
                 log.info("Saving intent-based chat turn to session")
-                intent_data = intent_response.model_dump() if intent_response else None
+                intent_data = ClarificationManager.dump_intent(intent_response)
                 SessionManager.add_chat_turn(
                     query, 
                     answer, 
@@ -278,81 +429,267 @@ def _proceed_with_search(query: str, intent_response) -> None:
                     intent=intent_data
                 )
                 
-                # Clear clarification state and processing flag
-                SessionManager.clear_clarification_state()
-                st.session_state["is_processing"] = False
-                
-                # Rerun to update chat history display
-                st.rerun()
+                _complete_turn()
                 return
         
-        # Fallback to original hybrid search flow for text_qa and unclassified queries
-        log.info("Using fallback hybrid search flow")
-        
+    except Exception as e:
+        _discard_search(search_future)
+        log.exception("Error in search and answer workflow: {!r}", e)
+        st.error(f"❌ An error occurred: {str(e)}")
+        SessionManager.clear_clarification_state()
+        st.session_state["is_processing"] = False
+        return
+    
+    # Fallback to original hybrid search flow for text_qa and unclassified queries
+    log.info("Using fallback hybrid search flow")
+    _run_search_and_answer(query, intent_response=intent_response, search_future=search_future)
+
+
+def _alternative_intents(intent_response: IntentResponse) -> List[str]:
+    """Secondary structured intents the classifier is confident the query also asks for."""
+    primary = intent_response.classification.intent
+    extra = []
+    for alternative in intent_response.classification.alternativeIntents:
+        if (
+            alternative.confidence > ALTERNATIVE_INTENT_MIN_CONFIDENCE
+            and alternative.intent != primary
+            and alternative.intent in STRUCTURED_INTENTS
+            and alternative.intent not in extra
+        ):
+            extra.append(alternative.intent)
+    return extra
+
+
+def _run_multi_intent(query: str, intent_response: IntentResponse, intents: List[str]) -> None:
+    """
+    Execute several intents for one query in parallel and show them as tabs.
+    
+    Args:
+        query: User's query string
+        intent_response: Intent classification response
+        intents: Intent types to execute, primary first
+    """
+    with st.spinner(f"🔍 Processing {', '.join(intents)} queries..."):
+        results = execute_intents(query, intent_response, intents)
+    
+    answer = "\n\n".join(
+        f"**{intent.replace('_', ' ').title()}:** {_strip_sources(result.get('answer', 'No response generated'))}"
+        for intent, result in results.items()
+    )
+    intent_results = {
+        intent: {**result.get("data", {}), "citations": result.get("citations", [])}
+        for intent, result in results.items()
+    }
+    
+    with st.chat_message("assistant"):
+        st.markdown(answer)
+        st.divider()
+        render_multi_intent_results(intent_results)
+    
+    log.info("Saving multi-intent chat turn to session")
+    SessionManager.add_chat_turn(
+        query,
+        answer,
+        {"intent_results": intent_results},
+        intent=ClarificationManager.dump_intent(intent_response)
+    )
+    _complete_turn()
+
+
+def _strip_sources(answer: str) -> str:
+    """Remove the technical source listing (and aggregation note) from an intent answer."""
+    # Split at "**Statement Sources:**" to remove the technical details
+    if "**Statement Sources:**" in answer:
+        answer = answer.split("**Statement Sources:**")[0].strip()
+        # Also remove the note about aggregation
+        if "*Note: Transaction amounts were aggregated" in answer:
+            answer = answer.split("*Note: Transaction amounts were aggregated")[0].strip()
+    return answer
+
+
+def _proceed_with_search_without_intent(query: str, search_future: Optional[Future] = None) -> None:
+    """
+    Execute search without intent classification (fallback).
+    
+    Args:
+        query: Query to search for
+        search_future: Speculative search already running for this query
+    """
+    _run_search_and_answer(query, search_future=search_future)
+
+
+def _run_search_and_answer(
+    query: str,
+    filters: Optional[Dict[str, Any]] = None,
+    intent_response=None,
+    search_future: Optional[Future] = None,
+) -> None:
+    """
+    Retrieve with hybrid search, stream a grounded answer and save the turn.
+    
+    Single implementation of the search-and-answer flow used by every
+    fallback path.
+    
+    Args:
+        query: Query to search for (may be cumulative with clarifications)
+        filters: Keyword search filters (default none)
+        intent_response: Intent classification response to store with the turn, if any
+        search_future: Speculative search already running for this query
+    """
+    try:
         # Step 1: Retrieve relevant documents
         with st.spinner("🔍 Retrieving relevant transactions..."):
             log.info("Starting hybrid search")
-            results = hybrid_search(query, filters={}, top_k=20)
+            results = _search_results(query, search_future, filters or {})
             log.info(
-                f"Search complete: vector={len(results.get('transactions_vector', []))}, "
-                f"keyword={len(results.get('transactions_keyword', []))}"
+                "Search complete: vector={}, keyword={}",
+                len(results.get("transactions_vector", [])),
+                len(results.get("transactions_keyword", []))
             )
         
-        # Step 2: Generate answer using Vertex AI
-        with st.spinner("🤖 Generating answer..."):
-            log.info("Starting answer generation")
-            answer = chat_vertex(
-                query,
-                results["transactions_vector"],
-                results["transactions_keyword"]
-            )
-            log.info("Answer generated successfully")
+        # Step 2: Stream the answer from Vertex AI as it is generated
+        log.info("Starting answer generation")
+        answer = _stream_answer(query, results)
+        log.info("Answer generated successfully")
         
         # Step 3: Save to chat history with intent information
         log.info("Saving chat turn to session")
-        intent_data = intent_response.model_dump() if intent_response else None
-        SessionManager.add_chat_turn(query, answer, results, intent=intent_data)
-        
-        # Step 4: Clear clarification state and processing flag
-        SessionManager.clear_clarification_state()
-        st.session_state["is_processing"] = False
-        
-        # Rerun to display the new turn
-        log.info("Chat turn complete, refreshing UI")
-        st.rerun()
+        intent_data = ClarificationManager.dump_intent(intent_response)
+        SessionManager.add_chat_turn(query, answer, results, intent=intent_data, filters=filters)
         
     except Exception as e:
-        log.exception(f"Error in search and answer workflow: {e!r}")
+        _discard_search(search_future)
+        log.exception("Error in search and answer workflow: {!r}", e)
         st.error(f"❌ An error occurred: {str(e)}")
         SessionManager.clear_clarification_state()
         st.session_state["is_processing"] = False
+        return
+    
+    # Step 4: Clear clarification state and processing flag
+    _complete_turn()
 
 
-def _proceed_with_search_without_intent(query: str) -> None:
+def _search_results(
+    query: str,
+    search_future: Optional[Future],
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
-    Execute search without intent classification (fallback).
+    Get hybrid search results, preferring an already-running speculative search.
     
-    Args:
-        query: Query to search for
+    The speculative search is unfiltered, so it is only used when no filters
+    are requested. Falls back to a fresh search if it is missing or failed.
     """
-    try:
-        with st.spinner("🔍 Searching..."):
-            results = hybrid_search(query, filters={}, top_k=20)
-        
-        with st.spinner("🤖 Generating answer..."):
-            answer = chat_vertex(
-                query,
-                results["transactions_vector"],
-                results["transactions_keyword"]
-            )
+    if search_future is not None:
+        if filters:
+            search_future.cancel()
+        else:
+            try:
+                return search_future.result()
+            except Exception as e:
+                log.warning("Speculative search failed, retrying: {!r}", e)
+    return _cached_hybrid_search(query, json.dumps(filters or {}, sort_keys=True), SEARCH_TOP_K)
+
+
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def _cached_hybrid_search(query: str, filters_json: str, top_k: int) -> Dict[str, Any]:
+    """
+    Run hybrid_search, sharing results for identical requests made within a minute.
+    
+    Args:
+        query: Query text
+        filters_json: Search filters as canonical (sorted-key) JSON, so equal
+            filters hash to the same cache key
+        top_k: Number of fused results
         
-        SessionManager.add_chat_turn(query, answer, results)
-        SessionManager.clear_clarification_state()
-        st.session_state["is_processing"] = False
-        st.rerun()
+    Returns:
+        hybrid_search results (a fresh copy per call)
+    """
+    _get_search_client()
+    return hybrid_search(query, filters=json.loads(filters_json), top_k=top_k)
+
+
+def _discard_search(search_future: Optional[Future]) -> None:
+    """Drop a speculative search that is no longer needed (a running one just finishes unused)."""
+    if search_future is not None:
+        search_future.cancel()
+
+
+def _classify_cached(query: str, conversation: Optional[List[Dict]] = None) -> Optional[IntentResponse]:
+    """
+    Classify a query's intent, reusing a recent identical classification.
+    
+    Queries are matched case- and whitespace-insensitively within the same
+    conversation context on the same day. Failed or low-confidence
+    classifications are not cached.
+    
+    Args:
+        query: User query (cumulative query during clarification)
+        conversation: Current conversation turns, if classifying with context
         
-    except Exception as e:
-        log.exception(f"Error in fallback search: {e!r}")
-        st.error(f"❌ An error occurred: {str(e)}")
-        SessionManager.clear_clarification_state()
-        st.session_state["is_processing"] = False
+    Returns:
+        IntentResponse or None if classification fails
+    """
+    key = (" ".join(query.lower().split()), _context_hash(conversation), date.today().isoformat())
+    
+    with _intent_cache_lock:
+        cached = _intent_cache.get(key)
+        if cached is not None:
+            _intent_cache.move_to_end(key)
+    if cached is not None:
+        log.info("Intent cache hit: {}", cached.classification.intent)
+        return cached.model_copy(update={"query": query})
+    
+    if conversation:
+        intent_response = classify_intent_with_context(query, conversation)
+    else:
+        intent_response = classify_intent_safe(query)
+    
+    if intent_response and intent_response.classification.confidence >= INTENT_CACHE_MIN_CONFIDENCE:
+        with _intent_cache_lock:
+            _intent_cache[key] = intent_response
+            while len(_intent_cache) > INTENT_CACHE_SIZE:
+                _intent_cache.popitem(last=False)
+    return intent_response
+
+
+def _context_hash(conversation: Optional[List[Dict]]) -> str:
+    """Short digest of the conversation turns that feed classification (timestamps excluded)."""
+    if not conversation:
+        return ""
+    payload = json.dumps([(turn.get("type"), turn.get("text")) for turn in conversation])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _stream_answer(query: str, results: Dict[str, Any]) -> str:
+    """
+    Render the assistant's answer while it streams in and return the full text.
+    
+    Args:
+        query: User query
+        results: hybrid_search results used as grounding
+    """
+    _get_chat_client()
+    deltas = chat_vertex_stream(
+        query,
+        results["transactions_vector"],
+        results["transactions_keyword"]
+    )
+    with st.chat_message("assistant"):
+        answer = st.write_stream(_coalesce_stream(deltas))
+    return (answer or "").strip() or "(no response)"
+
+
+def _coalesce_stream(deltas, interval: float = STREAM_FLUSH_SECONDS):
+    """Group token deltas so the placeholder is redrawn at most once per interval."""
+    buffer: List[str] = []
+    last_flush = time.monotonic()
+    for delta in deltas:
+        buffer.append(delta)
+        now = time.monotonic()
+        if now - last_flush >= interval:
+            yield "".join(buffer)
+            buffer.clear()
+            last_flush = now
+    if buffer:
+        yield "".join(buffer)
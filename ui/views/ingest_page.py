@@ -1,15 +1,100 @@
 """Ingest page - orchestrates file upload, parsing, and indexing."""
 from __future__ import annotations
-from typing import List, Dict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional, Tuple
+import functools
+import itertools
+import queue
+import threading
 import streamlit as st
 
 from core.logger import get_logger
 from core.config import config
-from ui.services import SessionManager, UploadService
-from ui.components import render_upload_form, render_uploaded_files_display
+from core.storage import get_hash_index
+from ui.services import BufferedUpload, SessionManager, UploadService
+from ui.components import render_upload_form, render_uploaded_files_display, invalidate_uploaded_files_list
 
 log = get_logger("ui/pages/ingest_page")
 
+# Upper bound on files parsed concurrently (parsing/embedding is Vertex network-bound)
+PARSE_MAX_WORKERS = 8
+# Upper bound on files hashed and saved concurrently
+UPLOAD_MAX_WORKERS = 8
+# How often the progress panel polls a running background ingest
+INGEST_POLL_SECONDS = 1.0
+
+
+@dataclass
+class IngestJob:
+    """
+    Background parse-and-index run for one upload batch.
+    
+    The worker thread only posts events to ``events``; the script thread
+    drains them into ``label``/``messages``/``state`` on each poll, so all
+    Streamlit rendering stays on the script thread.
+    """
+    password: str
+    # Upload contents and their content hashes; saved to storage by the worker
+    uploads: List[BufferedUpload] = field(default_factory=list)
+    file_hashes: List[str] = field(default_factory=list)
+    # Metadata of the uploads that were saved (set by the worker)
+    metas: List[Dict] = field(default_factory=list)
+    events: "queue.Queue[Tuple[str, Any]]" = field(default_factory=queue.Queue)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    thread: Optional[threading.Thread] = None
+    label: str = "Processing your bank statement..."
+    state: str = "running"  # running | complete | error
+    succeeded: bool = False
+    handled: bool = False
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+    # (files prepared, total files) for the progress bar
+    progress: Tuple[int, int] = (0, 0)
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker has not yet reported a final state."""
+        return self.state == "running"
+    
+    @property
+    def cancel_requested(self) -> bool:
+        return self.cancel_event.is_set()
+    
+    def cancel(self) -> None:
+        """Ask the worker to stop before indexing."""
+        self.cancel_event.set()
+    
+    def post(self, kind: str, payload: Any) -> None:
+        """Queue an event from the worker: 'label', 'progress', 'write', 'info', 'warning', 'error', 'success' or 'state'."""
+        self.events.put((kind, payload))
+    
+    def fail(self, label: str, message: str, kind: str = "error") -> None:
+        """Report a failed run."""
+        self.post(kind, message)
+        self.post("state", ("error", label, False))
+    
+    def finish(self, label: str, *messages: Tuple[str, str], succeeded: bool = False) -> None:
+        """Report a completed run with closing messages."""
+        for kind, message in messages:
+            self.post(kind, message)
+        self.post("state", ("complete", label, succeeded))
+    
+    def drain(self) -> None:
+        """Apply queued worker events (script thread only)."""
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "label":
+                self.label = payload
+            elif kind == "progress":
+                self.progress = payload
+            elif kind == "state":
+                self.state, self.label, self.succeeded = payload
+            else:
+                self.messages.append((kind, payload))
+
 
 def render() -> None:
     """Render the ingest page."""
@@ -24,184 +109,471 @@ def render() -> None:
     # Render upload form
     files, password, submitted = render_upload_form()
     
-    # Handle form submission - auto parse and index
+    # Handle form submission - save, then parse and index in the background
     if submitted and files:
         _handle_upload_and_index(files, password)
     
+    # Progress/result of the current background ingest, if any. Only an
+    # unfinished job uses the polling fragment; a finished one renders statically.
+    job = SessionManager.get_ingest_job()
+    if job is not None:
+        if job.handled:
+            _draw_ingest_status(job)
+        else:
+            _poll_ingest_job()
+    
     # Display previously uploaded files
     render_uploaded_files_display()
 
 
+@functools.lru_cache(maxsize=8)
+def _ensure_indices(idx_statements: str, idx_transactions: str, alias_txn_view: str, vector_dim: int) -> None:
+    """
+    Ensure the statements index, transactions data stream and alias exist.
+    
+    Index setup is idempotent for a fixed configuration, so it is cached per
+    process and the Elasticsearch round-trips happen once instead of per file.
+    Failures raise and are therefore not cached.
+    """
+    from elastic.indexer import ensure_statements_index, ensure_transactions_index, ensure_transaction_alias
+    
+    ensure_statements_index(idx_statements, vector_dim=vector_dim)
+    ensure_transactions_index(idx_transactions, vector_dim=vector_dim)
+    ensure_transaction_alias(alias_txn_view, idx_transactions)
+
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _parse_cached(
+    content_hash: str,
+    ext: str,
+    vertex_model: str,
+    *,
+    _path: str,
+    _password: Optional[str],
+    _gcp_project: Optional[str],
+    _gcp_location: Optional[str],
+    _content: Optional[bytes] = None,
+):
+    """
+    Parse a saved upload, memoized by file content, type and parsing model.
+    
+    Re-submitting identical content (e.g. retrying after an indexing failure
+    removed the saved file) reuses the earlier result instead of calling
+    Vertex AI again. Underscore-prefixed arguments are excluded from the
+    cache key; failures are not cached. ``_content`` (the upload's bytes) is
+    decoded in place of reading ``_path`` back from storage.
+    """
+    from ui.services import ParseService
+    
+    return ParseService.parse_file(
+        _path,
+        ext,
+        password=_password,
+        gcp_project=_gcp_project,
+        gcp_location=_gcp_location,
+        content=_content
+    )
+
+
+def _prepare_file(
+    meta: Dict,
+    password: Optional[str],
+    gcp_project: Optional[str],
+    gcp_location: Optional[str],
+    content: Optional[bytes] = None,
+) -> Dict:
+    """
+    Parse one saved upload and build its statement docs.
+    
+    Runs on a worker thread, so it must not render Streamlit elements
+    (the thread-safe st.cache_data parse cache is fine).
+    
+    Args:
+        meta: Saved upload metadata from UploadService.process_upload
+        password: Password for encrypted PDFs
+        gcp_project: GCP project ID
+        gcp_location: GCP region
+        content: The upload's bytes, parsed instead of reading meta["path"] back
+        
+    Returns:
+        Dict with parsed, stmt_docs, source_file, txn_count, account_no and period
+    """
+    import os
+    from ui.services import ParseService
+    
+    parsed = _parse_cached(
+        meta["content_hash"],
+        meta["ext"],
+        config.vertex_model,
+        _path=meta["path"],
+        _password=password or None,
+        _gcp_project=gcp_project,
+        _gcp_location=gcp_location,
+        _content=content
+    )
+    
+    account_no = str(parsed.accountNo)
+    statement_from = parsed.statementFrom.isoformat()
+    statement_to = parsed.statementTo.isoformat()
+    result = {
+        "parsed": parsed,
+        "stmt_docs": [],
+        "source_file": os.path.basename(meta["name"]),
+        "txn_count": 0,
+        "account_no": account_no,
+        "period": (statement_from, statement_to),
+    }
+    
+    # Statement summaries are embedded here; transaction docs are generated while indexing.
+    # Duplicate periods are checked for the whole batch once every file is parsed.
+    result["stmt_docs"] = ParseService.create_statement_docs(
+        parsed,
+        result["source_file"],
+        gcp_project=gcp_project,
+        gcp_location=gcp_location
+    )
+    if result["stmt_docs"]:
+        result["txn_count"] = sum(len(page.statements) for page in parsed.pages)
+    return result
+
+
+def _cleanup_saved_files(save_futures: List[Future], job: IngestJob) -> None:
+    """Delete uploads saved by the current batch so they can be uploaded again."""
+    # Waits for saves still in flight; failed saves (None) left nothing to remove
+    saved_filenames = [meta["name"] for meta in (f.result() for f in save_futures) if meta]
+    for saved_filename in saved_filenames:
+        UploadService.delete_file(saved_filename)
+        log.info("Cleaned up saved upload: {}", saved_filename)
+        job.post("info", f"🗑️ Removed {saved_filename} - you can try uploading again.")
+
+
 def _handle_upload_and_index(files, password: str) -> None:
     """
-    Handle file upload, parse, and index in one flow.
+    Validate uploads, then save, parse and index them in the background.
     
     Args:
         files: Uploaded files from Streamlit
         password: Password for encrypted PDFs
     """
-    import os
+    if not files:
+        return
+    
     from ui.services import ParseService
-    from elastic.indexer import ensure_statements_index, ensure_transactions_index, ensure_transaction_alias
+    
+    running_job = SessionManager.get_ingest_job()
+    if running_job is not None and running_job.is_running:
+        st.warning("⏳ A previous upload is still being processed. Please wait for it to finish.")
+        return
     
     # Validate files
     is_valid, error_msg = UploadService.validate_files(files)
     if not is_valid:
-        if error_msg:
-            st.warning(error_msg) if "at least one" in error_msg else st.error(error_msg)
-            if "at least one" not in error_msg:
-                log.warning(f"Upload validation failed: {error_msg}")
+        st.error(error_msg)
+        log.warning("Upload validation failed: {}", error_msg)
         return
     
-    # Check for duplicate files before uploading
-    # NOTE: We no longer use session-specific directories to avoid file duplication
+    # The same file selected twice would be hashed, saved and parsed twice, so
+    # repeats of a (name, size) are dropped. A different file with a name already
+    # in the batch would overwrite it in storage, so the batch is rejected.
+    sizes_by_name: Dict[str, int] = {}
+    unique_files = []
     for file in files:
-        # Check by filename
-        if UploadService.check_duplicate_by_name(file.name):
+        seen_size = sizes_by_name.get(file.name)
+        if seen_size is None:
+            sizes_by_name[file.name] = file.size
+            unique_files.append(file)
+        elif seen_size == file.size:
+            log.info("Dropped duplicate selection of {} from the batch", file.name)
+        else:
             st.error(f"❌ File '{file.name}' already exists. Please rename the file or delete the existing one.")
-            log.warning(f"Upload blocked: duplicate filename {file.name}")
+            log.warning("Upload blocked: duplicate filename {} within the batch", file.name)
             return
-        
-        # Check by content hash
-        file_content = file.getvalue()
-        is_duplicate, existing_filename = UploadService.check_duplicate_by_hash(file_content)
-        if is_duplicate:
-            st.error(
-                f"❌ This file has already been uploaded as '{existing_filename}'. "
+    files = unique_files
+    
+    # Check for duplicate files before uploading
+    # NOTE: We no longer use session-specific directories to avoid file duplication
+    try:
+        # Reloaded per batch: other instances may have uploaded or deleted files
+        hash_index = get_hash_index(refresh=True)
+    except Exception as e:
+        log.error("Could not load upload hash index: {}", e)
+        hash_index = None  # the checks below report storage errors themselves
+    workers = max(1, min(UPLOAD_MAX_WORKERS, len(files)))
+    # Hash all files concurrently (the hash functions release the GIL); each
+    # hash is reused when saving
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        file_hashes = list(executor.map(UploadService.hash_upload, files))
+    
+    # Every duplicate in the batch is collected and shown in one message
+    errors: List[str] = []
+    for file, file_hash in zip(files, file_hashes):
+        duplicate = UploadService.check_duplicate(
+            file.name, file_hash, file.size, hash_index=hash_index
+        )
+        if duplicate.by_name:
+            errors.append(f"❌ File '{file.name}' already exists. Please rename the file or delete the existing one.")
+            log.warning("Upload blocked: duplicate filename {}", file.name)
+        elif duplicate.by_hash:
+            errors.append(
+                f"❌ '{file.name}' has already been uploaded as '{duplicate.by_hash}'. "
                 f"The content is identical even though the filename may be different."
             )
-            log.warning(f"Upload blocked: duplicate content hash for {file.name}")
-            return
+            log.warning("Upload blocked: duplicate content hash for {}", file.name)
+    if errors:
+        st.error("\n\n".join(errors))
+        return
+    
+    # Validate configuration
+    is_valid, error_msg = ParseService.validate_config()
+    if not is_valid:
+        st.error(error_msg)
+        return
+    
+    # UploadedFile objects belong to the script run; the worker saves and parses
+    # in-memory copies, so parsing starts while the files are still being stored
+    uploads = [BufferedUpload(file.getvalue(), file.name) for file in files]
+    job = IngestJob(password=password or "", uploads=uploads, file_hashes=file_hashes)
+    job.thread = threading.Thread(
+        target=_run_pipeline,
+        args=(job,),
+        name="ingest-pipeline",
+        daemon=True
+    )
+    SessionManager.set_ingest_job(job)
+    job.thread.start()
+    log.info("Started background ingest for {} file(s)", len(uploads))
+
+
+def _run_pipeline(job: IngestJob) -> None:
+    """
+    Save, parse, embed and index an upload batch on a background thread.
+    
+    Reports progress through ``job``; never calls Streamlit directly. Files
+    are saved to storage concurrently with parsing (PDFs are parsed from
+    memory). On any failure, duplicate or cancellation every file saved by
+    the batch is removed, since nothing is indexed until all files are
+    prepared.
+    """
+    import os
+    from ui.services import ParseService
+    
+    uploads = job.uploads
+    file_hashes = job.file_hashes
+    password = job.password
     gcp_project = config.gcp_project_id or os.getenv("GCP_PROJECT_ID")
     gcp_location = config.gcp_location or os.getenv("GCP_LOCATION", "us-central1")
-    idx_statements = config.elastic_index_statements
-    idx_transactions = config.elastic_index_transactions
-    
-    with st.status("Processing your bank statement...", expanded=True) as status:
-        # Validate configuration
-        is_valid, error_msg = ParseService.validate_config()
-        if not is_valid:
-            status.update(label=error_msg, state="error")
-            st.error(error_msg)
+    pool_size = max(1, min(PARSE_MAX_WORKERS, len(uploads)))
+    # Storage writes are I/O-bound (especially on GCS) and run alongside everything below
+    save_executor = ThreadPoolExecutor(
+        max_workers=max(1, min(UPLOAD_MAX_WORKERS, len(uploads))), thread_name_prefix="ingest-save"
+    )
+    save_futures = [
+        save_executor.submit(UploadService.process_upload, upload, password=password, file_hash=file_hash)
+        for upload, file_hash in zip(uploads, file_hashes)
+    ]
+    save_executor.shutdown(wait=False)
+    # Embeds transaction descriptions; not scoped to the parse loop so indexing
+    # can start on finished files while the last ones are still embedding
+    txn_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="ingest-embed")
+    
+    def _prepare_upload(i: int) -> Optional[Dict]:
+        """Parse upload i: PDFs straight from memory, other types once saved (None if not saved)."""
+        upload = uploads[i]
+        if upload.name.lower().endswith(".pdf"):
+            meta = {
+                "name": os.path.basename(upload.name),
+                "ext": "pdf",
+                "content_hash": file_hashes[i],
+                "path": upload.name,
+            }
+            return _prepare_file(meta, password, gcp_project, gcp_location, upload.getvalue())
+        meta = save_futures[i].result()
+        if meta is None:
+            return None
+        return _prepare_file(meta, password, gcp_project, gcp_location)
+    
+    try:
+        job.post("label", "Preparing Elasticsearch indices...")
+        try:
+            _ensure_indices(
+                config.elastic_index_statements,
+                config.elastic_index_transactions,
+                config.elastic_alias_txn_view,
+                config.elastic_vector_dim
+            )
+        except Exception as e:
+            log.error("Failed to prepare Elasticsearch indices: {!r}", e)
+            job.fail("Error preparing Elasticsearch indices", f"❌ Failed to prepare Elasticsearch: {str(e)}")
+            _cleanup_saved_files(save_futures, job)
             return
         
-        stmt_docs: List[Dict] = []
-        txn_docs: List[Dict] = []
-        
-        for file in files:
-            saved_filename = None  # Track if file was saved for cleanup on failure
-            try:
-                # Step 1: Save file (using storage backend, no session directories)
-                status.update(label=f"Saving {file.name}...", state="running")
-                meta = UploadService.process_upload(file, password=password)
-                if not meta:
-                    st.error(f"❌ Could not save: {file.name}")
-                    continue
-                
-                saved_filename = meta["name"]  # Track saved file for cleanup
-                
-                # Step 2: Parse with Vertex AI
-                status.update(label=f"Parsing {file.name} with Vertex AI...", state="running")
-                parsed = ParseService.parse_file(
-                    meta["path"],
-                    meta["ext"],
-                    password=password or None,
-                    gcp_project=gcp_project,
-                    gcp_location=gcp_location
-                )
-                
-                # Step 2.5: Check for duplicate statement in Elasticsearch
-                status.update(label="Checking for duplicate statements...", state="running")
-                account_no = str(parsed.accountNo)
-                statement_from = parsed.statementFrom.isoformat()  # Convert date to string
-                statement_to = parsed.statementTo.isoformat()  # Convert date to string
-                
-                is_duplicate, existing_file = UploadService.check_duplicate_in_elasticsearch(
-                    account_no, statement_from, statement_to
-                )
-                
-                if is_duplicate:
-                    status.update(
-                        label=f"Duplicate statement detected for account {account_no}",
-                        state="error"
-                    )
-                    st.error(
-                        f"❌ A statement for account **{account_no}** covering the period "
-                        f"**{statement_from}** to **{statement_to}** already exists.\n\n"
-                        f"Previously uploaded as: `{existing_file}`\n\n"
-                        f"Please upload a different statement period to avoid duplicate data."
-                    )
-                    log.warning(
-                        f"Upload blocked: duplicate statement for account {account_no}, "
-                        f"period {statement_from} to {statement_to}"
-                    )
-                    # Clean up the saved file since we're not processing it
-                    if saved_filename:
-                        UploadService.delete_file(saved_filename)
-                        log.info(f"Cleaned up file after duplicate detection: {saved_filename}")
+        # Parse and embed each file concurrently. As soon as a
+        # file is prepared its transaction descriptions are embedded on a second
+        # pool, overlapping with the files still being parsed.
+        job.post("label", f"Parsing {len(uploads)} file(s) with Vertex AI...")
+        results: List[Optional[Dict]] = [None] * len(uploads)
+        txn_futures: List[Optional[Future]] = [None] * len(uploads)
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            futures = {executor.submit(_prepare_upload, i): i for i in range(len(uploads))}
+            job.post("progress", (0, len(uploads)))
+            for done, future in enumerate(as_completed(futures), start=1):
+                name = os.path.basename(uploads[futures[future]].name)
+                if job.cancel_requested:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    txn_executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                try:
+                    result = future.result()
+                except Exception as e:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    txn_executor.shutdown(wait=False, cancel_futures=True)
+                    log.error("Failed to process {}: {!r}", name, e)
+                    job.fail(f"Error processing {name}", f"❌ Failed to process {name}: {str(e)}")
+                    _cleanup_saved_files(save_futures, job)
                     return
                 
-                # Step 3: Ensure indices exist
-                status.update(label="Preparing Elasticsearch indices...", state="running")
-                ensure_statements_index(idx_statements, vector_dim=config.elastic_vector_dim)
-                ensure_transactions_index(idx_transactions)
-                ensure_transaction_alias(config.elastic_alias_txn_view, idx_transactions)
-                
-                # Step 4: Create documents with embeddings (always enabled)
-                status.update(label="Generating embeddings...", state="running")
-                source_file = os.path.basename(meta["name"])
-                
-                stmt_docs = ParseService.create_statement_docs(
-                    parsed,
-                    source_file,
-                    gcp_project=gcp_project,
-                    gcp_location=gcp_location
-                )
-                
-                # Create transaction docs only once for all pages (not once per page)
-                # Use the first statement doc ID as the parent reference
-                if stmt_docs:
-                    tx_docs_batch = ParseService.create_transaction_docs(
-                        parsed,
-                        stmt_docs[0]["id"],  # Use first statement doc as reference
-                        source_file,
+                job.post("progress", (done, len(uploads)))
+                if result is None:
+                    continue  # not saved; reported below
+                results[futures[future]] = result
+                if result["stmt_docs"]:
+                    # Use the first statement doc ID as the parent reference
+                    txn_futures[futures[future]] = txn_executor.submit(
+                        ParseService.iter_transaction_docs,
+                        result["parsed"],
+                        result["stmt_docs"][0]["id"],
+                        result["source_file"],
                         embed_descriptions=True,  # Always embed
                         gcp_project=gcp_project,
                         gcp_location=gcp_location
                     )
-                    txn_docs.extend(tx_docs_batch)
-                
-                status.write(f"✓ Prepared {len(stmt_docs)} statement(s) and {len(txn_docs)} transaction(s)")
-                
-            except Exception as e:
-                log.error(f"Failed to process {file.name}: {e!r}")
-                status.update(label=f"Error processing {file.name}", state="error")
-                st.error(f"❌ Failed to process {file.name}: {str(e)}")
-                
-                # Clean up the saved file since processing failed
-                if saved_filename:
-                    UploadService.delete_file(saved_filename)
-                    log.info(f"Cleaned up file after processing failure: {saved_filename}")
-                    st.info(f"🗑️ Removed {saved_filename} - you can try uploading again.")
-                
-                return
+                job.post(
+                    "write",
+                    f"✓ {name}: prepared {len(result['stmt_docs'])} statement(s) "
+                    f"and {result['txn_count']} transaction(s)"
+                )
         
-        # Step 5: Index to Elasticsearch
-        if stmt_docs or txn_docs:
-            status.update(label="Indexing to Elasticsearch...", state="running")
-            ParseService.index_documents(stmt_docs, txn_docs)
-            
-            status.update(
-                label=f"✅ Complete! Indexed {len(stmt_docs)} statement(s) & {len(txn_docs)} transaction(s).",
-                state="complete"
+        if job.cancel_requested:
+            log.info("Background ingest cancelled before indexing")
+            job.fail("Cancelled", "Upload cancelled - nothing was indexed.", kind="warning")
+            _cleanup_saved_files(save_futures, job)
+            return
+        
+        # Files that could not be stored are left out of the batch. The saved
+        # metadata is built in one list and published to the job in one assignment,
+        # which the script thread later writes to session state once.
+        saved_metas = [save_future.result() for save_future in save_futures]
+        for i, saved_meta in enumerate(saved_metas):
+            if saved_meta is None:
+                job.post("error", f"❌ Could not save: {uploads[i].name}")
+                results[i] = None
+                if txn_futures[i] is not None:
+                    txn_futures[i].cancel()
+                    txn_futures[i] = None
+        job.metas = [saved_meta for saved_meta in saved_metas if saved_meta is not None]
+        results = [result for result in results if result is not None]
+        if not results:
+            job.fail("Could not save upload", "❌ None of the files could be saved.")
+            return
+        
+        # One msearch for every parsed period instead of a search per file; the
+        # (account, from, to) keys are built once and reused for the lookups
+        keys = [(result["account_no"], *result["period"]) for result in results]
+        duplicates = UploadService.check_duplicates_in_elasticsearch_batch(keys)
+        for key in keys:
+            existing_file = duplicates.get(key)
+            if existing_file is None:
+                continue
+            txn_executor.shutdown(wait=False, cancel_futures=True)
+            account_no, statement_from, statement_to = key
+            job.fail(
+                f"Duplicate statement detected for account {account_no}",
+                f"❌ A statement for account **{account_no}** covering the period "
+                f"**{statement_from}** to **{statement_to}** already exists.\n\n"
+                f"Previously uploaded as: `{existing_file}`\n\n"
+                f"Please upload a different statement period to avoid duplicate data."
             )
-            st.success(f"✅ Successfully processed and indexed your bank statement!")
-            st.info(f"📊 {len(stmt_docs)} statement(s) • {len(txn_docs)} transaction(s) indexed")
-            
-            # Save to session
-            SessionManager.set_uploads_meta([meta])
-            SessionManager.set_password(password or "")
-        else:
-            status.update(label="No documents to index.", state="complete")
-            st.warning("No documents found to index.")
+            log.warning(
+                "Upload blocked: duplicate statement for account {}, period {} to {}",
+                account_no, statement_from, statement_to
+            )
+            _cleanup_saved_files(save_futures, job)
+            return
+        
+        # Keep upload order regardless of completion order
+        stmt_docs: List[Dict] = list(
+            itertools.chain.from_iterable(result["stmt_docs"] for result in results)
+        )
+        pending_txns = [future for future in txn_futures if future is not None]
+        
+        if not (stmt_docs or pending_txns):
+            job.finish("No documents to index.", ("warning", "No documents found to index."))
+            return
+        
+        # Index to Elasticsearch; descriptions were embedded while other files parsed
+        # and each file's documents are built as the bulk helper consumes them
+        job.post("label", "Indexing to Elasticsearch...")
+        txn_docs = itertools.chain.from_iterable(future.result() for future in pending_txns)
+        
+        try:
+            stmt_count, txn_count = ParseService.index_documents(stmt_docs, txn_docs)
+        except Exception as e:
+            log.error("Failed to index documents: {!r}", e)
+            job.fail("Error indexing to Elasticsearch", f"❌ Failed to index your bank statement: {str(e)}")
+            # Clean up saved files so the upload can be retried
+            _cleanup_saved_files(save_futures, job)
+            return
+        
+        job.finish(
+            f"✅ Complete! Indexed {stmt_count} statement(s) & {txn_count} transaction(s).",
+            ("success", "✅ Successfully processed and indexed your bank statement!"),
+            ("info", f"📊 {stmt_count} statement(s) • {txn_count} transaction(s) indexed"),
+            succeeded=True
+        )
+    except Exception as e:
+        log.exception("Unexpected error in background ingest: {!r}", e)
+        job.fail("Error processing upload", f"❌ An error occurred: {str(e)}")
+        _cleanup_saved_files(save_futures, job)
+    finally:
+        txn_executor.shutdown(wait=False, cancel_futures=True)
+
 
+def _draw_ingest_status(job: IngestJob) -> None:
+    """Render a job's status panel and the messages reported so far."""
+    state = "running" if job.is_running else job.state
+    with st.status(job.label, state=state, expanded=True):
+        done, total = job.progress
+        if job.is_running and total:
+            st.progress(done / total, text=f"Prepared {done} of {total} file(s)")
+        for kind, text in job.messages:
+            if kind == "write":
+                st.write(text)
+            else:
+                getattr(st, kind)(text)
+        
+        if job.is_running and not job.cancel_requested:
+            if st.button("Cancel", key="cancel_ingest"):
+                job.cancel()
+                st.caption("Cancelling after the current step...")
+
+
+@st.fragment(run_every=INGEST_POLL_SECONDS)
+def _poll_ingest_job() -> None:
+    """Re-render only the progress panel while the background ingest runs."""
+    job = SessionManager.get_ingest_job()
+    if job is None:
+        return
+    
+    job.drain()
+    _draw_ingest_status(job)
+    
+    if not job.is_running and not job.handled:
+        job.handled = True
+        # A failed batch removed its saved files
+        invalidate_uploaded_files_list()
+        if job.succeeded:
+            # Save to session
+            SessionManager.set_uploads_meta(job.metas)
+            SessionManager.set_password(job.password)
+        # Full rerun so the uploaded files list reflects the finished batch
+        st.rerun()